@@ -0,0 +1,64 @@
+"""Check that baking along a curve matches the FOLLOW_PATH constraints.
+
+Run it with Blender in the background:
+
+    blender --background --factory-startup --python benchmarks/check_curve_bake.py
+
+A few parts are duplicated along a test curve both ways and the world
+matrices compared. Exits with 1 when any copy is further off than the
+tolerance.
+"""
+import argparse
+import os
+import sys
+
+SRC_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "src")
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+import no_mans_sky_base_builder.backends as backends
+import no_mans_sky_base_builder.builder as builder
+import no_mans_sky_base_builder.utils.blend_utils as blend_utils
+import no_mans_sky_base_builder.utils.curve as curve
+
+# Parts with different rest poses and snap groups.
+OBJECT_IDS = ("CUBEWALL", "CUBEFLOOR", "U_GENERATOR_S")
+# A curve bending in every axis.
+CURVE_POINTS = [
+    (0.0, 0.0, 0.0),
+    (10.0, 0.0, 0.0),
+    (20.0, 10.0, 2.0),
+    (20.0, 25.0, 4.0),
+    (5.0, 30.0, 4.0),
+]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compare baked and constrained copies.")
+    parser.add_argument("--gap", type=float, default=0.1)
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="The largest difference allowed.")
+    args = parser.parse_args(argv)
+
+    base_builder = builder.Builder()
+    curve_object = backends.get_backend().new_curve_object("bake_check", CURVE_POINTS)
+    blend_utils.add_to_scene(curve_object)
+
+    failed = False
+    for object_id in OBJECT_IDS:
+        source = base_builder.add_part(object_id, build_rigs=False)
+        position_error, axis_error = curve.compare_bake_with_constraints(
+            base_builder, source.object, curve_object, args.gap
+        )
+        ok = max(position_error, axis_error) <= args.tolerance
+        failed = failed or not ok
+        print("{0}: position {1:.4f}, axes {2:.4f} {3}".format(
+            object_id, position_error, axis_error, "OK" if ok else "FAILED"
+        ))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # Blender's own arguments come before "--".
+    script_args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(script_args))
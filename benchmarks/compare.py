@@ -0,0 +1,93 @@
+"""Compare two benchmark result files written by run.py.
+
+    python benchmarks/compare.py baseline.json results.json --threshold 0.1
+
+Every scenario and operation found in both files is listed with its change in
+best time. Exits with 1 when any of them got slower by more than the
+threshold, so it can gate a release.
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """Read a result file.
+
+    Returns:
+        tuple: The environment and a dictionary of (scenario, operation) to
+            the result.
+    """
+    with open(path, "r") as stream:
+        data = json.load(stream)
+    results = {
+        (result["scenario"], result["operation"]): result
+        for result in data["results"]
+    }
+    return data.get("environment", {}), results
+
+
+def describe(environment):
+    return "{0} (Blender {1}, {2})".format(
+        environment.get("commit") or environment.get("addon_version", "?"),
+        environment.get("blender_version", "?"),
+        environment.get("backend", "blender")
+    )
+
+
+def compare(baseline, current, threshold=0.1, metric="best"):
+    """Compare matching results.
+
+    Args:
+        baseline (dict): The results to compare against.
+        current (dict): The new results.
+        threshold (float): The slow down allowed, as a fraction.
+        metric (str): best or mean.
+
+    Returns:
+        list: (scenario, operation, baseline, current, ratio, regressed) rows.
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        before = baseline[key][metric]
+        after = current[key][metric]
+        ratio = after / before if before else float("inf")
+        rows.append(key + (before, after, ratio, ratio > 1.0 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results.")
+    parser.add_argument("baseline", help="The results to compare against.")
+    parser.add_argument("current", help="The new results.")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="The slow down allowed before failing, 0.1 is 10%%.")
+    parser.add_argument("--metric", choices=("best", "mean"), default="best")
+    args = parser.parse_args(argv)
+
+    baseline_environment, baseline = load_results(args.baseline)
+    current_environment, current = load_results(args.current)
+    print("Baseline: {0}".format(describe(baseline_environment)))
+    print("Current:  {0}".format(describe(current_environment)))
+    print("")
+
+    rows = compare(baseline, current, threshold=args.threshold, metric=args.metric)
+    print("{0:<16} {1:<24} {2:>10} {3:>10} {4:>8}".format(
+        "scenario", "operation", "baseline", "current", "ratio"))
+    for scenario, operation, before, after, ratio, regressed in rows:
+        print("{0:<16} {1:<24} {2:>9.3f}s {3:>9.3f}s {4:>7.2f}x{5}".format(
+            scenario, operation, before, after, ratio, "  SLOWER" if regressed else ""))
+
+    missing = sorted(set(baseline) - set(current))
+    for scenario, operation in missing:
+        print("{0} {1}: missing from the current results".format(scenario, operation))
+
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print("\n{0} regression(s) over {1:.0%}.".format(len(regressions), args.threshold))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
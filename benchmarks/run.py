@@ -0,0 +1,216 @@
+"""Time the builder's hot paths on synthetic bases.
+
+Run it with Blender in the background:
+
+    blender --background --factory-startup --python benchmarks/run.py -- \\
+        --scenarios parts_1k power_network --output results.json
+
+Each scenario is built from scratch and then snapped, connected, optimised,
+toggled and searched for floating controls. The timings are written as json
+so they can be compared between releases with compare.py.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_PATH = os.path.dirname(os.path.realpath(__file__))
+SRC_PATH = os.path.join(BENCHMARK_PATH, "..", "src")
+for path in (BENCHMARK_PATH, SRC_PATH):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import bpy
+import no_mans_sky_base_builder
+import no_mans_sky_base_builder.backends as backends
+import no_mans_sky_base_builder.backends.memory as memory
+import no_mans_sky_base_builder.builder as builder
+import no_mans_sky_base_builder.part_overrides.line as line
+import no_mans_sky_base_builder.preset as preset
+import synthetic
+
+RESULTS_VERSION = 1
+# The number of parts snapped in the snapping benchmark.
+SNAP_COUNT = 100
+# The number of parts joined to one part in the connect benchmark.
+CONNECT_COUNT = 20
+# Operations that need rigs, which only exist in a Blender scene.
+RIG_OPERATIONS = ("connect", "optimise_control_points", "select_floating")
+
+
+def get_environment():
+    """Describe what the benchmark ran on."""
+    commit = None
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BENCHMARK_PATH,
+            stderr=subprocess.DEVNULL
+        ).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return {
+        "addon_version": ".".join(str(part) for part in no_mans_sky_base_builder.bl_info["version"]),
+        "blender_version": bpy.app.version_string,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": commit,
+        "timestamp": int(time.time()),
+    }
+
+
+def reset_scene(base_builder):
+    """Remove everything the previous scenario built."""
+    backend = backends.get_backend()
+    if isinstance(backend, memory.MemoryBackend):
+        backend.clear()
+    else:
+        for bpy_object in list(bpy.data.objects):
+            bpy.data.objects.remove(bpy_object, do_unlink=True)
+        for collection in list(bpy.data.collections):
+            bpy.data.collections.remove(collection)
+        for mesh in list(bpy.data.meshes):
+            if not mesh.users:
+                bpy.data.meshes.remove(mesh)
+    base_builder.clear_caches()
+
+
+def snap_parts(base_builder, rng):
+    """Snap new walls onto parts picked at random."""
+    targets = [
+        part for part in base_builder.get_all_parts(exclude_presets=True)
+        if part.get("ObjectID") in synthetic.DEFAULT_OBJECT_IDS
+    ]
+    for target in rng.sample(targets, min(SNAP_COUNT, len(targets))):
+        target = base_builder.get_builder_object_from_bpy_object(target)
+        wall = base_builder.add_part("CUBEWALL", build_rigs=False)
+        wall.snap_to(target)
+
+
+def connect_parts(base_builder, rng):
+    """Connect a power source to several others."""
+    sources = [
+        part for part in base_builder.get_all_parts(exclude_presets=True)
+        if part.get("ObjectID") == synthetic.POWER_SOURCE
+    ]
+    if len(sources) < 2:
+        # Nothing to connect, place a few sources first.
+        sources = []
+        for index in range(CONNECT_COUNT + 1):
+            source = base_builder.add_part(synthetic.POWER_SOURCE, build_rigs=False)
+            source.location = (index * synthetic.GRID_SPACING, -50.0, 0.0)
+            sources.append(source.object)
+        backends.get_backend().refresh()
+    sources = rng.sample(sources, min(CONNECT_COUNT + 1, len(sources)))
+    parts = [base_builder.get_builder_object_from_bpy_object(source) for source in sources]
+    line.Line.connect(parts[0], parts[1:], base_builder)
+
+
+def toggle_room_visibility(base_builder, rng):
+    """Cycle through ghosted, invisible and back to normal."""
+    for mode in (1, 2, 0):
+        base_builder.set_room_visibility(mode)
+
+
+OPERATIONS = (
+    ("import", lambda base_builder, data, rng: base_builder.deserialise_from_data(data)),
+    ("export", lambda base_builder, data, rng: base_builder.serialise()),
+    ("snap", lambda base_builder, data, rng: snap_parts(base_builder, rng)),
+    ("connect", lambda base_builder, data, rng: connect_parts(base_builder, rng)),
+    ("optimise_control_points", lambda base_builder, data, rng: base_builder.optimise_control_points()),
+    ("room_visibility", lambda base_builder, data, rng: toggle_room_visibility(base_builder, rng)),
+    ("select_floating", lambda base_builder, data, rng: base_builder.get_floating_controls()),
+)
+
+
+def run_scenario(base_builder, name, seed=0):
+    """Build a scenario and time every operation on it.
+
+    Returns:
+        tuple: The part count and a dictionary of operation to seconds.
+    """
+    reset_scene(base_builder)
+    data = synthetic.generate_scenario(name, seed=seed)
+    rng = random.Random(seed)
+    headless = backends.get_backend().headless
+
+    timings = {}
+    for operation, func in OPERATIONS:
+        if headless and operation in RIG_OPERATIONS:
+            continue
+        start = time.perf_counter()
+        func(base_builder, data, rng)
+        timings[operation] = time.perf_counter() - start
+        print("  {0}: {1:.3f}s".format(operation, timings[operation]))
+    return len(data["Objects"]), timings
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the base builder.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(synthetic.SCENARIOS),
+                        default=list(synthetic.SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="The number of times to run each scenario.")
+    parser.add_argument("--backend", choices=("blender", "memory"), default="blender",
+                        help="memory skips the scene but still runs in Blender.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    if args.backend == "memory":
+        backends.set_backend(memory.MemoryBackend())
+
+    # Serve the benchmark preset from a temporary preset folder.
+    preset_path = tempfile.mkdtemp(prefix="nms_benchmark_")
+    with open(os.path.join(preset_path, synthetic.PRESET_ID + ".json"), "w") as stream:
+        json.dump(synthetic.generate_preset(), stream)
+    original_preset_path = preset.Preset.PRESET_PATH
+    preset.Preset.PRESET_PATH = preset_path
+
+    base_builder = builder.Builder()
+    results = []
+    try:
+        for name in args.scenarios:
+            runs = []
+            part_count = 0
+            for run in range(args.repeat):
+                print("{0} ({1}/{2})".format(name, run + 1, args.repeat))
+                part_count, timings = run_scenario(base_builder, name, seed=args.seed)
+                runs.append(timings)
+            for operation in runs[0]:
+                seconds = [timings[operation] for timings in runs]
+                results.append({
+                    "scenario": name,
+                    "operation": operation,
+                    "parts": part_count,
+                    "seconds": seconds,
+                    "best": min(seconds),
+                    "mean": sum(seconds) / len(seconds),
+                })
+    finally:
+        reset_scene(base_builder)
+        preset.Preset.PRESET_PATH = original_preset_path
+        shutil.rmtree(preset_path, ignore_errors=True)
+
+    environment = get_environment()
+    environment["backend"] = args.backend
+    with open(args.output, "w") as stream:
+        json.dump(
+            {"version": RESULTS_VERSION, "environment": environment, "results": results},
+            stream,
+            indent=4
+        )
+    print("Results written to {0}".format(args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    # Blender's own arguments come before "--".
+    script_args = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(main(script_args))
@@ -0,0 +1,196 @@
+"""Generate synthetic No Man's Sky bases for benchmarking.
+
+Every scenario is generated from a fixed seed, so runs on different releases
+build exactly the same base. This module doesn't need Blender, run it on its
+own to write the scenarios out as json files:
+
+    python benchmarks/synthetic.py --output ./synthetic_bases
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from collections import OrderedDict
+
+SRC_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "src")
+if SRC_PATH not in sys.path:
+    sys.path.append(SRC_PATH)
+
+import no_mans_sky_base_builder.catalog as catalog
+
+# The distance between neighbouring parts.
+GRID_SPACING = 4.0
+# Fixed so timestamps don't make the bases differ between runs.
+TIMESTAMP = 1600000000
+# Parts used when a scenario doesn't ask for distinct ObjectIDs.
+DEFAULT_OBJECT_IDS = (
+    "CUBEROOM",
+    "CUBEFLOOR",
+    "CUBEWALL",
+    "CUBEROOF",
+    "CUBEWINDOW",
+    "CUBEGLASS",
+    "CUBEFRAME",
+    "CUBESTAIRS",
+)
+POWER_SOURCE = "U_GENERATOR_S"
+POWER_LINE = "U_POWERLINE"
+PRESET_ID = "BENCHMARK_PRESET"
+
+SCENARIOS = OrderedDict([
+    ("parts_1k", {"parts": 1000}),
+    ("parts_10k", {"parts": 10000}),
+    ("parts_50k", {"parts": 50000}),
+    ("power_network", {"power_sources": 1000}),
+    ("presets", {"parts": 500, "presets": 500}),
+    ("distinct_ids", {"parts": 10000, "distinct": True}),
+])
+
+
+def make_part(object_id, position, up=(0.0, 1.0, 0.0), at=(0.0, 0.0, 1.0), user_data=0):
+    """Get the NMS data of a part."""
+    return {
+        "ObjectID": "^{0}".format(object_id),
+        "Position": list(position),
+        "Up": list(up),
+        "At": list(at),
+        "Timestamp": TIMESTAMP,
+        "UserData": user_data,
+    }
+
+
+def get_grid_positions(count, spacing=GRID_SPACING, height=0.0):
+    """Lay points out on a square grid on the ground.
+
+    Returns:
+        list: (x, y, z) positions, Y is up.
+    """
+    columns = max(1, int(math.ceil(math.sqrt(count))))
+    return [
+        (
+            (index % columns) * spacing,
+            height,
+            (index // columns) * spacing
+        )
+        for index in range(count)
+    ]
+
+
+def generate_parts(count, object_ids, rng):
+    """Generate parts on a grid, turned at random in 90 degree steps."""
+    parts = []
+    for index, position in enumerate(get_grid_positions(count)):
+        angle = rng.randrange(4) * math.pi * 0.5
+        at = (round(math.sin(angle), 6), 0.0, round(math.cos(angle), 6))
+        object_id = object_ids[index % len(object_ids)]
+        parts.append(make_part(object_id, position, at=at, user_data=rng.randrange(16)))
+    return parts
+
+
+def generate_power_network(count, rng):
+    """Generate power sources joined to their grid neighbours by lines.
+
+    Line ends meet on top of the sources, so rigs share control points once
+    they are optimised.
+    """
+    columns = max(1, int(math.ceil(math.sqrt(count))))
+    positions = get_grid_positions(count)
+    parts = [make_part(POWER_SOURCE, position) for position in positions]
+    for index, start in enumerate(positions):
+        neighbours = []
+        if (index + 1) % columns and index + 1 < count:
+            neighbours.append(index + 1)
+        if index + columns < count:
+            neighbours.append(index + columns)
+        for neighbour in neighbours:
+            end = positions[neighbour]
+            at = [end_axis - start_axis for start_axis, end_axis in zip(start, end)]
+            parts.append(make_part(POWER_LINE, start, at=at))
+    # Shuffle so lines and sources are interleaved like in a real base.
+    rng.shuffle(parts)
+    return parts
+
+
+def generate_preset(part_count=20):
+    """Get the data of the preset used by the preset scenario."""
+    rng = random.Random(1)
+    parts = generate_parts(part_count, DEFAULT_OBJECT_IDS, rng)
+    return {"Objects": parts}
+
+
+def generate_presets(count, offset=0.0):
+    """Place copies of the benchmark preset on a grid."""
+    presets = []
+    for position in get_grid_positions(count, spacing=GRID_SPACING * 8):
+        presets.append({
+            "PresetID": "^{0}".format(PRESET_ID),
+            "Position": [position[0] + offset, position[1], position[2]],
+            # The rest pose of a preset control.
+            "Up": [0.0, 0.0, -1.0],
+            "At": [0.0, 1.0, 0.0],
+        })
+    return presets
+
+
+def get_distinct_object_ids():
+    """Get every ObjectID in the part catalog, except lines."""
+    part_catalog = catalog.PartCatalog()
+    return sorted(
+        object_id for object_id in part_catalog.part_reference
+        if not object_id.endswith("LINE")
+    )
+
+
+def generate_scenario(name, seed=0):
+    """Generate the NMS data of a scenario.
+
+    Args:
+        name (str): A key of SCENARIOS.
+        seed (int): The random seed.
+
+    Returns:
+        dict: The NMS data.
+    """
+    settings = SCENARIOS[name]
+    rng = random.Random(seed)
+    object_ids = DEFAULT_OBJECT_IDS
+    if settings.get("distinct"):
+        object_ids = get_distinct_object_ids()
+
+    objects = []
+    if settings.get("parts"):
+        objects.extend(generate_parts(settings["parts"], object_ids, rng))
+    if settings.get("power_sources"):
+        objects.extend(generate_power_network(settings["power_sources"], rng))
+
+    data = {"Objects": objects}
+    if settings.get("presets"):
+        # Keep the presets clear of the loose parts.
+        data["Presets"] = generate_presets(settings["presets"], offset=-1000.0)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the synthetic bases.")
+    parser.add_argument("--output", required=True, help="The output folder.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS),
+                        default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    for name in args.scenarios:
+        data = generate_scenario(name, seed=args.seed)
+        with open(os.path.join(args.output, name + ".json"), "w") as stream:
+            json.dump(data, stream)
+        print("{0}: {1} parts".format(name, len(data["Objects"])))
+    with open(os.path.join(args.output, PRESET_ID + ".json"), "w") as stream:
+        json.dump(generate_preset(), stream)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""The scene backends the builder creates and finds objects through.
+
+The Blender backend works on bpy data in the open scene. The memory backend
+keeps light weight objects in Python instead, so bases can be built and
+serialised without touching the scene, UI or OBJ imports.
+
+The memory backend is a fast path inside Blender, not a way to run the
+builder without it: the builder, parts and memory objects still use bpy and
+mathutils. Outside Blender use document.BaseDocument and the cli module.
+"""
+from contextlib import contextmanager
+
+_backend = None
+
+
+def get_backend():
+    """Get the active backend, the Blender backend unless one was set.
+
+    Returns:
+        SceneBackend: The backend.
+    """
+    global _backend
+    if _backend is None:
+        import no_mans_sky_base_builder.backends.blender as blender
+        _backend = blender.BlenderBackend()
+    return _backend
+
+
+def set_backend(backend):
+    """Set the active backend.
+
+    Args:
+        backend (SceneBackend): The backend, None restores the default.
+
+    Returns:
+        SceneBackend: The previous backend.
+    """
+    global _backend
+    previous = _backend
+    _backend = backend
+    return previous
+
+
+@contextmanager
+def use_backend(backend):
+    """Use a backend for the duration of a with block.
+
+    Args:
+        backend (SceneBackend): The backend.
+    """
+    previous = set_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
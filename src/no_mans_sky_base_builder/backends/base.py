@@ -0,0 +1,193 @@
+"""The interface every scene backend implements."""
+import abc
+
+import numpy as np
+
+
+class SceneBackend(abc.ABC):
+    """Creates, finds and selects the objects of a scene.
+
+    Objects returned by a backend follow the bpy.types.Object interface the
+    builder relies on: a name, custom properties through item["key"],
+    matrix_world, location, rotation_euler, scale, parent, children,
+    users_collection, hide_select and select_get/select_set.
+    """
+
+    # Backends without a Blender scene skip rigs, drivers and UI updates.
+    headless = False
+
+    # Objects ---
+    @abc.abstractmethod
+    def new_object(self, name, data=None):
+        """Create an object, not linked to any collection.
+
+        Args:
+            name (str): The name, made unique if need be.
+            data: The object data, None for an empty.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def new_mesh_object(self, name, file_path=None):
+        """Create a mesh object from an OBJ file, or a cube without one.
+
+        Args:
+            name (str): The name to use for cubes.
+            file_path (str): The OBJ file to import.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def new_curve_object(self, name, points):
+        """Create a closed NURBS curve object through some points.
+
+        Args:
+            name (str): The name.
+            points (list): The (x, y, z) points of the curve.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_object(self, name):
+        """Get an object by name, None if it doesn't exist."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_objects(self):
+        """Get every object, whether in a scene or not."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_scene_objects(self):
+        """Get the objects in the current scene."""
+        raise NotImplementedError
+
+    def get_object_count(self):
+        return len(self.get_objects())
+
+    @abc.abstractmethod
+    def remove_object(self, item):
+        """Remove an object from the scene and the data."""
+        raise NotImplementedError
+
+    def delete(self, item):
+        """Remove an object and everything parented below it."""
+        for child in list(item.children):
+            self.delete(child)
+        self.remove_object(item)
+
+    # Matrices ---
+    def get_matrices(self, items):
+        """Get the world matrices of several objects.
+
+        Returns:
+            numpy.ndarray: (n, 4, 4) world matrices.
+        """
+        return np.array([item.matrix_world for item in items]).reshape(-1, 4, 4)
+
+    @abc.abstractmethod
+    def set_matrices(self, items, matrices):
+        """Set the world matrices of several objects.
+
+        Args:
+            items (list): The objects.
+            matrices (numpy.ndarray): (n, 4, 4) world matrices.
+        """
+        raise NotImplementedError
+
+    # Custom Properties ---
+    def get_property(self, item, key, default=None):
+        return item.get(key, default)
+
+    def set_property(self, item, key, value):
+        item[key] = value
+
+    # Collections ---
+    @abc.abstractmethod
+    def get_scene_collection_name(self):
+        """Get the name of the collection new items are placed in."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def find_collection(self, name):
+        """Get a collection by name, None if it doesn't exist."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def new_collection(self, name):
+        """Create a collection that isn't part of any scene."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_collection(self, name, parent_name=None):
+        """Get a collection, creating it in the scene if need be.
+
+        Args:
+            name (str): The name of the collection.
+            parent_name (str): The collection to create it under, defaults
+                to the scene's master collection.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove_collection(self, collection):
+        raise NotImplementedError
+
+    def link(self, item, collection_name=None):
+        """Add an object to a collection, the scene collection by default."""
+        collection = self.get_collection(
+            collection_name or self.get_scene_collection_name()
+        )
+        if item.name not in collection.objects:
+            collection.objects.link(item)
+
+    def move_to_collection(self, item, collection_name, parent_name=None):
+        """Move an object out of its current collections into another one."""
+        collection = self.get_collection(collection_name, parent_name)
+        for users_collection in list(item.users_collection):
+            if users_collection != collection:
+                users_collection.objects.unlink(item)
+        if item.name not in collection.objects:
+            collection.objects.link(item)
+
+    # Selection ---
+    @abc.abstractmethod
+    def get_selection(self):
+        """Get the selected objects."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def deselect_all(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_active(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set_active(self, item):
+        raise NotImplementedError
+
+    def select(self, selection, add=False):
+        """Select objects, making the last one active.
+
+        Args:
+            selection (list): The objects.
+            add (bool): Keep the current selection.
+        """
+        if not add:
+            self.deselect_all()
+            self.set_active(None)
+        for item in selection:
+            item.select_set(True)
+        if selection:
+            self.set_active(selection[-1])
+
+    # View ---
+    @abc.abstractmethod
+    def refresh(self):
+        """Bring the world matrices up to date."""
+        raise NotImplementedError
+
+    def set_relationship_lines(self, visible):
+        """Show or hide the dashed lines between parents and children."""
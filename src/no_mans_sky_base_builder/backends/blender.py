@@ -0,0 +1,122 @@
+"""The scene backend working on the open Blender scene."""
+import bpy
+import mathutils
+from no_mans_sky_base_builder.backends.base import SceneBackend
+
+
+class BlenderBackend(SceneBackend):
+    """Objects are bpy objects in the current scene."""
+
+    # Objects ---
+    def new_object(self, name, data=None):
+        return bpy.data.objects.new(name, data)
+
+    def new_mesh_object(self, name, file_path=None):
+        if file_path:
+            bpy.ops.import_scene.obj(filepath=file_path, split_mode="OFF")
+            item = bpy.data.objects[bpy.context.selected_objects[0].name]
+            # for convenience if saving obj/mtl files, delete any imported materials
+            item.data.materials.clear()
+            item.select_set(False)
+            return item
+
+        bpy.ops.mesh.primitive_cube_add()
+        item = bpy.data.objects[bpy.context.object.name]
+        item.name = name
+        return item
+
+    def new_curve_object(self, name, points):
+        # make a new curve
+        crv = bpy.data.curves.new("crv", "CURVE")
+        crv.dimensions = "3D"
+
+        # make a new spline in that curve
+        spline = crv.splines.new(type="NURBS")
+
+        # a spline point for each point
+        spline.points.add(len(points) - 1) # theres already one point by default
+
+        # assign the point coordinates to the spline points
+        for p, new_co in zip(spline.points, points):
+            p.co = (list(new_co) + [1.0]) # (add nurbs weight)
+
+        # make a new object with the curve
+        return bpy.data.objects.new(name, crv)
+
+    def get_object(self, name):
+        return bpy.data.objects.get(name)
+
+    def get_objects(self):
+        return bpy.data.objects
+
+    def get_scene_objects(self):
+        return bpy.context.scene.objects
+
+    def remove_object(self, item):
+        bpy.data.objects.remove(item, do_unlink=True)
+
+    def delete(self, item):
+        # Deselect all
+        bpy.ops.object.select_all(action="DESELECT")
+
+        # Select the children too.
+        for part in item.children:
+            part.hide_select = False
+            part.select_set(True)
+
+        item.select_set(True)
+        bpy.ops.object.delete()
+
+    # Matrices ---
+    def set_matrices(self, items, matrices):
+        for item, matrix in zip(items, matrices.tolist()):
+            item.matrix_world = mathutils.Matrix(matrix)
+
+    # Collections ---
+    def get_scene_collection_name(self, scene=None):
+        scene = scene or bpy.context.scene
+        return scene.get("nms_collection", "Collection")
+
+    def find_collection(self, name):
+        return bpy.data.collections.get(name)
+
+    def new_collection(self, name):
+        return bpy.data.collections.new(name)
+
+    def get_collection(self, name, parent_name=None):
+        collection = bpy.data.collections.get(name)
+        if not collection:
+            collection = bpy.data.collections.new(name)
+            if parent_name:
+                parent = self.get_collection(parent_name)
+            else:
+                parent = bpy.context.scene.collection
+            parent.children.link(collection)
+        return collection
+
+    def remove_collection(self, collection):
+        bpy.data.collections.remove(collection)
+
+    # Selection ---
+    def get_selection(self):
+        return list(bpy.context.selected_objects)
+
+    def deselect_all(self):
+        bpy.ops.object.select_all(action="DESELECT")
+
+    def get_active(self):
+        return bpy.context.view_layer.objects.active
+
+    def set_active(self, item):
+        bpy.context.view_layer.objects.active = item
+
+    # View ---
+    def refresh(self):
+        bpy.context.view_layer.update()
+
+    def set_relationship_lines(self, visible):
+        # There is no 3D view when running in the background.
+        space_data = getattr(bpy.context, "space_data", None)
+        overlay = getattr(space_data, "overlay", None)
+        if overlay:
+            overlay.show_relationship_lines = visible
@@ -0,0 +1,436 @@
+"""A scene backend that keeps every object in Python.
+
+Objects carry the same transforms, custom properties, parenting and
+collections as Blender objects but have no geometry, so building a base only
+costs the bookkeeping. OBJ files are never read.
+
+This is a Blender-only fast path. Transforms are mathutils types and the
+builder imports bpy, so it runs in Blender, typically in the background.
+"""
+import re
+from collections import OrderedDict
+
+import mathutils
+from no_mans_sky_base_builder.backends.base import SceneBackend
+
+# Blender style ".001" name suffixes.
+NAME_SUFFIX = re.compile(r"\.\d{3}$")
+
+
+class MemoryData(object):
+    """Stand in for mesh or curve data."""
+
+    def __init__(self, name, data_type="MESH", source=None, points=None):
+        """MemoryData __init__.
+
+        Args:
+            name (str): The name of the data.
+            data_type (str): MESH or CURVE.
+            source (str): The OBJ file the mesh would be read from.
+            points (list): The points of a curve.
+        """
+        self.name = name
+        self.data_type = data_type
+        self.source = source
+        self.points = list(points or [])
+        self.materials = []
+
+    def copy(self):
+        data = MemoryData(self.name, self.data_type, self.source, self.points)
+        data.materials = list(self.materials)
+        return data
+
+
+class MemoryConstraints(list):
+    """Constraints are never evaluated, they are only kept and removed."""
+
+    def new(self, constraint_type):
+        constraint = {"type": constraint_type}
+        self.append(constraint)
+        return constraint
+
+
+class MemoryObjects(object):
+    """The objects linked to a collection."""
+
+    def __init__(self, collection):
+        self.__collection = collection
+        self.__objects = OrderedDict()
+        self.__names = {}
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return item in self.__names
+        return id(item) in self.__objects
+
+    def __iter__(self):
+        return iter(list(self.__objects.values()))
+
+    def __len__(self):
+        return len(self.__objects)
+
+    def get(self, name, default=None):
+        return self.__names.get(name, default)
+
+    def link(self, item):
+        if id(item) not in self.__objects:
+            self.__objects[id(item)] = item
+            self.__names[item.name] = item
+            item.users_collection.append(self.__collection)
+
+    def unlink(self, item):
+        if self.__objects.pop(id(item), None) is not None:
+            self.__names.pop(item.name, None)
+            item.users_collection.remove(self.__collection)
+
+    def rename(self, item, name):
+        """Follow a linked object to its new name."""
+        if self.__names.get(item.name) is item:
+            del self.__names[item.name]
+        self.__names[name] = item
+
+
+class MemoryChildren(OrderedDict):
+    """The child collections of a collection, by name."""
+
+    def link(self, collection):
+        self[collection.name] = collection
+
+
+class MemoryCollection(object):
+    def __init__(self, name):
+        self.name = name
+        self.objects = MemoryObjects(self)
+        self.children = MemoryChildren()
+        self.hide_viewport = False
+        self.hide_select = False
+
+    def __iter__(self):
+        return iter(self.children.values())
+
+
+class MemoryObject(object):
+    """An object with the transforms and properties of a Blender object."""
+
+    def __init__(self, backend, name, data=None):
+        """MemoryObject __init__.
+
+        Args:
+            backend (MemoryBackend): The backend owning the object.
+            name (str): The unique name of the object.
+            data (MemoryData): The object data, None for an empty.
+        """
+        self.__backend = backend
+        self.__name = name
+        self.__properties = {}
+        self.__selected = False
+        self.__parent = None
+        self.__children = OrderedDict()
+        self.data = data
+        self.matrix_parent_inverse = mathutils.Matrix.Identity(4)
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.scale = (1.0, 1.0, 1.0)
+        self.users_collection = []
+        self.constraints = MemoryConstraints()
+        self.animation_data = None
+        self.lock_location = [False, False, False]
+        self.lock_rotation = [False, False, False]
+        self.lock_scale = [False, False, False]
+        self.hide_select = False
+        self.hide_viewport = False
+        self.show_name = False
+        self.use_fake_user = False
+        self.instance_type = "NONE"
+        self.instance_collection = None
+        self.color = (1.0, 1.0, 1.0, 1.0)
+        self.active_material = None
+
+    def __repr__(self):
+        return "<MemoryObject {0}>".format(self.__name)
+
+    # Custom Properties ---
+    def __getitem__(self, key):
+        return self.__properties[key]
+
+    def __setitem__(self, key, value):
+        self.__properties[key] = value
+
+    def __delitem__(self, key):
+        del self.__properties[key]
+
+    def __contains__(self, key):
+        return key in self.__properties
+
+    def get(self, key, default=None):
+        return self.__properties.get(key, default)
+
+    def keys(self):
+        return self.__properties.keys()
+
+    # Properties ---
+    @property
+    def name(self):
+        return self.__name
+
+    @name.setter
+    def name(self, value):
+        self.__name = self.__backend.rename(self, value)
+
+    @property
+    def location(self):
+        return self.__location
+
+    @location.setter
+    def location(self, value):
+        self.__location = mathutils.Vector(value)
+
+    @property
+    def rotation_euler(self):
+        return self.__rotation_euler
+
+    @rotation_euler.setter
+    def rotation_euler(self, value):
+        self.__rotation_euler = mathutils.Euler(value)
+
+    @property
+    def scale(self):
+        return self.__scale
+
+    @scale.setter
+    def scale(self, value):
+        self.__scale = mathutils.Vector(value)
+
+    @property
+    def matrix_basis(self):
+        """mathutils.Matrix: The transform relative to the parent."""
+        scale = mathutils.Matrix.Diagonal(self.__scale).to_4x4()
+        rotation = self.__rotation_euler.to_matrix().to_4x4()
+        return mathutils.Matrix.Translation(self.__location) @ rotation @ scale
+
+    @matrix_basis.setter
+    def matrix_basis(self, value):
+        location, rotation, scale = mathutils.Matrix(value).decompose()
+        self.__location = location
+        self.__rotation_euler = rotation.to_euler()
+        self.__scale = scale
+
+    @property
+    def matrix_world(self):
+        """mathutils.Matrix: The world transform, following the parent."""
+        if self.parent is None:
+            return self.matrix_basis
+        return self.parent.matrix_world @ self.matrix_parent_inverse @ self.matrix_basis
+
+    @matrix_world.setter
+    def matrix_world(self, value):
+        value = mathutils.Matrix(value)
+        if self.parent is not None:
+            parent_matrix = self.parent.matrix_world @ self.matrix_parent_inverse
+            value = parent_matrix.inverted() @ value
+        self.matrix_basis = value
+
+    @property
+    def parent(self):
+        return self.__parent
+
+    @parent.setter
+    def parent(self, value):
+        # Keep the children of both parents in step.
+        if self.__parent is not None:
+            self.__parent.__children.pop(id(self), None)
+        self.__parent = value
+        if value is not None:
+            value.__children[id(self)] = self
+
+    @property
+    def children(self):
+        return list(self.__children.values())
+
+    # Methods ---
+    def select_get(self):
+        return self.__selected
+
+    def select_set(self, state):
+        self.__selected = bool(state)
+
+    def driver_remove(self, data_path, index=-1):
+        return False
+
+    def copy(self):
+        """Copy the object, sharing its data like Blender does.
+
+        The copy isn't linked to any collection.
+        """
+        duplicate = self.__backend.new_object(self.__name, self.data)
+        for key, value in self.__properties.items():
+            duplicate[key] = value
+        duplicate.parent = self.parent
+        duplicate.matrix_parent_inverse = self.matrix_parent_inverse.copy()
+        duplicate.matrix_basis = self.matrix_basis
+        for attribute in (
+                "lock_location", "lock_rotation", "lock_scale",
+                "hide_select", "hide_viewport", "show_name", "instance_type",
+                "instance_collection", "color", "active_material"):
+            value = getattr(self, attribute)
+            setattr(duplicate, attribute, list(value) if isinstance(value, list) else value)
+        return duplicate
+
+
+class MemoryBackend(SceneBackend):
+    """Keeps a single scene of MemoryObjects."""
+
+    headless = True
+    SCENE_COLLECTION = "Collection"
+
+    def __init__(self):
+        """MemoryBackend __init__."""
+        self.clear()
+
+    def clear(self):
+        """Remove every object and collection."""
+        self.__objects = OrderedDict()
+        self.__counters = {}
+        self.__collections = {}
+        self.__active = None
+        self.root = MemoryCollection("Scene Collection")
+
+    def get_unique_name(self, name):
+        """Add a .001 style suffix to a name if it is taken.
+
+        Numbering carries on from the last suffix handed out for the base
+        name, so thousands of parts of one type don't probe every suffix.
+        """
+        if name not in self.__objects:
+            return name
+        base_name = NAME_SUFFIX.sub("", name)
+        index = self.__counters.get(base_name, 0)
+        while True:
+            index += 1
+            unique_name = "{0}.{1:03d}".format(base_name, index)
+            if unique_name not in self.__objects:
+                break
+        self.__counters[base_name] = index
+        return unique_name
+
+    def rename(self, item, name):
+        """Rename an object, keeping names unique.
+
+        Returns:
+            str: The name the object was given.
+        """
+        if self.__objects.get(name) is item:
+            return name
+        self.__objects.pop(item.name, None)
+        name = self.get_unique_name(name)
+        self.__objects[name] = item
+        for collection in item.users_collection:
+            collection.objects.rename(item, name)
+        return name
+
+    # Objects ---
+    def new_object(self, name, data=None):
+        name = self.get_unique_name(name)
+        item = MemoryObject(self, name, data)
+        self.__objects[name] = item
+        return item
+
+    def new_mesh_object(self, name, file_path=None):
+        return self.new_object(name, MemoryData(name, source=file_path))
+
+    def new_curve_object(self, name, points):
+        return self.new_object(name, MemoryData(name, "CURVE", points=points))
+
+    def get_object(self, name):
+        return self.__objects.get(name)
+
+    def get_objects(self):
+        return list(self.__objects.values())
+
+    def get_scene_objects(self):
+        # Only collections reachable from the scene count.
+        scene_collections = set()
+        pending = [self.root]
+        while pending:
+            collection = pending.pop()
+            scene_collections.add(id(collection))
+            pending.extend(collection.children.values())
+        return [
+            item for item in self.__objects.values()
+            if any(id(collection) in scene_collections for collection in item.users_collection)
+        ]
+
+    def get_object_count(self):
+        return len(self.__objects)
+
+    def remove_object(self, item):
+        for collection in list(item.users_collection):
+            collection.objects.unlink(item)
+        for child in item.children:
+            child.parent = None
+        self.__objects.pop(item.name, None)
+        if self.__active is item:
+            self.__active = None
+
+    # Matrices ---
+    def set_matrices(self, items, matrices):
+        for item, matrix in zip(items, matrices.tolist()):
+            item.matrix_world = matrix
+
+    # Collections ---
+    def get_scene_collection_name(self):
+        return self.SCENE_COLLECTION
+
+    def find_collection(self, name):
+        return self.__collections.get(name)
+
+    def new_collection(self, name):
+        collection = MemoryCollection(name)
+        self.__collections[name] = collection
+        return collection
+
+    def get_collection(self, name, parent_name=None):
+        collection = self.__collections.get(name)
+        if not collection:
+            collection = self.new_collection(name)
+            if parent_name:
+                parent = self.get_collection(parent_name)
+            else:
+                parent = self.root
+            parent.children.link(collection)
+        return collection
+
+    def remove_collection(self, collection):
+        for item in list(collection.objects):
+            collection.objects.unlink(item)
+        for parent in [self.root] + list(self.__collections.values()):
+            parent.children.pop(collection.name, None)
+        self.__collections.pop(collection.name, None)
+
+    def link(self, item, collection_name=None):
+        self.get_collection(collection_name or self.SCENE_COLLECTION).objects.link(item)
+
+    def move_to_collection(self, item, collection_name, parent_name=None):
+        collection = self.get_collection(collection_name, parent_name)
+        for users_collection in list(item.users_collection):
+            if users_collection is not collection:
+                users_collection.objects.unlink(item)
+        collection.objects.link(item)
+
+    # Selection ---
+    def get_selection(self):
+        return [item for item in self.__objects.values() if item.select_get()]
+
+    def deselect_all(self):
+        for item in self.__objects.values():
+            item.select_set(False)
+
+    def get_active(self):
+        return self.__active
+
+    def set_active(self, item):
+        self.__active = item
+
+    # View ---
+    def refresh(self):
+        """Matrices are always up to date."""
@@ -8,6 +8,13 @@ import time
 from collections import defaultdict
 
 import bpy
+import mathutils
+import numpy as np
+from mathutils.bvhtree import BVHTree
+import no_mans_sky_base_builder.backends as backends
+import no_mans_sky_base_builder.catalog as catalog
+import no_mans_sky_base_builder.document as document
+import no_mans_sky_base_builder.overlap as overlap
 import no_mans_sky_base_builder.part as part
 import no_mans_sky_base_builder.part_overrides.air_lock_connector as air_lock_connector
 import no_mans_sky_base_builder.part_overrides.base_flag as base_flag
@@ -23,7 +30,12 @@ import no_mans_sky_base_builder.part_overrides.u_portalline as u_portalline
 import no_mans_sky_base_builder.part_overrides.u_powerline as u_powerline
 import no_mans_sky_base_builder.part_overrides.bytebeatswitch as bytebeatswitch
 import no_mans_sky_base_builder.preset as preset
+import no_mans_sky_base_builder.search as search
 import no_mans_sky_base_builder.utils.blend_utils as blend_utils
+import no_mans_sky_base_builder.utils.line_batch as line_batch
+import no_mans_sky_base_builder.utils.line_solver as line_solver
+import no_mans_sky_base_builder.utils.material as _material
+import no_mans_sky_base_builder.utils.profiler as profiler
 import no_mans_sky_base_builder.utils.python as python_utils
 
 
@@ -37,6 +49,12 @@ class Builder(object):
     MODS_PATH = os.path.join(USER_PATH, "mods")
     PRESET_PATH = os.path.join(USER_PATH, "presets")
 
+    # Presets are edited in a scene of their own.
+    EDIT_SCENE = "NMS_PRESET_EDIT"
+    EDIT_SCENE_PROPERTY = "nms_edit_preset"
+    # Set on scenes whose ghosted parts are all in ghosted collections.
+    GHOSTED_FILED_PROPERTY = "nms_ghosted_filed"
+
     # Load in nice name information.
     nice_name_dictionary = python_utils.load_dictionary(NICE_JSON)
 
@@ -62,44 +80,36 @@ class Builder(object):
         self.__part_cache = {}
         self.__preset_cache = {}
 
+        # Optional driver-free rigging for lines.
+        self.line_solver = line_solver.LineSolver()
+        # Optional single mesh display of lines.
+        self.line_batch = line_batch.LineBatch()
+        # Creates power control points.
+        self.control_factory = power_control.ControlPointFactory(self)
+        # Place presets as instances of a shared collection.
+        self.preset_instancing = False
+        # Search over parts and presets, built on first use.
+        self.search_index = search.SearchIndex()
+        self.__indexed_presets = None
+
         # Construct category and OBJ reference.
-        # Create default part pack.
-        self.available_packs = [("Parts", self.MODEL_PATH)]
-
-        # Find any mods with model packs inside.
-        if os.path.exists(self.MODS_PATH):
-            mod_folders = os.listdir(self.MODS_PATH)
-            for mod_folder in mod_folders:
-                full_mod_path = os.path.join(self.MODS_PATH, mod_folder)
-                if "models" in os.listdir(full_mod_path):
-                    full_model_path = os.path.join(
-                        self.MODS_PATH,
-                        mod_folder,
-                        "models"
-                    )
-                    self.available_packs.append((mod_folder, full_model_path))
-
-        # Find Parts and build a reference dictionary.
-        self.part_reference = {}
-        for (pack_name, pack_folder) in self.available_packs:
-            for category in self.get_categories(pack=pack_name):
-                parts = self.get_objs_from_category(category, pack=pack_name)
-                for part in parts:
-                    # Get Unique ID.
-                    unique_id = os.path.splitext(part)[0]
-                    # Construct full path.
-                    search_path = pack_folder or self.MODEL_PATH
-                    part_path = os.path.join(search_path, category, part)
-                    # Place part information into reference.
-                    self.part_reference[unique_id] = {
-                        "category": category,
-                        "full_path": part_path,
-                        "pack": pack_name
-                    }
+        self.catalog = catalog.PartCatalog(self.MODEL_PATH, self.MODS_PATH)
+        self.available_packs = self.catalog.available_packs
+        self.part_reference = self.catalog.part_reference
+        # Resolved nice names.
+        self.__nice_names = {}
+
+    @property
+    def backend(self):
+        """SceneBackend: The backend objects are created through."""
+        return backends.get_backend()
 
     def clear_caches(self):
         """Clear all the caches we use in this class."""
         self.__part_cache.clear()
+        self.line_solver.clear()
+        self.line_batch.clear()
+        self.control_factory.clear()
 
     def add_to_part_cache(self, object_id, bpy_object):
         """Add item to part cache."""
@@ -114,10 +124,12 @@ class Builder(object):
         part_name = self.__part_cache.get(object_id, None)
         # Return None if not found.
         if not part_name:
+            profiler.record_cache("part_cache", False)
             return None
         # If something is found, we need to check if it still exists.
-        if part_name in bpy.data.objects:
-            bpy_object = bpy.data.objects[part_name]
+        bpy_object = self.backend.get_object(part_name)
+        profiler.record_cache("part_cache", bpy_object is not None)
+        if bpy_object is not None:
             return self.get_builder_object_from_bpy_object(bpy_object)
         # If all fails, return None.
         return None
@@ -126,6 +138,7 @@ class Builder(object):
     def get_part_class(cls, object_id):
         return cls.override_classes.get(object_id, part.Part)
 
+    @profiler.instrument()
     def get_builder_object_from_bpy_object(self, bpy_object):
         # Handle Presets.
         if "PresetID" in bpy_object:
@@ -155,10 +168,12 @@ class Builder(object):
         preset_name = self.__part_cache.get(preset_id, None)
         # Return None if not found.
         if not preset_name:
+            profiler.record_cache("preset_cache", False)
             return None
         # If something is found, we need to check if it still exists.
-        if preset_name in bpy.data.objects:
-            bpy_object = bpy.data.objects[preset_name]
+        bpy_object = self.backend.get_object(preset_name)
+        profiler.record_cache("preset_cache", bpy_object is not None)
+        if bpy_object is not None:
             return preset.Preset.deserialise_from_object(
                 bpy_object=bpy_object,
                 builder_object=self
@@ -177,12 +192,16 @@ class Builder(object):
         skip_object_type = skip_object_type or []
             
         # Get all individual NMS parts.
-        flat_parts = [part for part in bpy.data.objects if "ObjectID" in part]
+        scene_objects = self.backend.get_scene_objects()
+        flat_parts = [
+            part for part in scene_objects
+            if "ObjectID" in part and "preset_prototype" not in part
+        ]
         flat_parts = [part for part in flat_parts if part["ObjectID"] not in skip_object_type]
 
         # Include line conatrol points?
         if include_lines:
-            flat_parts.extend([part for part in bpy.data.objects if "SnapID" in part and not "ObjectID" in part])
+            flat_parts.extend([part for part in scene_objects if "SnapID" in part and not "ObjectID" in part])
 
         # If exclude presets is on, just return the top level objects.
         if exclude_presets:
@@ -193,7 +212,7 @@ class Builder(object):
 
     def get_all_presets(self):
         """Get all Builder preset items in the scene."""
-        return [part for part in bpy.data.objects if "PresetID" in part]
+        return [part for part in self.backend.get_scene_objects() if "PresetID" in part]
 
     def add_part(self, object_id, user_data=None, build_rigs=True):
         """Add an item based on it's object ID."""
@@ -212,6 +231,7 @@ class Builder(object):
         return item
  
     # Serialising ---
+    @profiler.instrument()
     def serialise(self, get_presets=False, add_timestamp=False):
         """Return NMS compatible dictionary.
 
@@ -230,6 +250,10 @@ class Builder(object):
             item_obj = use_class.deserialise_from_object(item, builder_object=self)
             object_list.append(item_obj.serialise())
 
+        # Instanced presets only exist as flat parts when exporting.
+        if not get_presets:
+            object_list.extend(self.serialise_preset_instances())
+
         # Create full dictionary.
         data = {"Objects": object_list}
 
@@ -249,6 +273,64 @@ class Builder(object):
 
         return data
 
+    def serialise_preset_instances(self):
+        """Realise every instanced preset into flat part data.
+
+        Each prototype part is serialised once and the world matrices of all
+        of its instances are computed in a single batch.
+
+        Returns:
+            list: Dictionaries of part information.
+        """
+        # Group the instances by the prototype they draw.
+        instances = defaultdict(list)
+        for _preset in self.get_all_presets():
+            collection = _preset.instance_collection
+            if _preset.instance_type == "COLLECTION" and collection:
+                instances[collection.name].append(_preset.matrix_world)
+
+        # Bring the matrices from Blender Z-Up space into standard Y-up space.
+        z_compensate = np.array(
+            mathutils.Matrix.Rotation(math.radians(-90.0), 4, "X")
+        )
+
+        object_list = []
+        for collection_name, instance_matrices in instances.items():
+            prototype_parts = [
+                part for part in self.backend.find_collection(collection_name).objects
+                if "ObjectID" in part
+            ]
+            if not prototype_parts:
+                continue
+            part_data = []
+            for item in prototype_parts:
+                use_class = self.get_part_class(item["ObjectID"])
+                item_obj = use_class.deserialise_from_object(item, builder_object=self)
+                part_data.append(item_obj.serialise())
+
+            # (instances, 1, 4, 4) @ (1, parts, 4, 4)
+            part_matrices = np.array([part.matrix_world for part in prototype_parts])
+            world_matrices = np.array(instance_matrices)[:, None] @ part_matrices[None]
+            world_matrices = z_compensate @ world_matrices
+            for instance_world in world_matrices:
+                for data, world in zip(part_data, instance_world):
+                    data = dict(data)
+                    data["Position"] = world[:3, 3].tolist()
+                    data["Up"] = world[:3, 1].tolist()
+                    data["At"] = world[:3, 2].tolist()
+                    object_list.append(data)
+        return object_list
+
+    def remove_preset_prototypes(self):
+        """Remove the hidden collections of instanced presets."""
+        prefix = preset.Preset.PROTOTYPE_COLLECTION.format("")
+        for collection in list(bpy.data.collections):
+            if not collection.name.startswith(prefix):
+                continue
+            for bpy_object in list(collection.objects):
+                bpy.data.objects.remove(bpy_object, do_unlink=True)
+            bpy.data.collections.remove(collection)
+
     def deserialise_from_data(self, data):
         """Given NMS data, reconstruct the base.
         
@@ -257,6 +339,12 @@ class Builder(object):
         # pr = cProfile.Profile()
         # pr.enable()
 
+        # Parse every referenced preset up front, in parallel.
+        preset.Preset.prefetch(
+            preset.Preset.get_preset_id_from_data(preset_data)
+            for preset_data in data.get("Presets", [])
+        )
+
         # Reconstruct objects.
         for part_data in data.get("Objects", []):
             object_id = part_data.get("ObjectID").replace("^", "")
@@ -267,10 +355,12 @@ class Builder(object):
         for preset_data in data.get("Presets", []):
             preset.Preset.deserialise_from_data(preset_data, self)
 
-        # Build Rigs.
-        self.build_rigs()
-        # Optimise control points.
-        self.optimise_control_points()
+        # Rigs only exist in Blender, headless lines keep their matrices.
+        if not self.backend.headless:
+            # Build Rigs.
+            self.build_rigs()
+            # Optimise control points.
+            self.optimise_control_points()
         # pr.disable()
         # pr.print_stats(sort='time')
 
@@ -289,84 +379,499 @@ class Builder(object):
 
     # Category Methods ---
     def get_categories(self, pack=None):
-        """Get the list of categories.
-        
-        Args:
-            pack (str): The model pack search under for categories.
-                Use this for mod support. Defaults to vanilla 'Parts'.
-        Returns:
-            list: List of folders underneath category path.
-        """
-        # Validate Pack name.
-        pack = pack or "Parts"
-        # Get the associated model path.
-        search_path = self.get_model_path_from_pack(pack)
-        return os.listdir(search_path)
+        """Get the list of categories of a pack, see PartCatalog."""
+        return self.catalog.get_categories(pack=pack)
 
     def get_objs_from_category(self, category, pack=None):
-        """Get a list of parts belonging to a category.
-        
-        Args:
-            category (str): The name of the category.
-            pack (str): The model pack search under for categories.
-                Use this for mod support. Defaults to vanilla 'Parts'.
-        """
-        # Validate Pack name.
-        pack = pack or "Parts"
-        # Get the associated model path.
-        search_path = self.get_model_path_from_pack(pack)
-        category_path = os.path.join(search_path, category)
-        all_objs = [
-            part for part in os.listdir(category_path) if part.endswith(".obj")
-        ]
-        file_names = sorted(all_objs)
-        return file_names
+        """Get the OBJ files of a category, see PartCatalog."""
+        return self.catalog.get_objs_from_category(category, pack=pack)
 
     def get_obj_path(self, part):
         """Get the path to the OBJ file from a part."""
-        part_dictionary = self.part_reference.get(part, {})
-        return part_dictionary.get("full_path", None)
+        return self.catalog.get_obj_path(part)
 
     def get_model_path_from_pack(self, pack_request):
-        """Given a pack name, return it's associated path.
-        
-        Args:
-            pack_request (str): The name of the pack
-            
-        Return:
-            str: The model path of the pack.
-        """
-        for pack_name, pack_path in self.available_packs:
-            if pack_name == pack_request:
-                return pack_path
+        """Given a pack name, return it's associated path."""
+        return self.catalog.get_model_path_from_pack(pack_request)
 
     def get_parts_from_category(self, category, pack=None):
-        """Get all the parts from a specific category.
-        
+        """Get all the parts from a specific category, see PartCatalog."""
+        return self.catalog.get_parts_from_category(category, pack=pack)
+
+    def get_part_stats(self, part):
+        """Get the bounds and complexity of a part, see PartCatalog."""
+        return self.catalog.get_part_stats(part)
+
+    def get_world_bounds(self, object_id, matrix_world):
+        """Get the world space bounding box of a part.
+
         Args:
-            category (str): The category to search.
-            pack (str): The model pack name. Defaults to vanilla 'Parts'.
+            object_id (str): The ObjectID of the part.
+            matrix_world (mathutils.Matrix): The Blender matrix of the part.
+
+        Returns:
+            tuple: The lowest and highest corners as mathutils Vectors. Both
+                are the part origin if there are no stats for the part.
         """
-        # Validate pack name.
-        pack = pack or "Parts"
-        parts = []
-        for item, value in self.part_reference.items():
-            # Get pack and category values.
-            part_category = value["category"]
-            part_pack = value["pack"]
-            # Check both are valid.
-            pack_check = part_pack == pack
-            category_check = part_category == category
-            # Add to parts.
-            if pack_check and category_check:
-                parts.append(item)
-        return sorted(parts)
+        stats = self.get_part_stats(object_id)
+        if not stats:
+            origin = matrix_world.to_translation()
+            return origin, origin.copy()
+        # Transform every corner, the box may be turned any way.
+        corners = [
+            matrix_world @ mathutils.Vector((x, y, z))
+            for x in (stats["min"][0], stats["max"][0])
+            for y in (stats["min"][1], stats["max"][1])
+            for z in (stats["min"][2], stats["max"][2])
+        ]
+        low = mathutils.Vector([min(corner[axis] for corner in corners) for axis in range(3)])
+        high = mathutils.Vector([max(corner[axis] for corner in corners) for axis in range(3)])
+        return low, high
 
     def get_nice_name(self, part):
         """Get a nice version of the part id."""
-        part = os.path.basename(part)
-        nice_name = part.title().replace("_", " ")
-        return self.nice_name_dictionary.get(part, nice_name)
+        nice_name = self.__nice_names.get(part)
+        if nice_name is None:
+            part_name = os.path.basename(part)
+            nice_name = self.nice_name_dictionary.get(
+                part_name,
+                part_name.title().replace("_", " ")
+            )
+            self.__nice_names[part] = nice_name
+        return nice_name
+
+    def search(self, query, limit=60):
+        """Search parts and presets by ID, nice name, category and pack.
+
+        Args:
+            query (str): The search text.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list: tuple (str, str): Item ID and item type ("parts" or
+                "presets"), best match first.
+        """
+        if not self.search_index.has_type("parts"):
+            self.search_index.set_items(
+                "parts",
+                [
+                    (part, [part, self.get_nice_name(part), info["category"], info["pack"]])
+                    for part, info in self.part_reference.items()
+                ]
+            )
+
+        # The catalog swaps in a new list whenever the presets change.
+        presets = preset.Preset.CATALOG.get_presets(validate=False)
+        if presets is not self.__indexed_presets:
+            self.search_index.set_items(
+                "presets",
+                [(preset_id, [preset_id, "Presets"]) for preset_id in presets]
+            )
+            self.__indexed_presets = presets
+
+        return self.search_index.search(query, limit=limit)
+
+    def get_part_collection_name(self, object_id, root=None):
+        """Get the collection a part is placed in.
+
+        Parts go into a collection per category under the scene collection.
+        Ghosted parts go into a child of that, so they can be toggled as one.
+
+        Args:
+            object_id (str): The ObjectID of the part.
+            root (str): The scene collection, defaults to the current one.
+
+        Returns:
+            tuple: The collection name and the name of its parent collection.
+        """
+        root = root or blend_utils.get_scene_collection_name()
+        category = self.part_reference.get(object_id, {}).get("category", "other")
+        category_name = "{0}_{1}".format(root, category)
+        if object_id in _material.GHOSTED_ITEMS:
+            return "{0}_GHOSTED".format(category_name), category_name
+        return category_name, root
+
+    def place_in_collection(self, bpy_object, object_id):
+        """Move a part into its category collection.
+
+        Args:
+            bpy_object (bpy.ob): The part object.
+            object_id (str): The ObjectID of the part.
+        """
+        root = blend_utils.get_scene_collection_name()
+        collection_name, parent_name = self.get_part_collection_name(object_id, root)
+        # Make sure the category sits under the scene collection.
+        if parent_name != root:
+            blend_utils.get_collection(parent_name, root)
+        blend_utils.move_to_collection(bpy_object, collection_name, parent_name)
+
+    def get_ghosted_collections(self, root=None):
+        """Get the ghosted collection of every category."""
+        root_collection = self.backend.find_collection(
+            root or blend_utils.get_scene_collection_name()
+        )
+        if not root_collection:
+            return []
+        collections = []
+        for category_collection in root_collection.children:
+            ghosted_name = "{0}_GHOSTED".format(category_collection.name)
+            ghosted = category_collection.children.get(ghosted_name)
+            if ghosted:
+                collections.append(ghosted)
+        return collections
+
+    def set_ghosted_visibility(self, hidden=False, hide_select=False):
+        """Show, hide or lock all ghosted parts through their collections.
+
+        Args:
+            hidden (bool): Hide the ghosted parts.
+            hide_select (bool): Prevent selecting the ghosted parts.
+        """
+        for collection in self.get_ghosted_collections():
+            collection.hide_viewport = hidden
+            collection.hide_select = hide_select
+
+    def file_stray_ghosted_parts(self):
+        """Move ghosted parts from older files into their ghosted collections.
+
+        Files saved before parts were filed by category keep their ghosted
+        parts in the scene collection. They are moved once, on load or save,
+        and the scene flagged, so the room toggle only ever needs the
+        collections.
+
+        Returns:
+            int: The number of parts moved.
+        """
+        scene = bpy.context.scene
+        if scene.get(self.GHOSTED_FILED_PROPERTY):
+            return 0
+        moved = 0
+        for bpy_object in self.backend.get_scene_objects():
+            object_id = bpy_object.get("ObjectID")
+            if object_id not in _material.GHOSTED_ITEMS:
+                continue
+            if any(
+                    collection.name.endswith("_GHOSTED")
+                    for collection in bpy_object.users_collection):
+                continue
+            self.place_in_collection(bpy_object, object_id)
+            # The old toggle hid them one by one, the collection does it now.
+            bpy_object.hide_viewport = False
+            if not bpy_object.get("belongs_to_preset", False):
+                bpy_object.hide_select = False
+            moved += 1
+        scene[self.GHOSTED_FILED_PROPERTY] = True
+        return moved
+
+    def get_category_collection(self, category):
+        """Get the collection of a category, None if it holds no parts yet."""
+        return self.backend.find_collection(
+            "{0}_{1}".format(blend_utils.get_scene_collection_name(), category)
+        )
+
+    def is_category_hidden(self, category):
+        collection = self.get_category_collection(category)
+        return bool(collection) and collection.hide_viewport
+
+    def set_category_visibility(self, category, hidden=False):
+        """Show or hide all parts of a category, ghosted parts included.
+
+        Args:
+            category (str): The category name.
+            hidden (bool): Hide the parts.
+        """
+        collection = self.get_category_collection(category)
+        if collection:
+            collection.hide_viewport = hidden
+
+    def set_room_visibility(self, mode):
+        """Show, ghost or hide the ghosted parts.
+
+        Args:
+            mode (int): 0 is normal, 1 is transparent and unselectable and
+                2 is invisible.
+        """
+        hidden = mode == 2
+        ghosted = mode == 1
+
+        alpha = _material.GHOSTED_ALPHA if ghosted else 1.0
+        _material.set_ghosted_alpha(alpha)
+        # In palette mode the viewport shows the object colour instead, so
+        # the ghosted parts are reached through their collections.
+        if _material.is_palette_mode():
+            for collection in self.get_ghosted_collections():
+                for bpy_object in collection.objects:
+                    bpy_object.color[3] = alpha
+
+        # Ghosted parts live in their own collections.
+        self.set_ghosted_visibility(hidden=hidden, hide_select=ghosted)
+        for bpy_object in self.backend.get_selection():
+            if bpy_object.get("ObjectID") in _material.GHOSTED_ITEMS:
+                bpy_object.select_set(False)
+
+    def get_recolour_targets(self, rule="SELECTED", selection=None):
+        """Resolve a recolour rule into the parts it applies to.
+
+        Args:
+            rule (str): Which parts to recolour.
+                SELECTED - The selection.
+                OBJECT_ID - Parts sharing an ObjectID with the selection.
+                SNAP_GROUP - Parts sharing a snap group with the selection.
+                CATEGORY - Parts sharing a category with the selection.
+                ALL - Every part in the scene.
+            selection (list): The selected blender objects.
+
+        Returns:
+            list: The blender objects to recolour.
+        """
+        selection = selection or []
+        if rule == "SELECTED":
+            return selection
+
+        # Lines and preset parts keep their own materials.
+        parts = self.get_all_parts(
+            exclude_presets=True,
+            skip_object_type=line_batch.LINE_TYPES
+        )
+        if rule == "ALL":
+            return parts
+
+        # Index the parts by the rule key.
+        if rule == "OBJECT_ID":
+            get_key = lambda object_id: object_id
+        elif rule == "SNAP_GROUP":
+            get_key = part.Part.SNAP_GROUP_LOOKUP.get
+        elif rule == "CATEGORY":
+            get_key = lambda object_id: self.part_reference.get(
+                object_id, {}
+            ).get("category")
+        else:
+            raise ValueError("Unknown recolour rule: {0}".format(rule))
+
+        index = defaultdict(list)
+        for bpy_object in parts:
+            index[get_key(bpy_object["ObjectID"])].append(bpy_object)
+
+        keys = {get_key(item["ObjectID"]) for item in selection if "ObjectID" in item}
+        keys.discard(None)
+        return [bpy_object for key in keys for bpy_object in index[key]]
+
+    def recolour(self, colour_index=0, material=None, rule="SELECTED", selection=None):
+        """Recolour every part matched by a rule in one batch.
+
+        Args:
+            colour_index (int): The colour index determined by No Man's Sky.
+            material (str): The material type.
+            rule (str): See get_recolour_targets.
+            selection (list): The selected blender objects.
+
+        Returns:
+            int: The number of parts recoloured.
+        """
+        targets = self.get_recolour_targets(rule, selection)
+        return _material.assign_materials(targets, colour_index, material)
+
+    def use_palette(self, enabled):
+        """Switch all parts between a material per colour and the palette.
+
+        Args:
+            enabled (bool): Share the palette material, coloured by the
+                object colour.
+        """
+        _material.set_palette_mode(enabled)
+
+        # Recolour parts in groups of the same UserData.
+        parts = self.get_all_parts(
+            exclude_presets=True,
+            skip_object_type=line_batch.LINE_TYPES
+        )
+        user_data_groups = defaultdict(list)
+        for bpy_object in parts:
+            user_data_groups[bpy_object.get("UserData", "0")].append(bpy_object)
+        for user_data, items in user_data_groups.items():
+            try:
+                colour_index = int(user_data)
+            except ValueError:
+                colour_index = 0
+            _material.assign_materials(items, colour_index)
+
+    @staticmethod
+    def get_grid_matrices(matrix, column_step, row_step, columns, rows):
+        """Get the world matrices of a grid of repeated steps.
+
+        Args:
+            matrix (mathutils.Matrix): The world matrix of the first item.
+            column_step (mathutils.Matrix): The local offset between columns.
+            row_step (mathutils.Matrix): The local offset between rows.
+            columns (int): The number of columns.
+            rows (int): The number of rows.
+
+        Returns:
+            numpy.ndarray: (rows * columns, 4, 4) world matrices, starting
+                with the first item.
+        """
+        def get_powers(step, count):
+            powers = np.zeros((count, 4, 4))
+            powers[0] = np.identity(4)
+            step = np.array(step)
+            for index in range(1, count):
+                powers[index] = powers[index - 1] @ step
+            return powers
+
+        row_powers = get_powers(row_step, rows)
+        column_powers = get_powers(column_step, columns)
+        # (rows, 1, 4, 4) @ (1, columns, 4, 4)
+        grid = np.array(matrix) @ (row_powers[:, None] @ column_powers[None])
+        return grid.reshape(-1, 4, 4)
+
+    def array(
+            self,
+            bpy_object,
+            columns=1,
+            rows=1,
+            column_key="EAST",
+            row_key="NORTH",
+            spacing=0.0):
+        """Stamp a grid of copies of a part or preset.
+
+        Parts are stepped by their own snap points. Presets are stepped by
+        the bounds of their part meshes plus the spacing.
+
+        Args:
+            bpy_object (bpy.ob): The part or preset to repeat.
+            columns (int): The number of columns.
+            rows (int): The number of rows.
+            column_key (str): The snap point to step along for columns.
+            row_key (str): The snap point to step along for rows.
+            spacing (float): Extra distance between presets.
+
+        Returns:
+            list: The new builder items.
+
+        Raises:
+            ValueError: The part has no snap points along the keys, or the
+                preset has no size to step by.
+        """
+        builder_item = self.get_builder_object_from_bpy_object(bpy_object)
+        if isinstance(builder_item, preset.Preset):
+            bounds = builder_item.get_local_bounds()
+            size = (bounds[1] - bounds[0]) if bounds else mathutils.Vector()
+            if size[0] <= 0.0 or size[1] <= 0.0:
+                raise ValueError(
+                    "{0} has no size to array by.".format(builder_item.preset_id)
+                )
+            column_step = mathutils.Matrix.Translation((size[0] + spacing, 0.0, 0.0))
+            row_step = mathutils.Matrix.Translation((0.0, size[1] + spacing, 0.0))
+        else:
+            column_step = builder_item.get_snap_step(column_key)
+            row_step = builder_item.get_snap_step(row_key)
+            if column_step is None or row_step is None:
+                raise ValueError(
+                    "{0} can't be arrayed along {1} and {2}.".format(
+                        builder_item.object_id, column_key, row_key
+                    )
+                )
+
+        matrices = self.get_grid_matrices(
+            bpy_object.matrix_world, column_step, row_step, columns, rows
+        )
+
+        new_items = []
+        for matrix in matrices[1:].tolist():
+            if isinstance(builder_item, preset.Preset):
+                new_item = self.add_preset(builder_item.preset_id)
+            else:
+                new_item = self.add_part(
+                    builder_item.object_id,
+                    user_data=bpy_object.get("UserData"),
+                    build_rigs=False
+                )
+            new_item.matrix_world = mathutils.Matrix(matrix)
+            new_items.append(new_item)
+        return new_items
+
+    def transform_base(
+            self,
+            translate=(0.0, 0.0, 0.0),
+            rotate=0.0,
+            mirror=None,
+            pivot=(0.0, 0.0, 0.0),
+            selection=None):
+        """Move, rotate and mirror the base in a single batch.
+
+        Parts and presets get new world matrices built from their transformed
+        Up and At vectors, rigged lines are moved through their control
+        points. Everything is given in Blender space.
+
+        Args:
+            translate (tuple): The offset to move by.
+            rotate (float): The angle in degrees to rotate around Z.
+            mirror (str): The axis to mirror along, or None.
+            pivot (tuple): The point to rotate and mirror around.
+            selection (list): The objects to transform, defaults to the
+                whole base.
+
+        Returns:
+            int: The number of objects moved.
+        """
+        if selection is None:
+            selection = self.get_all_parts(exclude_presets=True)
+            selection.extend(self.get_all_presets())
+
+        # Blender X, Y, Z are NMS X, Z, Y.
+        nms_axes = {"X": "X", "Y": "Z", "Z": "Y"}
+        to_nms = document.Y_UP_MATRIX[:3, :3]
+        matrix = document.get_transform_matrix(
+            translate=to_nms @ np.array(translate, dtype=float),
+            rotate=rotate,
+            rotate_axis="Y",
+            mirror=nms_axes.get(mirror),
+            pivot=to_nms @ np.array(pivot, dtype=float)
+        )
+
+        items = []
+        controls = {}
+        for bpy_object in selection:
+            # Parts of a preset follow their control.
+            if bpy_object.get("belongs_to_preset"):
+                continue
+            if "rig_item" in bpy_object:
+                controls[bpy_object.name] = bpy_object
+                continue
+            control_names = [bpy_object.get("start_control"), bpy_object.get("end_control")]
+            line_controls = [self.backend.get_object(name) for name in control_names if name]
+            if line_controls and all(line_controls):
+                controls.update((control.name, control) for control in line_controls)
+                continue
+            if "ObjectID" in bpy_object or "PresetID" in bpy_object:
+                items.append(bpy_object)
+
+        if items:
+            lines = np.array([
+                bpy_object.get("ObjectID", "") in document.LINE_OBJECT_IDS
+                for bpy_object in items
+            ])
+            matrices = document.transform_matrices(
+                np.array([bpy_object.matrix_world for bpy_object in items]),
+                matrix,
+                lines=lines
+            )
+            for bpy_object, world_matrix in zip(items, matrices.tolist()):
+                bpy_object.matrix_world = mathutils.Matrix(world_matrix)
+
+        if controls:
+            # Control points only have a location, in Blender space.
+            blender_matrix = document.Z_UP_MATRIX @ matrix @ document.Y_UP_MATRIX
+            control_list = list(controls.values())
+            locations = np.array([control.matrix_world.translation for control in control_list])
+            locations = locations @ blender_matrix[:3, :3].T + blender_matrix[:3, 3]
+            for control, location in zip(control_list, locations.tolist()):
+                world_matrix = control.matrix_world.copy()
+                world_matrix.translation = location
+                control.matrix_world = world_matrix
+
+        blend_utils.scene_refresh()
+        return len(items) + len(controls)
 
     def save_preset_to_file(self, preset_name):
         # Get a file path.
@@ -377,6 +882,124 @@ class Builder(object):
         # Save to file path
         with open(file_path, "w") as stream:
             json.dump(self.serialise(add_timestamp=True), stream, indent=4)
+        preset.Preset.CATALOG.refresh(force=True)
+        preset.Preset.INDEX.update()
+
+    def edit_preset(self, preset_id):
+        """Open a preset for editing in a scene of its own.
+
+        The base in the current scene is left untouched, the edit scene
+        remembers it so it can be returned to when the edit is closed.
+
+        Args:
+            preset_id (str): The preset to edit.
+
+        Returns:
+            bpy.types.Scene: The edit scene.
+        """
+        base_scene = bpy.context.scene
+        # Close any edit in progress.
+        if self.EDIT_SCENE_PROPERTY in base_scene:
+            base_scene = self.close_preset_edit()
+
+        scene = bpy.data.scenes.new("{0}_{1}".format(self.EDIT_SCENE, preset_id))
+        scene[self.EDIT_SCENE_PROPERTY] = preset_id
+        scene["nms_base_scene"] = base_scene.name
+        scene["nms_collection"] = scene.name
+        bpy.context.window.scene = scene
+
+        # Build the preset as loose parts with their rigs.
+        preset.Preset(
+            preset_id=preset_id,
+            builder_object=self,
+            create_control=False,
+            apply_shader=False,
+            build_rigs=True
+        )
+        self.build_rigs()
+        self.optimise_control_points()
+        return scene
+
+    def save_preset_edit(self):
+        """Save the preset being edited and update everything cached about it.
+
+        Returns:
+            str: The preset ID, None if no preset is being edited.
+        """
+        preset_id = bpy.context.scene.get(self.EDIT_SCENE_PROPERTY)
+        if not preset_id:
+            return None
+        self.save_preset_to_file(preset_id)
+        self.refresh_preset(preset_id)
+        return preset_id
+
+    def close_preset_edit(self):
+        """Remove the edit scene and return to the base.
+
+        Returns:
+            bpy.types.Scene: The base scene, None if no preset is being edited.
+        """
+        scene = bpy.context.scene
+        if self.EDIT_SCENE_PROPERTY not in scene:
+            return None
+
+        base_scene = bpy.data.scenes.get(scene.get("nms_base_scene", ""))
+        if not base_scene:
+            base_scene = next(
+                other for other in bpy.data.scenes
+                if self.EDIT_SCENE_PROPERTY not in other
+            )
+        bpy.context.window.scene = base_scene
+
+        # Remove the edit scene and everything in it, along with its lines
+        # in the line solver and line batch.
+        batched_types = set()
+        for bpy_object in list(scene.objects):
+            object_id = bpy_object.get("ObjectID")
+            if object_id in line_batch.LINE_TYPES:
+                self.line_solver.remove(bpy_object.name)
+                batched_types.add(object_id)
+            elif "line_batch" in bpy_object:
+                batched_types.add(bpy_object["line_batch"])
+            bpy.data.objects.remove(bpy_object, do_unlink=True)
+        # The edit scene took over the batches of its line types.
+        if self.line_batch.enabled:
+            for object_id in batched_types:
+                self.line_batch.rebuild_type(object_id)
+        collection = bpy.data.collections.get(scene.get("nms_collection", ""))
+        collections = [collection] if collection else []
+        for collection in collections:
+            # Include the category collections.
+            collections.extend(collection.children)
+        for collection in reversed(collections):
+            bpy.data.collections.remove(collection)
+        bpy.data.scenes.remove(scene)
+        return base_scene
+
+    def refresh_preset(self, preset_id):
+        """Update the cached copies of a preset after it changed on disk.
+
+        Args:
+            preset_id (str): The preset that changed.
+        """
+        # Stop duplicating the old version.
+        self.__part_cache.pop(preset_id, None)
+
+        # Rebuild the prototype the placed instances draw.
+        collection_name = preset.Preset.PROTOTYPE_COLLECTION.format(preset_id)
+        collection = bpy.data.collections.get(collection_name)
+        if not collection:
+            return
+        for bpy_object in list(collection.objects):
+            bpy.data.objects.remove(bpy_object, do_unlink=True)
+        for bpy_object in bpy.data.objects:
+            if bpy_object.instance_collection == collection:
+                instance = preset.Preset.deserialise_from_object(
+                    bpy_object=bpy_object,
+                    builder_object=self
+                )
+                instance.build_prototype()
+                break
 
     def build_rigs(self):
         """Get all items that require a rig and build them."""
@@ -386,13 +1009,173 @@ class Builder(object):
             builder_object = self.get_builder_object_from_bpy_object(part)
             if hasattr(builder_object, "build_rig"):
                 builder_object.build_rig()
-        
+        self.line_solver.flush()
+
+    def use_line_solver(self, enabled):
+        """Switch the rigs of all lines between drivers and the line solver.
+
+        Args:
+            enabled (bool): Solve lines with the line solver instead of
+                drivers and constraints.
+        """
+        self.line_solver.clear()
+        self.line_solver.enabled = enabled
+
+        # Re-rig every line with its existing controls.
+        for part in self.get_all_parts(exclude_presets=True):
+            if "start_control" not in part:
+                continue
+            power_line = self.get_builder_object_from_bpy_object(part)
+            start = self.backend.get_object(power_line.start_control)
+            end = self.backend.get_object(power_line.end_control)
+            if start and end:
+                power_line.build_rig(start, end)
+
+        self.line_solver.flush()
+        blend_utils.scene_refresh()
+
+    def use_line_batch(self, enabled):
+        """Switch between drawing lines individually or as one mesh per type.
+
+        Args:
+            enabled (bool): Draw all lines of a type as a single mesh.
+        """
+        self.line_batch.enabled = enabled
+        if enabled:
+            blend_utils.scene_refresh()
+            self.line_batch.build()
+        else:
+            self.line_batch.remove()
+
+    @staticmethod
+    def get_overlap_tree(bpy_object, tolerance=0.0):
+        """Build a world space BVH tree of an object's mesh.
+
+        The mesh is shrunk by the tolerance on every side first, so faces
+        that only touch don't count as intersecting.
+
+        Returns:
+            BVHTree: The tree, None for objects without a mesh.
+        """
+        mesh = getattr(bpy_object, "data", None)
+        if not hasattr(mesh, "polygons") or not len(mesh.vertices):
+            return None
+        vertices = np.empty(len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", vertices)
+        vertices = vertices.reshape(-1, 3)
+        low, high = vertices.min(axis=0), vertices.max(axis=0)
+        size = high - low
+        scale = np.ones(3)
+        np.divide(np.maximum(size - tolerance * 2.0, 0.0), size, out=scale, where=size > 0.0)
+        centre = (low + high) * 0.5
+        vertices = (vertices - centre) * scale + centre
+
+        matrix = np.array(bpy_object.matrix_world)
+        vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+        polygons = [tuple(polygon.vertices) for polygon in mesh.polygons]
+        return BVHTree.FromPolygons(vertices.tolist(), polygons)
+
+    def find_overlaps(self, items=None, tolerance=0.01):
+        """Find parts that intersect or are stacked on each other.
+
+        Boxes from the catalog stats narrow the search down to neighbouring
+        parts, then only those pairs are checked mesh against mesh. Lines are
+        skipped, they meet their parts by design.
+
+        Args:
+            items (list): The objects to check, all parts by default.
+            tolerance (float): How far parts may sink into each other before
+                they count as intersecting.
+
+        Returns:
+            list: (bpy object, bpy object) pairs.
+        """
+        if items is None:
+            items = self.get_all_parts()
+        items = [
+            item for item in items
+            if "ObjectID" in item
+            and not issubclass(self.get_part_class(item["ObjectID"]), line.Line)
+        ]
+        if len(items) < 2:
+            return []
+
+        lows = []
+        highs = []
+        for item in items:
+            stats = self.get_part_stats(item["ObjectID"])
+            if stats:
+                lows.append(stats["min"])
+                highs.append(stats["max"])
+            else:
+                # Parts without an OBJ file are built as the default cube.
+                lows.append((-1.0, -1.0, -1.0))
+                highs.append((1.0, 1.0, 1.0))
+        matrices = self.backend.get_matrices(items)
+        world_lows, world_highs = overlap.get_world_bounds(
+            matrices,
+            np.array(lows),
+            np.array(highs)
+        )
+        pairs = overlap.get_candidate_pairs(world_lows, world_highs, tolerance=tolerance)
+
+        # Check the candidates against the meshes, building each tree once.
+        trees = {}
+        overlapping = []
+        for first, second in pairs.tolist():
+            first_item, second_item = items[first], items[second]
+            # Copies of a part on top of each other.
+            stacked = (
+                first_item["ObjectID"] == second_item["ObjectID"]
+                and np.allclose(matrices[first], matrices[second], atol=tolerance)
+            )
+            if not stacked:
+                for index in (first, second):
+                    if index not in trees:
+                        trees[index] = self.get_overlap_tree(items[index], tolerance)
+                # Without meshes the boxes are all there is to go on.
+                if trees[first] and trees[second] and not trees[first].overlap(trees[second]):
+                    continue
+            overlapping.append((first_item, second_item))
+        return overlapping
+
+    def get_floating_controls(self):
+        """Find the line controls that aren't connected to anything.
+
+        A control is floating when no part sits on it and fewer than two
+        lines meet at it.
+
+        Returns:
+            list: The control objects.
+        """
+        floating = []
+        for part in self.get_all_parts(include_lines=True):
+            if not "SnapID" in part:
+                continue
+            part = self.get_builder_object_from_bpy_object(part)
+            if part.snap_id != "POWER_CONTROL":
+                continue
+            is_connected_to_object = False
+            num_line_connections = 0
+            for target in part.get_connected_snapped_objects("POWER", include_lines=False):
+                if not hasattr(target, "start_control"):
+                    is_connected_to_object = True
+                    break
+                else:
+                    num_line_connections += 1
+
+            if not is_connected_to_object and num_line_connections < 2:
+                floating.append(part.object)
+        return floating
+
     def optimise_control_points(self):
         """Find all control points that share the same location and combine them."""
         blend_utils.scene_refresh()
 
         # First build a dictionary of controls that match.
-        power_control_objects = [obj for obj in bpy.data.objects if "rig_item" in obj]
+        power_control_objects = [
+            obj for obj in self.backend.get_scene_objects() if "rig_item" in obj
+        ]
         power_control_reference = defaultdict(list)
         for power_control in power_control_objects:
             # Create a key that will group the controls based on their location.
@@ -430,3 +1213,5 @@ class Builder(object):
                 
                 # Hide away control.
                 blend_utils.remove_object(control.name)
+
+        self.line_solver.flush()
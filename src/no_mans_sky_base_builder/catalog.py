@@ -0,0 +1,301 @@
+"""The catalog of parts available in the model folder and mods.
+
+Nothing in here depends on Blender, so the command line tools can use the
+same part reference as the add-on.
+"""
+import json
+import os
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+FILE_PATH = os.path.dirname(os.path.realpath(__file__))
+USER_PATH = os.path.join(os.path.expanduser("~"), "NoMansSkyBaseBuilder")
+MODEL_PATH = os.path.join(FILE_PATH, "models")
+MODS_PATH = os.path.join(USER_PATH, "mods")
+STATS_PATH = os.path.join(USER_PATH, "part_stats.json")
+# Bump when the stats change shape, to throw old cache files away.
+STATS_VERSION = 1
+
+
+def read_obj_stats(obj_path):
+    """Measure an OBJ file without building a mesh.
+
+    Coordinates are in the OBJ's own axes, which are the part's Y up NMS
+    axes, so they apply directly to the part's right, up and at vectors.
+
+    Args:
+        obj_path (str): The path to the OBJ file.
+
+    Returns:
+        dict: The "min" and "max" corners of the bounding box, the
+            "vertex_count", the "face_count" and the "footprint", the area
+            of the bounding box on the X/Z ground plane.
+    """
+    vertices = []
+    face_count = 0
+    with open(obj_path, "r") as stream:
+        for line in stream:
+            if line.startswith("v "):
+                # Some exporters add vertex colours after the position.
+                vertices.append(line.split()[1:4])
+            elif line.startswith("f "):
+                face_count += 1
+
+    if vertices:
+        vertices = np.array(vertices, dtype=float)
+        low = vertices.min(axis=0)
+        high = vertices.max(axis=0)
+    else:
+        low = high = np.zeros(3)
+    size = high - low
+    return {
+        "min": low.tolist(),
+        "max": high.tolist(),
+        "vertex_count": len(vertices),
+        "face_count": face_count,
+        "footprint": float(size[0] * size[2]),
+    }
+
+
+class PartStatsCache(object):
+    """The stats of every OBJ file, kept in a json file between sessions.
+
+    Files are measured the first time any stats are asked for, after that
+    only new or modified OBJ files are read again.
+    """
+
+    def __init__(self, path=STATS_PATH):
+        """PartStatsCache __init__.
+
+        Args:
+            path (str): The json file to keep the stats in, None to only
+                keep them in memory.
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__stats = None
+
+    def load(self):
+        """Read the cached stats from disk.
+
+        Returns:
+            dict: OBJ path to (mtime, size, stats).
+        """
+        if not self.path or not os.path.isfile(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != STATS_VERSION:
+            return {}
+        return {
+            obj_path: tuple(entry)
+            for obj_path, entry in data.get("files", {}).items()
+        }
+
+    def save(self):
+        """Write the stats to disk, failing quietly if the folder is locked."""
+        if not self.path:
+            return
+        data = {"version": STATS_VERSION, "files": self.__stats}
+        try:
+            folder = os.path.dirname(self.path)
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+            with open(self.path, "w") as stream:
+                json.dump(data, stream)
+        except OSError:
+            pass
+
+    def update(self, obj_paths):
+        """Measure the OBJ files that are missing or out of date.
+
+        Args:
+            obj_paths (list): The OBJ files the catalog knows about.
+
+        Returns:
+            int: The number of files measured.
+        """
+        with self.__lock:
+            if self.__stats is None:
+                self.__stats = self.load()
+            measured = 0
+            for obj_path in obj_paths:
+                try:
+                    status = os.stat(obj_path)
+                except OSError:
+                    continue
+                entry = self.__stats.get(obj_path)
+                if entry and entry[0] == status.st_mtime_ns and entry[1] == status.st_size:
+                    continue
+                try:
+                    stats = read_obj_stats(obj_path)
+                except (OSError, ValueError):
+                    continue
+                self.__stats[obj_path] = (status.st_mtime_ns, status.st_size, stats)
+                measured += 1
+            if measured:
+                self.save()
+            return measured
+
+    def get(self, obj_path):
+        """Get the stats of an OBJ file measured by update()."""
+        entry = (self.__stats or {}).get(obj_path)
+        return entry[2] if entry else None
+
+
+class PartCatalog(object):
+    """Parts grouped by pack and category, found from the OBJ folders."""
+
+    def __init__(self, model_path=MODEL_PATH, mods_path=MODS_PATH, stats_path=STATS_PATH):
+        """PartCatalog __init__.
+
+        Args:
+            model_path (str): The folder of vanilla models.
+            mods_path (str): The folder of mods, each mod with model packs
+                has a "models" folder inside.
+            stats_path (str): The json file caching the part stats.
+        """
+        self.model_path = model_path
+        self.stats = PartStatsCache(stats_path)
+        self.__stats_ready = False
+        # Create default part pack.
+        self.available_packs = [("Parts", model_path)]
+
+        # Find any mods with model packs inside.
+        if mods_path and os.path.exists(mods_path):
+            for mod_folder in os.listdir(mods_path):
+                full_mod_path = os.path.join(mods_path, mod_folder)
+                if not os.path.isdir(full_mod_path):
+                    continue
+                if "models" in os.listdir(full_mod_path):
+                    full_model_path = os.path.join(full_mod_path, "models")
+                    self.available_packs.append((mod_folder, full_model_path))
+
+        # Find Parts and build a reference dictionary.
+        self.part_reference = {}
+        # The sorted parts of each pack category.
+        self.__category_parts = defaultdict(list)
+        for (pack_name, pack_folder) in self.available_packs:
+            for category in self.get_categories(pack=pack_name):
+                parts = self.get_objs_from_category(category, pack=pack_name)
+                for part in parts:
+                    # Get Unique ID.
+                    unique_id = os.path.splitext(part)[0]
+                    # Construct full path.
+                    search_path = pack_folder or model_path
+                    part_path = os.path.join(search_path, category, part)
+                    # Place part information into reference.
+                    self.part_reference[unique_id] = {
+                        "category": category,
+                        "full_path": part_path,
+                        "pack": pack_name
+                    }
+                    self.__category_parts[(pack_name, category)].append(unique_id)
+
+        # Sort the category lists once up front.
+        for category_parts in self.__category_parts.values():
+            category_parts.sort()
+
+    def __contains__(self, part):
+        return part in self.part_reference
+
+    def get_categories(self, pack=None):
+        """Get the list of categories.
+        
+        Args:
+            pack (str): The model pack search under for categories.
+                Use this for mod support. Defaults to vanilla 'Parts'.
+        Returns:
+            list: List of folders underneath category path.
+        """
+        # Validate Pack name.
+        pack = pack or "Parts"
+        # Get the associated model path.
+        search_path = self.get_model_path_from_pack(pack)
+        if not search_path or not os.path.isdir(search_path):
+            return []
+        return [
+            category for category in os.listdir(search_path)
+            if os.path.isdir(os.path.join(search_path, category))
+        ]
+
+    def get_objs_from_category(self, category, pack=None):
+        """Get a list of parts belonging to a category.
+        
+        Args:
+            category (str): The name of the category.
+            pack (str): The model pack search under for categories.
+                Use this for mod support. Defaults to vanilla 'Parts'.
+        """
+        # Validate Pack name.
+        pack = pack or "Parts"
+        # Get the associated model path.
+        search_path = self.get_model_path_from_pack(pack)
+        category_path = os.path.join(search_path, category)
+        all_objs = [
+            part for part in os.listdir(category_path) if part.endswith(".obj")
+        ]
+        return sorted(all_objs)
+
+    def get_obj_path(self, part):
+        """Get the path to the OBJ file from a part."""
+        part_dictionary = self.part_reference.get(part, {})
+        return part_dictionary.get("full_path", None)
+
+    def get_model_path_from_pack(self, pack_request):
+        """Given a pack name, return it's associated path.
+        
+        Args:
+            pack_request (str): The name of the pack
+            
+        Return:
+            str: The model path of the pack.
+        """
+        for pack_name, pack_path in self.available_packs:
+            if pack_name == pack_request:
+                return pack_path
+
+    def get_parts_from_category(self, category, pack=None):
+        """Get all the parts from a specific category.
+        
+        Args:
+            category (str): The category to search.
+            pack (str): The model pack name. Defaults to vanilla 'Parts'.
+        """
+        # Validate pack name.
+        pack = pack or "Parts"
+        return list(self.__category_parts.get((pack, category), []))
+
+    def update_stats(self):
+        """Measure every part that hasn't been measured yet.
+
+        Returns:
+            int: The number of OBJ files read.
+        """
+        obj_paths = [part["full_path"] for part in self.part_reference.values()]
+        measured = self.stats.update(obj_paths)
+        self.__stats_ready = True
+        return measured
+
+    def get_part_stats(self, part):
+        """Get the bounding box, vertex and face counts and footprint of a part.
+
+        The first call measures the whole catalog, see read_obj_stats.
+
+        Args:
+            part (str): The ObjectID of the part.
+
+        Returns:
+            dict: The stats, None for parts without an OBJ file.
+        """
+        obj_path = self.get_obj_path(part)
+        if not obj_path:
+            return None
+        if not self.__stats_ready:
+            self.update_stats()
+        return self.stats.get(obj_path)
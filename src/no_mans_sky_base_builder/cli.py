@@ -0,0 +1,569 @@
+"""Process base and preset files without Blender.
+
+Usage::
+
+    python -m no_mans_sky_base_builder.cli validate ./bases
+    python -m no_mans_sky_base_builder.cli stats ./presets --json
+    python -m no_mans_sky_base_builder.cli compact ./bases -o ./compacted
+    python -m no_mans_sky_base_builder.cli convert base.json -o ./flat
+    python -m no_mans_sky_base_builder.cli merge a.json b.json -o merged.json
+    python -m no_mans_sky_base_builder.cli transform base.json --rotate 90 -o ./moved
+
+Directories are searched for json files and the files are spread over a
+pool of processes. The exit code is 1 if any file has a problem.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import no_mans_sky_base_builder.catalog as catalog
+import no_mans_sky_base_builder.document as document
+
+PRESET_PATH = os.path.join(catalog.USER_PATH, "presets")
+
+# The part IDs each worker validates against, set by init_worker.
+_known_parts = frozenset()
+
+
+class ProcessError(Exception):
+    """A file could not be processed."""
+
+
+def init_worker(known_parts):
+    """Hand the catalog part IDs to a worker process."""
+    global _known_parts
+    _known_parts = frozenset(known_parts)
+
+
+def find_files(paths):
+    """Expand directories into the json files inside them.
+
+    Args:
+        paths (list): File and directory paths.
+
+    Returns:
+        list: The json file paths, sorted within each directory.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, file_names in sorted(os.walk(path)):
+                files.extend(
+                    os.path.join(folder, file_name)
+                    for file_name in sorted(file_names)
+                    if file_name.endswith(".json")
+                )
+        else:
+            files.append(path)
+    return files
+
+
+def load_document(file_path):
+    """Load a document, raising ProcessError for unreadable files."""
+    try:
+        with open(file_path, "r") as stream:
+            data = json.load(stream)
+    except (OSError, ValueError) as error:
+        raise ProcessError(str(error))
+    if not isinstance(data, dict) or not isinstance(data.get("Objects"), list):
+        raise ProcessError("No Objects list found.")
+    try:
+        return document.BaseDocument.from_data(data)
+    except (TypeError, ValueError) as error:
+        raise ProcessError("Malformed part data: {0}".format(error))
+
+
+def get_output_paths(paths, output):
+    """Decide where each input file is written in the output folder.
+
+    Files found in a directory keep their path relative to that directory,
+    files given directly are written by name.
+
+    Args:
+        paths (list): File and directory paths.
+        output (str): The output folder.
+
+    Returns:
+        dict: Input file to output file, each input file once.
+
+    Raises:
+        ProcessError: Two input files would be written to the same file.
+    """
+    output_paths = {}
+    written = {}
+    for path in paths:
+        if os.path.isdir(path):
+            relative_paths = [
+                (file_path, os.path.relpath(file_path, path))
+                for file_path in find_files([path])
+            ]
+        else:
+            relative_paths = [(path, os.path.basename(path))]
+        for file_path, relative_path in relative_paths:
+            if file_path in output_paths:
+                continue
+            output_path = os.path.normpath(os.path.join(output, relative_path))
+            if output_path in written:
+                raise ProcessError(
+                    "{0} and {1} would both be written to {2}.".format(
+                        written[output_path], file_path, output_path
+                    )
+                )
+            written[output_path] = file_path
+            output_paths[file_path] = output_path
+    return output_paths
+
+
+def get_output_path(file_path, args):
+    """Get where a processed file is written, making its folder if needed.
+
+    Args:
+        file_path (str): The input file.
+        args (argparse.Namespace): The output_paths from get_output_paths,
+            or in_place to overwrite the input file instead.
+    """
+    if args.in_place:
+        return file_path
+    output_path = args.output_paths[file_path]
+    folder = os.path.dirname(output_path)
+    # Workers may make the same folder at once.
+    os.makedirs(folder, exist_ok=True)
+    return output_path
+
+
+def save_document(base_document, file_path, indent=None, precision=None):
+    """Save a document, optionally without whitespace and rounded."""
+    data = base_document.to_data()
+    if precision is not None:
+        for item in data["Objects"] + data.get("Presets", []):
+            for key in ("Position", "Up", "At"):
+                item[key] = [round(value, precision) for value in item[key]]
+    separators = (",", ":") if indent is None else None
+    with open(file_path, "w") as stream:
+        json.dump(data, stream, indent=indent, separators=separators)
+
+
+def get_duplicate_mask(base_document, precision=4):
+    """Find parts that exactly overlap an earlier part with the same ID.
+
+    Returns:
+        numpy.ndarray: (n,) True for the duplicates.
+    """
+    if not len(base_document):
+        return np.zeros(0, dtype=bool)
+    keys = np.column_stack([
+        base_document.object_ids,
+        np.round(base_document.positions, precision),
+        np.round(base_document.ups, precision),
+        np.round(base_document.ats, precision),
+    ])
+    _, first_rows = np.unique(keys, axis=0, return_index=True)
+    mask = np.ones(len(base_document), dtype=bool)
+    mask[first_rows] = False
+    return mask
+
+
+def clear_presets(base_document):
+    """Remove every preset from a document."""
+    base_document.preset_ids = []
+    base_document.preset_positions = np.zeros((0, 3))
+    base_document.preset_ups = np.zeros((0, 3))
+    base_document.preset_ats = np.zeros((0, 3))
+
+
+def flatten_presets(base_document, preset_path):
+    """Replace the presets of a document with the parts they contain.
+
+    Args:
+        base_document (BaseDocument): The document, changed in place.
+        preset_path (str): The folder containing the preset files.
+
+    Raises:
+        ProcessError: A preset could not be found.
+    """
+    preset_matrices = base_document.get_preset_matrices()
+    for preset_id in set(base_document.preset_ids):
+        preset_file = os.path.join(preset_path, preset_id + ".json")
+        if not os.path.isfile(preset_file):
+            raise ProcessError("Preset {0} not found.".format(preset_id))
+        preset_document = load_document(preset_file)
+        clear_presets(preset_document)
+        rows = [
+            row for row, row_id in enumerate(base_document.preset_ids)
+            if row_id == preset_id
+        ]
+        # (presets, 1, 4, 4) @ (1, parts, 4, 4), as if parented to the preset.
+        local_matrices = preset_document.get_matrices()
+        world_matrices = preset_matrices[rows][:, None] @ local_matrices[None]
+        for instance_world in world_matrices:
+            instance = preset_document.take(slice(None))
+            instance.set_matrices(instance_world)
+            base_document.extend(instance)
+    clear_presets(base_document)
+
+
+# Workers ---
+# Each worker takes a tuple of a file path and the parsed arguments, and
+# returns the file path, a list of problems and a result.
+def validate_file(job):
+    """Check a file for unknown parts and broken vectors."""
+    file_path, args = job
+    try:
+        base_document = load_document(file_path)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+    problems = []
+    if _known_parts:
+        unknown = sorted(set(base_document.string_table) - _known_parts)
+        if unknown:
+            problems.append("Unknown ObjectIDs: {0}".format(", ".join(unknown)))
+
+    for name, values in (
+            ("Position", base_document.positions),
+            ("Up", base_document.ups),
+            ("At", base_document.ats)):
+        bad_rows = np.flatnonzero(~np.isfinite(values).all(axis=1))
+        if len(bad_rows):
+            problems.append("{0} parts have a non finite {1}.".format(len(bad_rows), name))
+
+    # Parts need a usable rotation, lines may be zero length.
+    parts = ~base_document.get_line_mask()
+    right = np.cross(base_document.ats, base_document.ups)
+    degenerate = parts & (np.linalg.norm(right, axis=1) < 1e-6)
+    if degenerate.any():
+        problems.append("{0} parts have parallel or zero Up and At vectors.".format(
+            int(degenerate.sum())
+        ))
+
+    if args.presets:
+        missing = sorted(
+            preset_id for preset_id in set(base_document.preset_ids)
+            if not os.path.isfile(os.path.join(args.presets, preset_id + ".json"))
+        )
+        if missing:
+            problems.append("Missing presets: {0}".format(", ".join(missing)))
+
+    duplicates = int(get_duplicate_mask(base_document).sum())
+    return file_path, problems, {"duplicates": duplicates}
+
+
+def stats_file(job):
+    """Gather the part counts and bounds of a file."""
+    file_path, args = job
+    try:
+        base_document = load_document(file_path)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+    bounds = base_document.get_bounds()
+    return file_path, [], {
+        "part_count": len(base_document),
+        "line_count": int(base_document.get_line_mask().sum()),
+        "preset_count": base_document.preset_count,
+        "object_ids": base_document.get_histogram(),
+        "bounds": bounds.tolist(),
+        "size": float((bounds[1] - bounds[0]).max()),
+    }
+
+
+def compact_file(job):
+    """Remove duplicate parts and save without whitespace."""
+    file_path, args = job
+    try:
+        base_document = load_document(file_path)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+    duplicates = get_duplicate_mask(base_document)
+    if duplicates.any():
+        base_document = base_document.take(~duplicates)
+    output_path = get_output_path(file_path, args)
+    save_document(base_document, output_path, precision=args.precision)
+    return file_path, [], {"removed": int(duplicates.sum()), "output": output_path}
+
+
+def convert_file(job):
+    """Flatten presets into parts and rewrite the file."""
+    file_path, args = job
+    try:
+        base_document = load_document(file_path)
+        preset_count = base_document.preset_count
+        if args.flatten:
+            flatten_presets(base_document, args.presets)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+    output_path = get_output_path(file_path, args)
+    save_document(base_document, output_path, indent=args.indent)
+    return file_path, [], {
+        "flattened": preset_count if args.flatten else 0,
+        "output": output_path
+    }
+
+
+def transform_file(job):
+    """Translate, rotate and mirror every part and preset of a file."""
+    file_path, args = job
+    try:
+        base_document = load_document(file_path)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+    pivot = (0.0, 0.0, 0.0)
+    if args.pivot == "CENTER":
+        pivot = base_document.get_bounds().mean(axis=0)
+    base_document.transform(
+        document.get_transform_matrix(
+            translate=args.translate,
+            rotate=args.rotate,
+            rotate_axis=args.axis,
+            mirror=args.mirror,
+            pivot=pivot
+        )
+    )
+    output_path = get_output_path(file_path, args)
+    save_document(base_document, output_path, indent=args.indent)
+    return file_path, [], {"part_count": len(base_document), "output": output_path}
+
+
+def load_file(job):
+    """Load a file for merging."""
+    file_path, args = job
+    try:
+        return file_path, [], load_document(file_path)
+    except ProcessError as error:
+        return file_path, [str(error)], None
+
+
+# Commands ---
+def run_jobs(worker, files, args, known_parts=()):
+    """Run a worker over files on a process pool.
+
+    Returns:
+        list: The worker results, in the order of the files.
+    """
+    jobs = [(file_path, args) for file_path in files]
+    if args.jobs == 1 or len(jobs) < 2:
+        init_worker(known_parts)
+        return [worker(job) for job in jobs]
+
+    with ProcessPoolExecutor(
+            max_workers=args.jobs or None,
+            initializer=init_worker,
+            initargs=(tuple(known_parts),)) as pool:
+        return list(pool.map(worker, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def report(results, describe):
+    """Print the result of each file.
+
+    Args:
+        results (list): The worker results.
+        describe (callable): Turn a successful result into a line of text.
+
+    Returns:
+        int: The number of files with problems.
+    """
+    failed = 0
+    for file_path, problems, result in results:
+        if problems:
+            failed += 1
+            for problem in problems:
+                print("{0}: {1}".format(file_path, problem))
+        else:
+            print("{0}: {1}".format(file_path, describe(result)))
+    return failed
+
+
+def validate(args, files):
+    known_parts = catalog.PartCatalog(args.models, args.mods).part_reference
+    results = run_jobs(validate_file, files, args, known_parts=known_parts)
+
+    def describe(result):
+        if result["duplicates"]:
+            return "OK ({0} duplicate parts)".format(result["duplicates"])
+        return "OK"
+
+    return report(results, describe)
+
+
+def stats(args, files):
+    results = run_jobs(stats_file, files, args)
+    if args.json:
+        json.dump(
+            {file_path: result for file_path, _, result in results if result},
+            sys.stdout,
+            indent=4
+        )
+        print()
+        return sum(1 for _, problems, _ in results if problems)
+
+    def describe(result):
+        return "{0} parts, {1} lines, {2} presets, {3:.1f}m across".format(
+            result["part_count"],
+            result["line_count"],
+            result["preset_count"],
+            result["size"]
+        )
+
+    failed = report(results, describe)
+    total = sum(result["part_count"] for _, _, result in results if result)
+    print("{0} files, {1} parts".format(len(results), total))
+    return failed
+
+
+def compact(args, files):
+    results = run_jobs(compact_file, files, args)
+    return report(
+        results,
+        lambda result: "removed {0} duplicate parts -> {1}".format(
+            result["removed"], result["output"]
+        )
+    )
+
+
+def convert(args, files):
+    results = run_jobs(convert_file, files, args)
+    return report(
+        results,
+        lambda result: "flattened {0} presets -> {1}".format(
+            result["flattened"], result["output"]
+        )
+    )
+
+
+def transform(args, files):
+    results = run_jobs(transform_file, files, args)
+    return report(
+        results,
+        lambda result: "transformed {0} parts -> {1}".format(
+            result["part_count"], result["output"]
+        )
+    )
+
+
+def merge(args, files):
+    results = run_jobs(load_file, files, args)
+    failed = report(
+        [result for result in results if result[1]],
+        lambda result: ""
+    )
+    if failed:
+        return failed
+
+    documents = [base_document for _, _, base_document in results]
+    merged = documents[0]
+    for base_document in documents[1:]:
+        merged.extend(base_document)
+    save_document(merged, args.output, indent=args.indent)
+    print("Merged {0} files, {1} parts -> {2}".format(
+        len(documents), len(merged), args.output
+    ))
+    return 0
+
+
+COMMANDS = {
+    "validate": validate,
+    "stats": stats,
+    "compact": compact,
+    "convert": convert,
+    "merge": merge,
+    "transform": transform,
+}
+
+
+def get_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="no_mans_sky_base_builder.cli",
+        description="Process No Man's Sky base and preset files."
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=0,
+        help="Number of processes, defaults to the CPU count."
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    def add_command(name, help_text):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("paths", nargs="+", help="Files or directories.")
+        return command
+
+    def add_output(command):
+        destination = command.add_mutually_exclusive_group(required=True)
+        destination.add_argument("-o", "--output", help="The output folder.")
+        destination.add_argument(
+            "--in-place", action="store_true", help="Overwrite the input files."
+        )
+
+    command = add_command("validate", "Check for unknown parts and broken data.")
+    command.add_argument("--models", default=catalog.MODEL_PATH)
+    command.add_argument("--mods", default=catalog.MODS_PATH)
+    command.add_argument(
+        "--presets", default=None,
+        help="Also check that the presets used exist in this folder."
+    )
+
+    command = add_command("stats", "Print part counts and sizes.")
+    command.add_argument("--json", action="store_true", help="Print JSON.")
+
+    command = add_command("compact", "Remove duplicate parts and whitespace.")
+    add_output(command)
+    command.add_argument("--precision", type=int, default=None,
+                         help="Round vectors to this many decimals.")
+
+    command = add_command("convert", "Flatten presets into parts.")
+    add_output(command)
+    command.add_argument("--presets", default=PRESET_PATH)
+    command.add_argument("--no-flatten", dest="flatten", action="store_false",
+                         help="Only reformat the files.")
+    command.add_argument("--indent", type=int, default=4)
+
+    command = add_command("merge", "Merge files into a single base.")
+    command.add_argument("-o", "--output", required=True, help="The output file.")
+    command.add_argument("--indent", type=int, default=4)
+
+    command = add_command("transform", "Move, rotate or mirror whole bases.")
+    add_output(command)
+    command.add_argument("--translate", type=float, nargs=3, default=(0.0, 0.0, 0.0),
+                         metavar=("X", "Y", "Z"), help="The offset, Y is up.")
+    command.add_argument("--rotate", type=float, default=0.0,
+                         help="The angle to rotate by in degrees.")
+    command.add_argument("--axis", choices=sorted(document.AXES), default="Y",
+                         help="The axis to rotate around.")
+    command.add_argument("--mirror", choices=sorted(document.AXES), default=None,
+                         help="The axis to mirror along.")
+    command.add_argument("--pivot", choices=("ORIGIN", "CENTER"), default="ORIGIN",
+                         help="Rotate and mirror around the origin or the base centre.")
+    command.add_argument("--indent", type=int, default=4)
+    return parser
+
+
+def main(argv=None):
+    """Run the command line tool.
+
+    Returns:
+        int: The exit code, 1 if any file had a problem.
+    """
+    args = get_parser().parse_args(argv)
+    files = find_files(args.paths)
+    if not files:
+        print("No json files found.", file=sys.stderr)
+        return 1
+    if getattr(args, "in_place", None) is False:
+        try:
+            args.output_paths = get_output_paths(args.paths, args.output)
+        except ProcessError as error:
+            print(error, file=sys.stderr)
+            return 1
+        files = list(args.output_paths)
+    return 1 if COMMANDS[args.command](args, files) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
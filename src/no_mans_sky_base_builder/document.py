@@ -0,0 +1,549 @@
+"""A No Man's Sky base held as columnar NumPy arrays.
+
+The Blender add-on keeps every part on a Blender object. This module holds
+the same information as arrays instead (an ObjectID string table, positions,
+Up and At vectors, UserData, timestamps, messages and presets) so bases can
+be processed outside of Blender.
+
+The matrix conventions mirror Part, Line and Preset exactly:
+
+* create_matrices_from_vectors matches create_matrix_from_vectors, lines
+  included.
+* get_vectors_from_matrices matches serialise.
+
+Nothing in here depends on Blender.
+"""
+import json
+import math
+import time
+
+import numpy as np
+from no_mans_sky_base_builder.preset_catalog import LINE_OBJECT_IDS
+
+# Part keys stored in columns, anything else is kept per row.
+PART_KEYS = ("ObjectID", "Position", "Up", "At", "Timestamp", "UserData", "Message")
+PRESET_KEYS = ("PresetID", "ObjectID", "Position", "Up", "At")
+
+
+def get_rotation_x(degrees):
+    """Get a 4x4 rotation matrix around the X axis.
+
+    Args:
+        degrees (float): The angle of rotation.
+
+    Returns:
+        numpy.ndarray: The matrix.
+    """
+    radians = math.radians(degrees)
+    cos, sin = math.cos(radians), math.sin(radians)
+    return np.array([
+        [1.0, 0.0, 0.0, 0.0],
+        [0.0, cos, -sin, 0.0],
+        [0.0, sin, cos, 0.0],
+        [0.0, 0.0, 0.0, 1.0],
+    ])
+
+
+# Compensate for Blender's Z up axis, and back again.
+Z_UP_MATRIX = get_rotation_x(90.0)
+Y_UP_MATRIX = get_rotation_x(-90.0)
+
+
+def create_matrices_from_vectors(positions, ups, ats, lines=None):
+    """Create Blender world matrices from Position, Up and At vectors.
+
+    The right vector is the normalised cross product of At and Up, scaled to
+    the average length of the two. Lines keep a unit right vector to
+    maintain the line width.
+
+    Args:
+        positions (numpy.ndarray): (n, 3) positions.
+        ups (numpy.ndarray): (n, 3) Up vectors.
+        ats (numpy.ndarray): (n, 3) At vectors.
+        lines (numpy.ndarray): (n,) True for rows that are lines.
+
+    Returns:
+        numpy.ndarray: (n, 4, 4) world matrices in Blender Z up space.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    ups = np.asarray(ups, dtype=float).reshape(-1, 3)
+    ats = np.asarray(ats, dtype=float).reshape(-1, 3)
+
+    right = -np.cross(ats, ups)
+    right_length = np.linalg.norm(right, axis=1)
+    # A zero vector stays zero when normalised.
+    right /= np.where(right_length > 0.0, right_length, 1.0)[:, None]
+
+    scale = (np.linalg.norm(ups, axis=1) + np.linalg.norm(ats, axis=1)) / 2
+    if lines is not None:
+        scale = np.where(lines, 1.0, scale)
+    right *= scale[:, None]
+
+    matrices = np.zeros((len(positions), 4, 4))
+    matrices[:, :3, 0] = right
+    matrices[:, :3, 1] = ups
+    matrices[:, :3, 2] = ats
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return Z_UP_MATRIX @ matrices
+
+
+def get_vectors_from_matrices(matrices):
+    """Get Position, Up and At vectors from Blender world matrices.
+
+    Args:
+        matrices (numpy.ndarray): (n, 4, 4) world matrices.
+
+    Returns:
+        tuple: (n, 3) positions, Up vectors and At vectors.
+    """
+    matrices = Y_UP_MATRIX @ np.asarray(matrices, dtype=float)
+    return (
+        matrices[:, :3, 3].copy(),
+        matrices[:, :3, 1].copy(),
+        matrices[:, :3, 2].copy()
+    )
+
+
+# Axis index of each axis name, in NMS Y up space.
+AXES = {"X": 0, "Y": 1, "Z": 2}
+
+
+def get_transform_matrix(
+        translate=(0.0, 0.0, 0.0),
+        rotate=0.0,
+        rotate_axis="Y",
+        mirror=None,
+        pivot=(0.0, 0.0, 0.0)):
+    """Create a 4x4 transform in NMS Y up space.
+
+    The mirror is applied first, then the rotation, both around the pivot,
+    then the translation.
+
+    Args:
+        translate (tuple): The offset to move by.
+        rotate (float): The angle in degrees to rotate by.
+        rotate_axis (str): The axis to rotate around, Y is up.
+        mirror (str): The axis to mirror along, or None.
+        pivot (tuple): The point to rotate and mirror around.
+
+    Returns:
+        numpy.ndarray: The matrix.
+    """
+    radians = math.radians(rotate)
+    cos, sin = math.cos(radians), math.sin(radians)
+    # Rotate the two axes that aren't the rotation axis into each other.
+    first, second = [axis for axis in range(3) if axis != AXES[rotate_axis]]
+    if AXES[rotate_axis] == 1:
+        first, second = second, first
+    rotation = np.identity(4)
+    rotation[first, first] = cos
+    rotation[first, second] = -sin
+    rotation[second, first] = sin
+    rotation[second, second] = cos
+
+    scale = np.identity(4)
+    if mirror:
+        scale[AXES[mirror], AXES[mirror]] = -1.0
+
+    to_pivot = np.identity(4)
+    to_pivot[:3, 3] = pivot
+    from_pivot = np.identity(4)
+    from_pivot[:3, 3] = -np.asarray(pivot, dtype=float)
+    offset = np.identity(4)
+    offset[:3, 3] = translate
+    return offset @ to_pivot @ rotation @ scale @ from_pivot
+
+
+def transform_vectors(positions, ups, ats, matrix):
+    """Transform Position, Up and At vectors in a single pass.
+
+    Up and At are directions so only the rotation and mirror apply. The At
+    of a line is its length vector, so transforming it keeps the end point
+    of the line on the transformed end point.
+
+    Mirroring can't mirror the parts themselves, as the game rebuilds the
+    right vector from Up and At. Each part keeps its shape and is turned to
+    face along its mirrored Up and At.
+
+    Args:
+        positions (numpy.ndarray): (n, 3) positions.
+        ups (numpy.ndarray): (n, 3) Up vectors.
+        ats (numpy.ndarray): (n, 3) At vectors.
+        matrix (numpy.ndarray): A 4x4 transform in NMS Y up space.
+
+    Returns:
+        tuple: (n, 3) positions, Up vectors and At vectors.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    linear = matrix[:3, :3].T
+    return (
+        np.asarray(positions, dtype=float) @ linear + matrix[:3, 3],
+        np.asarray(ups, dtype=float) @ linear,
+        np.asarray(ats, dtype=float) @ linear
+    )
+
+
+def transform_matrices(matrices, matrix, lines=None):
+    """Transform Blender world matrices the way the game would see them.
+
+    Args:
+        matrices (numpy.ndarray): (n, 4, 4) world matrices.
+        matrix (numpy.ndarray): A 4x4 transform in NMS Y up space.
+        lines (numpy.ndarray): (n,) True for rows that are lines.
+
+    Returns:
+        numpy.ndarray: (n, 4, 4) transformed world matrices.
+    """
+    positions, ups, ats = transform_vectors(
+        *get_vectors_from_matrices(matrices),
+        matrix=matrix
+    )
+    return create_matrices_from_vectors(positions, ups, ats, lines=lines)
+
+
+def format_id(item_id):
+    """Add the ^ prefix NMS uses for IDs."""
+    return "^{0}".format(item_id)
+
+
+class BaseDocument(object):
+    """A base, or preset, as columns of part data."""
+
+    def __init__(self):
+        """BaseDocument __init__."""
+        # Base information other than the parts, e.g. GalacticAddress.
+        self.metadata = {}
+        # Parts.
+        self.string_table = []
+        self.object_ids = np.zeros(0, dtype=np.int32)
+        self.positions = np.zeros((0, 3))
+        self.ups = np.zeros((0, 3))
+        self.ats = np.zeros((0, 3))
+        self.user_data = np.zeros(0, dtype=np.int64)
+        self.timestamps = np.zeros(0, dtype=np.int64)
+        # Row to message and row to any other keys.
+        self.messages = {}
+        self.extras = {}
+        # Presets.
+        self.preset_ids = []
+        self.preset_positions = np.zeros((0, 3))
+        self.preset_ups = np.zeros((0, 3))
+        self.preset_ats = np.zeros((0, 3))
+
+    def __len__(self):
+        return len(self.object_ids)
+
+    # Properties ---
+    @property
+    def preset_count(self):
+        return len(self.preset_ids)
+
+    def get_object_ids(self):
+        """Get the ObjectID of every part, without the ^ prefix.
+
+        Returns:
+            numpy.ndarray: The ObjectIDs.
+        """
+        table = np.array(self.string_table + [""], dtype=object)
+        return table[self.object_ids]
+
+    def get_string_index(self, object_id):
+        """Get the string table index of an ObjectID, adding it if need be."""
+        object_id = object_id.replace("^", "")
+        if object_id not in self.string_table:
+            self.string_table.append(object_id)
+        return self.string_table.index(object_id)
+
+    def get_line_mask(self):
+        """Get which parts are lines.
+
+        Returns:
+            numpy.ndarray: (n,) True for lines.
+        """
+        line_indices = [
+            index for index, object_id in enumerate(self.string_table)
+            if object_id in LINE_OBJECT_IDS
+        ]
+        return np.isin(self.object_ids, line_indices)
+
+    def get_histogram(self):
+        """Count the parts of each ObjectID.
+
+        Returns:
+            dict: ObjectID to count, most common first.
+        """
+        counts = np.bincount(self.object_ids, minlength=len(self.string_table))
+        order = np.argsort(-counts, kind="stable")
+        return {
+            self.string_table[index]: int(counts[index])
+            for index in order if counts[index]
+        }
+
+    def get_bounds(self):
+        """Get the bounding box of the part positions.
+
+        Returns:
+            numpy.ndarray: (2, 3) minimum and maximum, zeros if empty.
+        """
+        if not len(self):
+            return np.zeros((2, 3))
+        return np.array([self.positions.min(axis=0), self.positions.max(axis=0)])
+
+    # Matrices ---
+    def get_matrices(self):
+        """Get the Blender world matrix of every part.
+
+        Returns:
+            numpy.ndarray: (n, 4, 4) world matrices.
+        """
+        return create_matrices_from_vectors(
+            self.positions,
+            self.ups,
+            self.ats,
+            lines=self.get_line_mask()
+        )
+
+    def set_matrices(self, matrices, rows=None):
+        """Set parts from Blender world matrices.
+
+        Args:
+            matrices (numpy.ndarray): (n, 4, 4) world matrices.
+            rows (numpy.ndarray): The rows to set, defaults to all of them.
+        """
+        positions, ups, ats = get_vectors_from_matrices(matrices)
+        rows = slice(None) if rows is None else rows
+        self.positions[rows] = positions
+        self.ups[rows] = ups
+        self.ats[rows] = ats
+
+    def get_preset_matrices(self):
+        """Get the Blender world matrix of every preset."""
+        return create_matrices_from_vectors(
+            self.preset_positions,
+            self.preset_ups,
+            self.preset_ats
+        )
+
+    def set_preset_matrices(self, matrices):
+        """Set presets from Blender world matrices."""
+        (
+            self.preset_positions,
+            self.preset_ups,
+            self.preset_ats
+        ) = get_vectors_from_matrices(matrices)
+
+    def transform(self, matrix):
+        """Transform every part and preset.
+
+        Args:
+            matrix (numpy.ndarray): A 4x4 transform in NMS Y up space, see
+                get_transform_matrix.
+        """
+        self.positions, self.ups, self.ats = transform_vectors(
+            self.positions,
+            self.ups,
+            self.ats,
+            matrix
+        )
+        (
+            self.preset_positions,
+            self.preset_ups,
+            self.preset_ats
+        ) = transform_vectors(
+            self.preset_positions,
+            self.preset_ups,
+            self.preset_ats,
+            matrix
+        )
+
+    # Editing ---
+    def take(self, rows):
+        """Get a new document with only some of the parts.
+
+        Args:
+            rows (numpy.ndarray): Row indices or a boolean mask.
+
+        Returns:
+            BaseDocument: The new document, sharing the metadata and presets.
+        """
+        rows = np.arange(len(self))[rows]
+        document = BaseDocument()
+        document.metadata = dict(self.metadata)
+        document.string_table = list(self.string_table)
+        document.object_ids = self.object_ids[rows]
+        document.positions = self.positions[rows]
+        document.ups = self.ups[rows]
+        document.ats = self.ats[rows]
+        document.user_data = self.user_data[rows]
+        document.timestamps = self.timestamps[rows]
+        new_rows = {int(old_row): new_row for new_row, old_row in enumerate(rows)}
+        document.messages = {
+            new_rows[row]: message for row, message in self.messages.items()
+            if row in new_rows
+        }
+        document.extras = {
+            new_rows[row]: extra for row, extra in self.extras.items()
+            if row in new_rows
+        }
+        document.preset_ids = list(self.preset_ids)
+        document.preset_positions = self.preset_positions.copy()
+        document.preset_ups = self.preset_ups.copy()
+        document.preset_ats = self.preset_ats.copy()
+        return document
+
+    def extend(self, other):
+        """Append the parts and presets of another document.
+
+        Args:
+            other (BaseDocument): The document to add, its metadata is
+                ignored.
+        """
+        offset = len(self)
+        remap = np.array(
+            [self.get_string_index(object_id) for object_id in other.string_table],
+            dtype=np.int32
+        )
+        other_ids = remap[other.object_ids] if len(remap) else other.object_ids
+        self.object_ids = np.concatenate([self.object_ids, other_ids])
+        self.positions = np.concatenate([self.positions, other.positions])
+        self.ups = np.concatenate([self.ups, other.ups])
+        self.ats = np.concatenate([self.ats, other.ats])
+        self.user_data = np.concatenate([self.user_data, other.user_data])
+        self.timestamps = np.concatenate([self.timestamps, other.timestamps])
+        for row, message in other.messages.items():
+            self.messages[row + offset] = message
+        for row, extra in other.extras.items():
+            self.extras[row + offset] = extra
+        self.preset_ids.extend(other.preset_ids)
+        self.preset_positions = np.concatenate([self.preset_positions, other.preset_positions])
+        self.preset_ups = np.concatenate([self.preset_ups, other.preset_ups])
+        self.preset_ats = np.concatenate([self.preset_ats, other.preset_ats])
+
+    # Serialisation ---
+    @classmethod
+    def from_data(cls, data):
+        """Build a document from NMS base or preset data.
+
+        Args:
+            data (dict): The NMS data.
+
+        Returns:
+            BaseDocument: The document.
+        """
+        document = cls()
+        document.metadata = {
+            key: value for key, value in data.items()
+            if key not in ("Objects", "Presets")
+        }
+
+        objects = data.get("Objects", [])
+        count = len(objects)
+        string_index = {}
+        object_ids = np.zeros(count, dtype=np.int32)
+        positions = np.zeros((count, 3))
+        ups = np.zeros((count, 3))
+        ats = np.zeros((count, 3))
+        user_data = np.zeros(count, dtype=np.int64)
+        timestamps = np.zeros(count, dtype=np.int64)
+        default_timestamp = int(time.time())
+
+        for row, item in enumerate(objects):
+            object_id = item.get("ObjectID", "").replace("^", "")
+            if object_id not in string_index:
+                string_index[object_id] = len(document.string_table)
+                document.string_table.append(object_id)
+            object_ids[row] = string_index[object_id]
+            positions[row] = item.get("Position", (0.0, 0.0, 0.0))
+            ups[row] = item.get("Up", (0.0, 0.0, 0.0))
+            ats[row] = item.get("At", (0.0, 0.0, 0.0))
+            user_data[row] = int(item.get("UserData", 0))
+            timestamps[row] = int(item.get("Timestamp", default_timestamp))
+            if "Message" in item:
+                document.messages[row] = item["Message"]
+            extra = {key: value for key, value in item.items() if key not in PART_KEYS}
+            if extra:
+                document.extras[row] = extra
+
+        document.object_ids = object_ids
+        document.positions = positions
+        document.ups = ups
+        document.ats = ats
+        document.user_data = user_data
+        document.timestamps = timestamps
+
+        presets = data.get("Presets", [])
+        # Old presets were tagged with an ObjectID.
+        document.preset_ids = [
+            item.get("PresetID", item.get("ObjectID", "")).replace("^", "")
+            for item in presets
+        ]
+        document.preset_positions = np.array(
+            [item.get("Position", (0.0, 0.0, 0.0)) for item in presets], dtype=float
+        ).reshape(-1, 3)
+        document.preset_ups = np.array(
+            [item.get("Up", (0.0, 0.0, 0.0)) for item in presets], dtype=float
+        ).reshape(-1, 3)
+        document.preset_ats = np.array(
+            [item.get("At", (0.0, 0.0, 0.0)) for item in presets], dtype=float
+        ).reshape(-1, 3)
+        return document
+
+    def to_data(self):
+        """Get the NMS data of the document.
+
+        Returns:
+            dict: The NMS data, with the same part layout as Part.serialise.
+        """
+        data = dict(self.metadata)
+        object_ids = [format_id(object_id) for object_id in self.string_table]
+        positions = self.positions.tolist()
+        ups = self.ups.tolist()
+        ats = self.ats.tolist()
+        timestamps = self.timestamps.tolist()
+        user_data = self.user_data.tolist()
+
+        objects = []
+        for row, string_index in enumerate(self.object_ids.tolist()):
+            item = {
+                "ObjectID": object_ids[string_index],
+                "Position": positions[row],
+                "Up": ups[row],
+                "At": ats[row],
+                "Timestamp": timestamps[row],
+                "UserData": user_data[row],
+            }
+            if row in self.messages:
+                item["Message"] = self.messages[row]
+            if row in self.extras:
+                item.update(self.extras[row])
+            objects.append(item)
+        data["Objects"] = objects
+
+        if self.preset_ids:
+            data["Presets"] = [
+                {
+                    "PresetID": format_id(preset_id),
+                    "Position": position,
+                    "Up": up,
+                    "At": at,
+                }
+                for preset_id, position, up, at in zip(
+                    self.preset_ids,
+                    self.preset_positions.tolist(),
+                    self.preset_ups.tolist(),
+                    self.preset_ats.tolist()
+                )
+            ]
+        return data
+
+    @classmethod
+    def load(cls, file_path):
+        """Load a document from an NMS json file."""
+        with open(file_path, "r") as stream:
+            return cls.from_data(json.load(stream))
+
+    def save(self, file_path, indent=4):
+        """Save the document to an NMS json file."""
+        with open(file_path, "w") as stream:
+            json.dump(self.to_data(), stream, indent=indent)
@@ -0,0 +1,91 @@
+"""Find parts whose bounding boxes overlap, without testing every pair.
+
+Boxes are dropped into a uniform grid and only boxes sharing a grid cell are
+compared, so a base of tens of thousands of parts only tests the neighbours
+of each part. The Builder checks the pairs found here against the actual
+meshes.
+
+Nothing in here depends on Blender.
+"""
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+# Corners of a unit box, as 0 (low) or 1 (high) per axis.
+BOX_CORNERS = np.array(list(itertools.product((0, 1), repeat=3)), dtype=bool)
+# Grid cells are never smaller than this, in metres.
+MIN_CELL_SIZE = 1.0
+
+
+def get_world_bounds(matrices, lows, highs):
+    """Get the world space boxes around local boxes.
+
+    Args:
+        matrices (numpy.ndarray): (n, 4, 4) world matrices.
+        lows (numpy.ndarray): (n, 3) local low corners.
+        highs (numpy.ndarray): (n, 3) local high corners.
+
+    Returns:
+        tuple: (n, 3) world low corners and (n, 3) world high corners.
+    """
+    # (n, 8, 3) corners of every box.
+    corners = np.where(BOX_CORNERS[None], highs[:, None], lows[:, None])
+    world = (
+        np.einsum("nij,nkj->nki", matrices[:, :3, :3], corners)
+        + matrices[:, None, :3, 3]
+    )
+    return world.min(axis=1), world.max(axis=1)
+
+
+def get_cell_size(lows, highs):
+    """Pick a grid cell size that holds a typical box in a few cells."""
+    if not len(lows):
+        return MIN_CELL_SIZE
+    return max(float(np.median((highs - lows).max(axis=1))), MIN_CELL_SIZE)
+
+
+def get_candidate_pairs(lows, highs, tolerance=0.0, cell_size=None):
+    """Find the pairs of boxes that overlap.
+
+    Boxes that only touch, or overlap by less than the tolerance, don't
+    count, so parts snapped face to face aren't reported.
+
+    Args:
+        lows (numpy.ndarray): (n, 3) low corners.
+        highs (numpy.ndarray): (n, 3) high corners.
+        tolerance (float): The overlap needed on every axis.
+        cell_size (float): The size of the grid cells, picked from the boxes
+            by default.
+
+    Returns:
+        numpy.ndarray: (m, 2) indices of overlapping boxes, lowest first.
+    """
+    lows = np.asarray(lows, dtype=float)
+    highs = np.asarray(highs, dtype=float)
+    cell_size = cell_size or get_cell_size(lows, highs)
+    low_cells = np.floor(lows / cell_size).astype(np.int64)
+    high_cells = np.floor(highs / cell_size).astype(np.int64)
+
+    # Bucket every box in each cell it covers.
+    grid = defaultdict(list)
+    for index, (low_cell, high_cell) in enumerate(zip(low_cells.tolist(), high_cells.tolist())):
+        for cell in itertools.product(*[
+                range(low, high + 1) for low, high in zip(low_cell, high_cell)]):
+            grid[cell].append(index)
+
+    # Boxes covering several cells meet more than once, keep one of each.
+    pairs = set()
+    for indices in grid.values():
+        if len(indices) > 1:
+            pairs.update(itertools.combinations(indices, 2))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    pairs = np.array(sorted(pairs), dtype=np.int64)
+    first, second = pairs[:, 0], pairs[:, 1]
+    overlapping = (
+        (lows[first] < highs[second] - tolerance)
+        & (lows[second] < highs[first] - tolerance)
+    ).all(axis=1)
+    return pairs[overlapping]
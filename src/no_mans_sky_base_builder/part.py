@@ -3,10 +3,11 @@ import os
 import time
 from copy import copy
 
-import bpy
 import mathutils
+import no_mans_sky_base_builder.backends as backends
 import no_mans_sky_base_builder.utils.blend_utils as blend_utils
 import no_mans_sky_base_builder.utils.material as material
+import no_mans_sky_base_builder.utils.profiler as profiler
 import no_mans_sky_base_builder.utils.python as python_utils
 
 
@@ -20,6 +21,13 @@ class Part(object):
 
     SNAP_MATRIX_DICTIONARY = python_utils.load_dictionary(SNAP_MATRIX_JSON)
     SNAP_PAIR_DICTIONARY = python_utils.load_dictionary(SNAP_PAIR_JSON)
+    # Part ID to snap group. Built in reverse so a part listed in several
+    # groups keeps the first one.
+    SNAP_GROUP_LOOKUP = {
+        part_id: group
+        for group, value in reversed(list(SNAP_MATRIX_DICTIONARY.items()))
+        for part_id in value["parts"]
+    }
 
     SNAP_CACHE = {}
     
@@ -52,13 +60,15 @@ class Part(object):
         else:
             # Create new object.
             self.__object = self.retrieve_object_from_id(object_id)
+            # File it under its category collection.
+            builder_object.place_in_collection(self.__object, object_id)
             # Set properties.
             self.__object.hide_select = False
             self.object_id = object_id
             self.parent = None
             self.time_stamp = str(int(time.time()))
             self.belongs_to_preset = self.DEFAULT_BELONGS_TO_PRESET
-            self.order = len(bpy.data.objects)
+            self.order = backends.get_backend().get_object_count()
             # Assign material.
             material.assign_material(self.__object, user_data)
             # Set to origin.
@@ -222,8 +232,14 @@ class Part(object):
         # Transfer a copy of the mesh and material.
         new_object.data = self.__object.data.copy()
 
-        if self.__object.active_material:
-            new_object.active_material = self.__object.active_material.copy()
+        # The shared palette material is never copied.
+        active_material = self.__object.active_material
+        if active_material and not material.is_palette_material(active_material):
+            new_object.active_material = active_material.copy()
+
+        # Copies of preset prototype parts belong to the scene.
+        if "preset_prototype" in new_object:
+            del new_object["preset_prototype"]
 
         # Clear Parent
         if new_object.parent:
@@ -258,6 +274,7 @@ class Part(object):
     def add_to_scene(self):
         blend_utils.add_to_scene(self.object)
 
+    @profiler.instrument()
     def retrieve_object_from_id(self, object_id):
         """Given an ID. Find the best way to create a new one.
         
@@ -278,26 +295,16 @@ class Part(object):
             blend_utils.add_to_scene(duped)
             return duped
         
-        # Locate OBJ.
+        # Locate OBJ, if it doesn't exist a cube is created instead.
         obj_path = self.builder.get_obj_path(object_id)
-        # If it exists, import the obj.
-        if obj_path and os.path.isfile(obj_path):
-            bpy.ops.import_scene.obj(filepath=obj_path, split_mode="OFF")
-            item = bpy.data.objects[bpy.context.selected_objects[0].name]
-            # for convenience if saving obj/mtl files, delete any imported materials
-            item.data.materials.clear()
-            item.select_set(False)
-            blend_utils.add_to_scene(item)
-            return item
-
-        # Create cube.
-        bpy.ops.mesh.primitive_cube_add()
-        item = bpy.data.objects[bpy.context.object.name]
-        item.name = object_id
+        if not obj_path or not os.path.isfile(obj_path):
+            obj_path = None
+        item = backends.get_backend().new_mesh_object(object_id, obj_path)
         blend_utils.add_to_scene(item)
         return item
 
     # Serialisation ---
+    @profiler.instrument()
     def serialise(self):
         """Return NMS compatible dictionary.
 
@@ -425,10 +432,34 @@ class Part(object):
         Args:
             part_id (str): The ID of the building part.
         """
-        for group, value in self.SNAP_MATRIX_DICTIONARY.items():
-            parts = value["parts"]
-            if self.object_id in parts:
-                return group
+        return self.SNAP_GROUP_LOOKUP.get(self.object_id)
+
+    def get_snap_step(self, target_key, source_key=None):
+        """Get the offset from this part to a copy snapped onto it.
+
+        This is the snap_to maths with the source and target being the same
+        part, T @ O_t @ (O_s @ Rot180Y)^-1, without the world matrix.
+
+        Args:
+            target_key (str): The snap point to snap the copy to.
+            source_key (str): The snap point of the copy, defaults to the
+                opposite of the target key.
+
+        Returns:
+            mathutils.Matrix: The local offset, None if the snap points
+                aren't available.
+        """
+        snap_points = self.get_snap_points()
+        if not snap_points or target_key not in snap_points:
+            return None
+        source_key = source_key or snap_points[target_key].get("opposite", target_key)
+        if source_key not in snap_points:
+            return None
+
+        target_offset_matrix = mathutils.Matrix(snap_points[target_key]["matrix"])
+        source_offset_matrix = mathutils.Matrix(snap_points[source_key]["matrix"])
+        rotation_matrix = mathutils.Matrix.Rotation(math.radians(180.0), 4, "Y")
+        return target_offset_matrix @ (source_offset_matrix @ rotation_matrix).inverted()
 
     def get_snap_pair_options(self, target_item):
         """Get the compatible snap points
@@ -450,6 +481,7 @@ class Part(object):
             if source_group in snapping_dictionary:
                 return snapping_dictionary[source_group]
 
+    @profiler.instrument()
     def snap_to(
             self,
             target,
@@ -1,5 +1,4 @@
 import math
-import os
 from copy import copy
 
 import bpy
@@ -8,6 +7,7 @@ import no_mans_sky_base_builder.part
 import no_mans_sky_base_builder.utils.blend_utils as blend_utils
 import no_mans_sky_base_builder.utils.constraints as constraints
 import no_mans_sky_base_builder.utils.material as material
+import no_mans_sky_base_builder.utils.profiler as profiler
 
 
 class Line(no_mans_sky_base_builder.part.Part):
@@ -56,6 +56,7 @@ class Line(no_mans_sky_base_builder.part.Part):
         """Override base class for lines with synthetic snap points at each end."""
         return self.__snap_points
 
+    @profiler.instrument()
     def build_rig(self, start=None, end=None):
         """Given the power line object, create 2 empties to control end points.
 
@@ -89,9 +90,15 @@ class Line(no_mans_sky_base_builder.part.Part):
         # Remove old constraints.
         self.remove_constraints()
 
-        constraints.point_constraint(self.object, start)
-        constraints.stretch_constraint(self.object, start, end)
-        constraints.aim_constraint(self.object, end)
+        # Either hand the line over to the solver or rig it with drivers.
+        line_solver = self.builder.line_solver
+        if line_solver.enabled:
+            line_solver.add(self.object, start, end)
+        else:
+            line_solver.remove(self.object.name)
+            constraints.point_constraint(self.object, start)
+            constraints.stretch_constraint(self.object, start, end)
+            constraints.aim_constraint(self.object, end)
 
         # Tag controls onto powerline
         self.start_control = start.name
@@ -177,6 +184,54 @@ class Line(no_mans_sky_base_builder.part.Part):
         # Select the middle controller.
         blend_utils.select(middle_control)
 
+    @staticmethod
+    def subdivide_lines(power_lines, segments, builder):
+        """Divide many lines into equal segments in one batch.
+
+        All middle controls are created up front, and the rigs of every
+        segment are built together once all the new lines exist.
+
+        Args:
+            power_lines (list): The Line objects to subdivide.
+            segments (int): The number of segments for each line.
+            builder (Builder): The NMS Builder object.
+
+        Returns:
+            list: The new middle controls.
+        """
+        objects = bpy.data.objects
+        rigs = []
+        new_controls = []
+        for power_line in power_lines:
+            start = objects.get(power_line.object.get("start_control", ""))
+            end = objects.get(power_line.object.get("end_control", ""))
+            if not start or not end:
+                continue
+
+            # Space the middle controls evenly between the ends.
+            locations = [
+                start.location.lerp(end.location, index / segments)
+                for index in range(1, segments)
+            ]
+            middle_controls = builder.control_factory.create_points(
+                count=segments - 1,
+                name="_".join([power_line.name, "MID"]),
+                locations=locations
+            )
+            new_controls.extend(middle_controls)
+
+            # The original line becomes the first segment.
+            segment_lines = [power_line] + [
+                builder.add_part(power_line.object_id, build_rigs=False)
+                for _ in range(segments - 1)
+            ]
+            controls = [start] + middle_controls + [end]
+            for index, segment_line in enumerate(segment_lines):
+                rigs.append((segment_line, controls[index], controls[index + 1]))
+
+        Line.build_rig_batch(builder, rigs)
+        return new_controls
+
     # Class Methods ---
     @classmethod
     def deserialise_from_data(cls, data, builder_object, build_rigs=True):
@@ -206,51 +261,7 @@ class Line(no_mans_sky_base_builder.part.Part):
     @staticmethod
     def create_point(builder, name=None):
         """Create a new electric wire point."""
-        default_name = "ARBITRARY_POINT"
-        name = name or default_name
-        # path to the blend
-        file_path = os.path.dirname(os.path.realpath(__file__))
-        blend_path = os.path.join(file_path, "..", "resources", "power_control.blend")
-        # name of object to append or link
-        obj_name = "power_control"
-
-        existing_object = builder.find_object_by_id("POWER_CONTROL")
-        if existing_object:
-            point = existing_object.duplicate()
-            point = point.object
-            point.rotation_euler[0] = 0
-            point.rotation_euler[1] = 0
-            point.rotation_euler[2] = 0
-            blend_utils.add_to_scene(point)
-        else:
-            with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
-                data_to.objects = [
-                    scene_name for scene_name in data_from.objects if scene_name.startswith(obj_name)
-                ]
-
-            for obj in data_to.objects:
-                if obj is not None:
-                    point = obj.copy()
-                    blend_utils.add_to_scene(point)
-        
-
-        point["rig_item"] = True
-        point["SnapID"] = "POWER_CONTROL"
-
-        # blender will automatically de-dupe on rename, but it will rename
-        # some *other* object, whose name we might already have stored as text.
-        # (Also have to account for it having already given us a good name)
-        n = 0
-        base_name = name
-        while point.name != name and (name == default_name or blend_utils.item_exists_by_name(name)):
-            n += 1
-            name = "{}.{:0=3d}".format(base_name, n)
-
-        point.name = name
-        point.data.name = name+"_SHAPE"
-        builder.add_to_part_cache("POWER_CONTROL", point)
-        
-        return bpy.data.objects[point.name]
+        return builder.control_factory.create_points(name=name)[0]
 
     @staticmethod
     def position_matrix(data, bpy_object):
@@ -317,47 +328,98 @@ class Line(no_mans_sky_base_builder.part.Part):
         return mat
     
     @staticmethod
-    def generate_control_points(source, target, builder):
-        """Given two inputs, check if we can generate power connections points.
-        
+    def create_snap_control(part, key, suffix, builder):
+        """Create a control point on top of a part's snap point.
+
         Args:
-            source (bpy.ob): The source input.
-            target (bpy.ob): The target input.
+            part (part.Part): The part that owns the snap point.
+            key (str): The snap point key.
+            suffix (str): Appended to the part name to name the control.
+            builder (Builder): The NMS Builder object.
+
+        Returns:
+            bpy.ob: The new control, None if the snap point doesn't exist.
         """
-        source_key, target_key = source.get_closest_snap_points(
-            target,
-            source_filter="POWER",
-            target_filter="POWER"
-        )
-        # If not, find the closest point between the two targets and create
-        # new power controls from them.
-        if source.snap_id == "POWER_CONTROL":
-            source_control = source
-        else:
-            # Get local value.
-            source_local_value = source.get_matrix_from_key(source_key)
-            # Create a control if it's found.
-            if not source_local_value:
-                source_control = None
+        local_value = part.get_matrix_from_key(key)
+        if not local_value:
+            return None
+        snap_matrix = part.matrix_world @ mathutils.Matrix(local_value)
+        control = Line.create_point(builder, "_".join([part.name, suffix]))
+        control.location = snap_matrix.decompose()[0]
+        control["snapped_to"] = part.name
+        return control
+
+    @staticmethod
+    def connect(start, ends, builder):
+        """Connect one part to many others in a single batch.
+
+        Only one start control is made per snap point of the start part, so
+        connecting several ends to the same socket doesn't stack up
+        coincident controls.
+        All lines are created first and their rigs are built together.
+
+        Args:
+            start (part.Part): The part to connect everything to.
+            ends (list): The parts to connect from the start.
+            builder (Builder): The NMS Builder object.
+
+        Returns:
+            list: The new line objects.
+        """
+        # Decide on the line type, controls remember the line they drive.
+        line_object = "U_POWERLINE"
+        if start.snap_id == "POWER_CONTROL":
+            line_object = start.object.get("power_line", line_object)
+            line_object = line_object.split(".")[0]
+
+        start_controls = {}
+        rigs = []
+        for end in ends:
+            if end.object == start.object:
+                continue
+
+            source_key, target_key = start.get_closest_snap_points(
+                end,
+                source_filter="POWER",
+                target_filter="POWER"
+            )
+
+            # Re-use the control already made for this snap point.
+            if start.snap_id == "POWER_CONTROL":
+                start_control = start.object
+            elif source_key in start_controls:
+                start_control = start_controls[source_key]
             else:
-                source_local = mathutils.Matrix(source_local_value)
-                source_snap_matrix = source.matrix_world @ source_local
-                source_control = Line.create_point(builder, source.name + "_START")
-                source_control.location = source_snap_matrix.decompose()[0]
-                source_control["snapped_to"] = source.name
-
-        if target.snap_id == "POWER_CONTROL":
-            target_control = target
-        else:
-            target_local_value = target.get_matrix_from_key(target_key)
-            if not target_local_value:
-                target_control = None
+                start_control = Line.create_snap_control(
+                    start, source_key, "START", builder
+                )
+                start_controls[source_key] = start_control
+
+            if end.snap_id == "POWER_CONTROL":
+                end_control = end.object
             else:
-                target_local = mathutils.Matrix(target_local_value)
-                target_snap_matrix = target.matrix_world @ target_local
-                target_control = Line.create_point(builder, target.name + "_END")
-                target_control.location = target_snap_matrix.decompose()[0]
-                target_control["snapped_to"] = target.name
+                end_control = Line.create_snap_control(
+                    end, target_key, "END", builder
+                )
+
+            if not start_control or not end_control:
+                continue
+
+            power_line = builder.add_part(line_object, build_rigs=False)
+            rigs.append((power_line, start_control, end_control))
 
+        Line.build_rig_batch(builder, rigs)
+        return [power_line for power_line, _, _ in rigs]
 
-        return source_control, target_control
\ No newline at end of file
+    @staticmethod
+    def build_rig_batch(builder, rigs):
+        """Build the rigs of many lines and refresh the scene once after.
+
+        Args:
+            builder (Builder): The NMS Builder object.
+            rigs (list): Tuples of (Line, start control, end control).
+        """
+        for power_line, start, end in rigs:
+            power_line.build_rig(start=start, end=end)
+        builder.line_solver.flush()
+        blend_utils.scene_refresh()
@@ -7,7 +7,11 @@ then on the node itself, so that it doesn't get exported along with everything
 else when bringing it back into the game.
 
 """
+import os
+
+import bpy
 import no_mans_sky_base_builder.part as part
+import no_mans_sky_base_builder.utils.blend_utils as blend_utils
 
 
 class POWER_CONTROL(part.Part):
@@ -27,3 +31,118 @@ class POWER_CONTROL(part.Part):
     @object_id.setter
     def object_id(self, value):
         self.__object_id = value
+
+
+class ControlPointFactory(object):
+    """Creates control points from a private prototype.
+
+    The prototype is appended from power_control.blend once and kept out of
+    the scene with a fake user, so new controls never reload the library or
+    depend on another control still existing. It is removed again before the
+    file is saved. Names are made unique with a counter per base name instead
+    of probing .001, .002... every time.
+    """
+
+    DEFAULT_NAME = "ARBITRARY_POINT"
+    PROTOTYPE_NAME = "POWER_CONTROL_PROTOTYPE"
+    FILE_PATH = os.path.dirname(os.path.realpath(__file__))
+    BLEND_PATH = os.path.join(FILE_PATH, "..", "resources", "power_control.blend")
+
+    def __init__(self, builder_object):
+        """ControlPointFactory __init__.
+
+        Args:
+            builder_object (Builder): The builder caching the new controls.
+        """
+        self.__builder_object = builder_object
+        self.__counters = {}
+
+    def clear(self):
+        """Reset the naming counters."""
+        self.__counters.clear()
+
+    def get_prototype(self):
+        """Get the prototype control, appending it from the library if need be.
+
+        Returns:
+            bpy.ob: The prototype object.
+        """
+        prototype = bpy.data.objects.get(self.PROTOTYPE_NAME)
+        if prototype:
+            return prototype
+
+        with bpy.data.libraries.load(self.BLEND_PATH, link=False) as (data_from, data_to):
+            data_to.objects = [
+                name for name in data_from.objects if name.startswith("power_control")
+            ]
+        prototype = [obj for obj in data_to.objects if obj is not None][0]
+        prototype.name = self.PROTOTYPE_NAME
+        prototype.use_fake_user = True
+        return prototype
+
+    def remove_prototype(self):
+        """Remove the prototype and its data, so it isn't saved with the file."""
+        prototype = bpy.data.objects.get(self.PROTOTYPE_NAME)
+        if not prototype:
+            return
+        data = prototype.data
+        bpy.data.objects.remove(prototype)
+        if isinstance(data, bpy.types.Mesh) and not data.users:
+            bpy.data.meshes.remove(data)
+
+    def get_unique_name(self, name):
+        """Get a free object name based on the given name.
+
+        Default names are always numbered, other names are only numbered
+        when they are already taken.
+
+        Args:
+            name (str): The requested name.
+
+        Returns:
+            str: A name that no other object uses.
+        """
+        objects = bpy.data.objects
+        if name != self.DEFAULT_NAME and name not in objects:
+            return name
+
+        # Carry on from the last number handed out for this name.
+        count = self.__counters.get(name, 0)
+        while True:
+            count += 1
+            unique_name = "{}.{:0=3d}".format(name, count)
+            if unique_name not in objects:
+                break
+        self.__counters[name] = count
+        return unique_name
+
+    def create_points(self, count=1, name=None, locations=None):
+        """Create several control points in one go.
+
+        Args:
+            count (int): The number of controls to create.
+            name (str): The base name of the controls.
+            locations (list): Optional locations, one per control.
+
+        Returns:
+            list: The new control objects.
+        """
+        name = name or self.DEFAULT_NAME
+        prototype = self.get_prototype()
+
+        points = []
+        for index in range(count):
+            point = prototype.copy()
+            point.data = prototype.data.copy()
+            point.use_fake_user = False
+            point.name = self.get_unique_name(name)
+            point.data.name = point.name + "_SHAPE"
+            point.rotation_euler = [0.0, 0.0, 0.0]
+            point.location = locations[index] if locations else [0.0, 0.0, 0.0]
+            point["rig_item"] = True
+            point["SnapID"] = "POWER_CONTROL"
+            blend_utils.add_to_scene(point)
+            points.append(point)
+        if points:
+            self.__builder_object.add_to_part_cache("POWER_CONTROL", points[-1])
+        return points
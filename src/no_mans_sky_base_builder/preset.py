@@ -1,19 +1,33 @@
-import json
 import math
 import os
 from copy import copy
 
-import bpy
 import mathutils
+import no_mans_sky_base_builder.backends as backends
+import no_mans_sky_base_builder.document as document
 import no_mans_sky_base_builder.utils.material as material
 import no_mans_sky_base_builder.part as part
+import no_mans_sky_base_builder.preset_catalog as preset_catalog
 import no_mans_sky_base_builder.utils.blend_utils as blend_utils
+import no_mans_sky_base_builder.utils.profiler as profiler
 
 class Preset(object):
 
     USER_PATH = os.path.join(os.path.expanduser("~"), "NoMansSkyBaseBuilder")
     PRESET_PATH = os.path.join(USER_PATH, "presets")
 
+    # Cached list of the presets on disk.
+    CATALOG = preset_catalog.PresetCatalog(PRESET_PATH)
+    # Parsed preset files.
+    DATA_CACHE = preset_catalog.PresetDataCache()
+    # Metadata of every preset for sorting and filtering.
+    INDEX = preset_catalog.PresetIndex(
+        PRESET_PATH,
+        os.path.join(USER_PATH, "preset_index.json")
+    )
+    # Hidden collection holding the parts of an instanced preset.
+    PROTOTYPE_COLLECTION = "NMS_PRESET_{0}"
+
     def __init__(
             self,
             preset_id=None,
@@ -31,8 +45,8 @@ class Preset(object):
             builder_object (Builder): The "parent" class for managing the NMS
                 scene.
         """
-        # Turn off relationship lines.
-        bpy.context.space_data.overlay.show_relationship_lines = False
+        # Turn off relationship lines, if there is a 3D view.
+        backends.get_backend().set_relationship_lines(False)
 
         # Assign private variables.
         self.__preset_id = preset_id
@@ -69,14 +83,27 @@ class Preset(object):
     @property
     def data_path(self):
         """Get the JSON data file for the preset."""
-        json_file = self.preset_id + ".json"
-        return os.path.join(self.PRESET_PATH, json_file)
+        return self.get_data_path(self.preset_id)
 
     @staticmethod
     def get_presets():
         """Get the list of presets."""
-        presets = os.listdir(Preset.PRESET_PATH)
-        return [os.path.splitext(preset)[0] for preset in presets if preset.endswith(".json")]
+        return Preset.CATALOG.get_presets()
+
+    @staticmethod
+    def get_data_path(preset_id):
+        """Get the JSON data file for a preset ID."""
+        return os.path.join(Preset.PRESET_PATH, preset_id + ".json")
+
+    @staticmethod
+    def prefetch(preset_ids):
+        """Parse the data files of many presets in parallel.
+
+        Args:
+            preset_ids (iterable): The preset IDs about to be built.
+        """
+        paths = [Preset.get_data_path(preset_id) for preset_id in preset_ids]
+        Preset.DATA_CACHE.prefetch(paths)
 
     @property
     def builder(self):
@@ -125,10 +152,12 @@ class Preset(object):
     @staticmethod
     def delete_preset(preset_id):
         """Remove preset."""
-        json_file = preset_id+".json"
-        full_path = os.path.join(Preset.PRESET_PATH, json_file)
+        full_path = Preset.get_data_path(preset_id)
         if os.path.isfile(full_path):
             os.remove(full_path)
+        Preset.DATA_CACHE.invalidate(full_path)
+        Preset.CATALOG.refresh(force=True)
+        Preset.INDEX.update()
 
     def duplicate(self):
         """Duplicate the part and return it."""
@@ -143,9 +172,12 @@ class Preset(object):
         for old_child, new_child in zip(self.__control.children, new_children):
             new_child.parent = new_item
 
-        # Link to the scene
+        # Link to the scene, parts go into their category collections.
         for item in new_children:
-            blend_utils.add_to_scene(item)
+            if "ObjectID" in item:
+                self.builder.place_in_collection(item, item["ObjectID"])
+            else:
+                blend_utils.add_to_scene(item)
 
         # Remove the constraints.
         new_preset_object = Preset.deserialise_from_object(
@@ -186,6 +218,10 @@ class Preset(object):
             dupliciate it.
         - If not, generate it via json data.
         """
+        # Instance the shared prototype instead of copying every part.
+        if self.builder.preset_instancing and self.__create_control:
+            return self.create_instance()
+
         # Duplicate existing.
         existing_object = self.builder.find_preset_by_id(preset_id)
         if existing_object:
@@ -204,21 +240,85 @@ class Preset(object):
         """Generate the preset."""
         # Load json file and construct.
         parts = []
-        with open(self.data_path) as stream:
-            data = json.load(stream)
-            # Reconstruct objects.
-            for part_data in data.get("Objects", []):
-                object_id = part_data["ObjectID"].replace("^","")
-                user_data = part_data["UserData"]
-                use_class = self.builder.get_part_class(object_id)
-                preset_part = use_class.deserialise_from_data(
-                    part_data,
-                    self.builder,
-                    build_rigs=build_rigs
-                )
-                parts.append(preset_part)
+        data = self.DATA_CACHE.get(self.data_path)
+        # Reconstruct objects.
+        for part_data in data.get("Objects", []):
+            object_id = part_data["ObjectID"].replace("^","")
+            use_class = self.builder.get_part_class(object_id)
+            preset_part = use_class.deserialise_from_data(
+                part_data,
+                self.builder,
+                build_rigs=build_rigs
+            )
+            parts.append(preset_part)
         return parts
 
+    def build_prototype(self):
+        """Build the preset once into a hidden collection.
+
+        The collection isn't linked to any scene, it is only drawn through
+        the instance empties that reference it.
+
+        Returns:
+            bpy.types.Collection: The prototype collection.
+        """
+        collection_name = self.PROTOTYPE_COLLECTION.format(self.preset_id)
+        backend = backends.get_backend()
+        collection = backend.find_collection(collection_name)
+        if collection and len(collection.objects):
+            return collection
+        if not collection:
+            collection = backend.new_collection(collection_name)
+
+        for part in self.generate_preset():
+            part.hide_select = True
+            part.belongs_to_preset = True
+            # Flag the part so it isn't treated as part of the scene.
+            part.object["preset_prototype"] = self.preset_id
+            material.assign_preset_material(part.object)
+            # Move it out of the scene and into the prototype.
+            for users_collection in list(part.object.users_collection):
+                users_collection.objects.unlink(part.object)
+            collection.objects.link(part.object)
+        return collection
+
+    def get_local_bounds(self):
+        """Get the box around the preset's part meshes, relative to its control.
+
+        Returns:
+            tuple: The lowest and highest corners as mathutils Vectors, None
+                if the preset has no parts.
+        """
+        data = self.DATA_CACHE.get(self.data_path)
+        preset_document = document.BaseDocument.from_data(data)
+        if not len(preset_document):
+            return None
+        bounds = [
+            self.builder.get_world_bounds(object_id, mathutils.Matrix(matrix))
+            for object_id, matrix in zip(
+                preset_document.get_object_ids(),
+                preset_document.get_matrices().tolist()
+            )
+        ]
+        low = mathutils.Vector([min(corner[axis] for corner, _ in bounds) for axis in range(3)])
+        high = mathutils.Vector([max(corner[axis] for _, corner in bounds) for axis in range(3)])
+        return low, high
+
+    def create_instance(self):
+        """Create an empty that draws an instance of the preset prototype.
+
+        Returns:
+            bpy.ob: The instance empty, which acts as the preset control.
+        """
+        collection = self.build_prototype()
+        instance = backends.get_backend().new_object(self.preset_id)
+        instance.instance_type = "COLLECTION"
+        instance.instance_collection = collection
+        instance.show_name = True
+        instance["PresetID"] = self.preset_id
+        blend_utils.add_to_scene(instance)
+        return instance
+
     def create_control(self, preset_items):
         """Create a control for the preset items.
 
@@ -228,14 +328,15 @@ class Preset(object):
         Args:
             preset_items (list): The blender objects that make up the preset.
         """
-        # Get highest radius value.
-        highest_x = max([part.location[0] for part in preset_items])
-        lowest_x = min([part.location[0] for part in preset_items])
-        highest_y = max([part.location[1] for part in preset_items])
-        lowest_y = min([part.location[1] for part in preset_items])
-        highest_z = max([part.location[2] for part in preset_items])
-        lowest_z = min([part.location[2] for part in preset_items])
-        radius = max([abs(lowest_x), highest_x, abs(lowest_y), highest_y, abs(lowest_z), highest_z])
+        # Get the extent of the part meshes, not just their origins.
+        bounds = [
+            self.builder.get_world_bounds(part.object_id, part.matrix_world)
+            for part in preset_items
+        ]
+        highest_x = max([high[0] for _, high in bounds])
+        lowest_x = min([low[0] for low, _ in bounds])
+        highest_y = max([high[1] for _, high in bounds])
+        lowest_y = min([low[1] for low, _ in bounds])
 
         # Create circle.
         curve_object = self.create_shape(
@@ -256,8 +357,8 @@ class Preset(object):
     @staticmethod
     def create_shape(low_x, high_x, low_y, high_y):
         """Create a bounding-box shape control for the preset."""
-        # Apply a buffer
-        buffer = 4
+        # Apply a buffer, the bounds already cover the part meshes.
+        buffer = 1
         low_x -= buffer
         high_x += buffer
         low_y -= buffer
@@ -280,26 +381,13 @@ class Preset(object):
             [ high_x,    y_mid,  0]
         ]
 
-        # make a new curve
-        crv = bpy.data.curves.new('crv', 'CURVE')
-        crv.dimensions = '3D'
-
-        # make a new spline in that curve
-        spline = crv.splines.new(type='NURBS')
-
-        # a spline point for each point
-        spline.points.add(len(coords_list)-1) # theres already one point by default
-
-        # assign the point coordinates to the spline points
-        for p, new_co in zip(spline.points, coords_list):
-            p.co = (new_co + [1.0]) # (add nurbs weight)
-
-        # make a new object with the curve
-        obj = bpy.data.objects.new('object_name', crv)
+        # Make a new curve object through the points.
+        obj = backends.get_backend().new_curve_object("object_name", coords_list)
         blend_utils.add_to_scene(obj)
         return obj
 
     # Serialisation ---
+    @profiler.instrument()
     def serialise(self):
         """Return NMS compatible dictionary.
 
@@ -369,11 +457,8 @@ class Preset(object):
         
         Data usually comes from NMS or the serialise method.
         """
-        # Some old preset tests were using Object ID as a tag. So we can
-        # use that as a fall back for those legacy builds.
-        object_id = data.get("ObjectID", None)
         # Create object based on the ID.
-        preset_id = data.get("PresetID", object_id).replace("^", "")
+        preset_id = cls.get_preset_id_from_data(data)
         part = cls(preset_id=preset_id, builder_object=builder_object)
         # Get location data.
         pos = data.get("Position", [0.0, 0.0, 0.0])
@@ -384,6 +469,14 @@ class Preset(object):
         return part
 
     # Static Methods ---
+    @staticmethod
+    def get_preset_id_from_data(data):
+        """Get the preset ID from serialised preset data."""
+        # Some old preset tests were using Object ID as a tag. So we can
+        # use that as a fall back for those legacy builds.
+        object_id = data.get("ObjectID", None)
+        return data.get("PresetID", object_id).replace("^", "")
+
     @staticmethod
     def create_matrix_from_vectors(pos, up, at):
         """Create a world space matrix given by an Up and At vector.
@@ -421,6 +514,7 @@ class Preset(object):
         return mat
 
 
+    @profiler.instrument()
     def snap_to(self, target, *args, **kwargs):
         """Just move the preset to the target.
 
@@ -0,0 +1,457 @@
+"""Cached access to the contents of the preset folder.
+
+Nothing in here depends on Blender, so it is safe to use from background
+threads.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import no_mans_sky_base_builder.utils.profiler as profiler
+
+# Parts counted as lines in the preset index.
+LINE_OBJECT_IDS = ("U_POWERLINE", "U_PIPELINE", "U_PORTALLINE", "U_BYTEBEATLINE")
+
+
+def start_interval_thread(func, interval, name):
+    """Call a function every interval seconds on a daemon thread.
+
+    Args:
+        func (callable): The function to call, OSErrors are ignored.
+        interval (float): The number of seconds between calls.
+        name (str): The name of the thread.
+
+    Returns:
+        tuple: The threading.Event that stops the thread, and the thread.
+    """
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.wait(interval):
+            try:
+                func()
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return stop_event, thread
+
+
+class PresetCatalog(object):
+    """A cached list of the presets in a folder.
+
+    The folder is only listed again when its modification time changes.
+    An optional background thread keeps checking the folder so that UI
+    drawing can use the cached presets without touching the disk at all.
+    """
+
+    def __init__(self, preset_path):
+        """PresetCatalog __init__.
+
+        Args:
+            preset_path (str): The folder containing the preset json files.
+        """
+        self.preset_path = preset_path
+        self.__mtime = None
+        self.__presets = []
+        self.__preset_set = frozenset()
+        self.__lock = threading.Lock()
+        self.__stop_event = None
+        self.__thread = None
+
+    def __contains__(self, preset_id):
+        """Check the cached presets for a preset, without checking the disk."""
+        return preset_id in self.__preset_set
+
+    def get_presets(self, validate=True):
+        """Get the list of presets.
+
+        Args:
+            validate (bool): Check the folder for changes first. Turn this
+                off in draw methods and rely on the background rescan.
+
+        Returns:
+            list: The preset names, without the .json extension.
+        """
+        if validate:
+            self.refresh()
+        return self.__presets
+
+    def refresh(self, force=False):
+        """List the preset folder again if it has changed.
+
+        Args:
+            force (bool): List the folder even if it hasn't changed.
+
+        Returns:
+            bool: True if the folder was listed again.
+        """
+        try:
+            mtime = os.stat(self.preset_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if not force and mtime == self.__mtime:
+            return False
+
+        presets = []
+        if mtime is not None:
+            presets = sorted(
+                os.path.splitext(preset)[0]
+                for preset in os.listdir(self.preset_path)
+                if preset.endswith(".json")
+            )
+
+        # Swap both at once so readers never see a half updated catalog.
+        with self.__lock:
+            self.__mtime = mtime
+            self.__presets = presets
+            self.__preset_set = frozenset(presets)
+        return True
+
+    def start_background_rescan(self, interval=2.0):
+        """Start a thread that keeps the catalog in sync with the folder.
+
+        Args:
+            interval (float): The number of seconds between checks.
+        """
+        if self.__thread and self.__thread.is_alive():
+            return
+
+        self.__stop_event, self.__thread = start_interval_thread(
+            self.refresh,
+            interval,
+            "PresetCatalogRescan"
+        )
+
+    def stop_background_rescan(self):
+        """Stop the background thread if it is running."""
+        if self.__stop_event:
+            self.__stop_event.set()
+        self.__stop_event = None
+        self.__thread = None
+
+
+class PresetDataCache(object):
+    """A least recently used cache of parsed preset files.
+
+    Entries are keyed by path and validated against the file's modification
+    time, so an edited preset is read again the next time it is used.
+    """
+
+    def __init__(self, max_size=128):
+        """PresetDataCache __init__.
+
+        Args:
+            max_size (int): The number of parsed presets to keep.
+        """
+        self.max_size = max_size
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def load(path):
+        """Parse a preset file.
+
+        Args:
+            path (str): The path to the preset json file.
+
+        Returns:
+            dict: The preset data.
+        """
+        with open(path, "r") as stream:
+            return json.load(stream)
+
+    def get(self, path):
+        """Get the parsed data of a preset file.
+
+        The returned data is shared, so it must not be modified.
+
+        Args:
+            path (str): The path to the preset json file.
+
+        Returns:
+            dict: The preset data.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        with self.__lock:
+            entry = self.__cache.get(path)
+            if entry and entry[0] == mtime:
+                self.__cache.move_to_end(path)
+                profiler.record_cache("preset_data_cache", True)
+                return entry[1]
+        profiler.record_cache("preset_data_cache", False)
+
+        data = self.load(path)
+        with self.__lock:
+            self.__cache[path] = (mtime, data)
+            self.__cache.move_to_end(path)
+            while len(self.__cache) > self.max_size:
+                self.__cache.popitem(last=False)
+        return data
+
+    def prefetch(self, paths, max_workers=8):
+        """Parse many preset files in parallel ahead of using them.
+
+        Missing or broken files are skipped here, they will raise when the
+        preset is actually built.
+
+        Args:
+            paths (iterable): The paths to the preset json files.
+            max_workers (int): The maximum number of threads to use.
+        """
+        paths = [path for path in set(paths) if os.path.isfile(path)]
+        if not paths:
+            return
+
+        def safe_get(path):
+            try:
+                self.get(path)
+            except (OSError, ValueError):
+                pass
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+            list(pool.map(safe_get, paths))
+
+    def invalidate(self, path=None):
+        """Forget a parsed preset, or all of them if no path is given."""
+        with self.__lock:
+            if path is None:
+                self.__cache.clear()
+            else:
+                self.__cache.pop(path, None)
+
+
+class PresetIndex(object):
+    """Metadata about every preset, stored in a json sidecar file.
+
+    Each entry holds the part count, an ObjectID histogram, the bounding box
+    of the part positions, the line count and the file hash of a preset.
+    Only files whose size or modification time changed are read again, so
+    the index can be kept up to date cheaply from a background thread.
+    """
+
+    # Fields the presets can be sorted by.
+    SORT_KEYS = ("name", "part_count", "line_count", "size")
+
+    def __init__(self, preset_path, index_path):
+        """PresetIndex __init__.
+
+        Args:
+            preset_path (str): The folder containing the preset json files.
+            index_path (str): The json file the index is stored in.
+        """
+        self.preset_path = preset_path
+        self.index_path = index_path
+        self.__entries = None
+        self.__lock = threading.Lock()
+        self.__stop_event = None
+        self.__thread = None
+
+    def __getitem__(self, preset_id):
+        return self.entries[preset_id]
+
+    def __contains__(self, preset_id):
+        return preset_id in self.entries
+
+    @property
+    def entries(self):
+        """dict: Preset ID to metadata, loaded from the sidecar file once."""
+        if self.__entries is None:
+            self.__entries = self.load()
+        return self.__entries
+
+    def get(self, preset_id, default=None):
+        return self.entries.get(preset_id, default)
+
+    def load(self):
+        """Read the index file.
+
+        Returns:
+            dict: Preset ID to metadata, empty if there is no valid index.
+        """
+        try:
+            with open(self.index_path, "r") as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return {}
+        return data.get("presets", {}) if isinstance(data, dict) else {}
+
+    def save(self, entries):
+        """Write the index file, replacing it in a single step."""
+        index_folder = os.path.dirname(self.index_path)
+        if not os.path.isdir(index_folder):
+            os.makedirs(index_folder)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as stream:
+            json.dump({"presets": entries}, stream, indent=4)
+        os.replace(temp_path, self.index_path)
+
+    @staticmethod
+    def describe(raw_data):
+        """Generate the metadata of a preset.
+
+        Args:
+            raw_data (bytes): The contents of the preset file.
+
+        Returns:
+            dict: The preset metadata.
+        """
+        data = json.loads(raw_data.decode("utf-8"))
+        objects = data.get("Objects", [])
+
+        histogram = Counter(
+            item.get("ObjectID", "").replace("^", "") for item in objects
+        )
+        positions = [
+            item["Position"] for item in objects
+            if len(item.get("Position", [])) == 3
+        ]
+        if positions:
+            bounds = [
+                [min(axis) for axis in zip(*positions)],
+                [max(axis) for axis in zip(*positions)],
+            ]
+        else:
+            bounds = [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+
+        return {
+            "hash": hashlib.sha1(raw_data).hexdigest(),
+            "part_count": len(objects),
+            "line_count": sum(histogram[line] for line in LINE_OBJECT_IDS),
+            "object_ids": dict(histogram),
+            "bounds": bounds,
+            "size": max(high - low for low, high in zip(*bounds)),
+        }
+
+    def update(self):
+        """Bring the index in line with the preset folder.
+
+        Returns:
+            bool: True if anything changed.
+        """
+        # The UI and the background thread may both update.
+        with self.__lock:
+            return self.__update()
+
+    def __update(self):
+        old_entries = self.entries
+        new_entries = {}
+        changed = False
+
+        if os.path.isdir(self.preset_path):
+            file_names = os.listdir(self.preset_path)
+        else:
+            file_names = []
+        for file_name in file_names:
+            preset_id, extension = os.path.splitext(file_name)
+            if extension != ".json":
+                continue
+            path = os.path.join(self.preset_path, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            # Skip unchanged files.
+            entry = old_entries.get(preset_id)
+            if (entry and entry.get("mtime") == stat.st_mtime_ns and
+                    entry.get("file_size") == stat.st_size):
+                new_entries[preset_id] = entry
+                continue
+
+            changed = True
+            try:
+                with open(path, "rb") as stream:
+                    raw_data = stream.read()
+                # A touched file with the same contents keeps its metadata.
+                file_hash = hashlib.sha1(raw_data).hexdigest()
+                if entry and entry.get("hash") == file_hash:
+                    entry = dict(entry)
+                else:
+                    entry = self.describe(raw_data)
+            except (OSError, ValueError):
+                continue
+            entry["mtime"] = stat.st_mtime_ns
+            entry["file_size"] = stat.st_size
+            new_entries[preset_id] = entry
+
+        changed = changed or set(old_entries) != set(new_entries)
+        if changed:
+            # Swap the whole dictionary so readers never see a partial index.
+            self.__entries = new_entries
+            self.save(new_entries)
+        return changed
+
+    def query(
+            self,
+            preset_ids,
+            sort_by="name",
+            object_id="",
+            max_parts=0,
+            reverse=False):
+        """Sort and filter presets on their metadata.
+
+        Presets that haven't been indexed yet are only kept when no filter is
+        used and are sorted to the end.
+
+        Args:
+            preset_ids (iterable): The presets to sort and filter.
+            sort_by (str): One of SORT_KEYS.
+            object_id (str): Only keep presets using a part whose ObjectID
+                contains this text.
+            max_parts (int): Only keep presets with at most this many parts,
+                0 means no limit.
+            reverse (bool): Sort in descending order.
+
+        Returns:
+            list: The preset IDs.
+        """
+        entries = self.entries
+        object_id = object_id.upper().replace("^", "")
+        filtered = []
+        for preset_id in preset_ids:
+            entry = entries.get(preset_id)
+            if not entry:
+                if not object_id and not max_parts:
+                    filtered.append(preset_id)
+                continue
+            if max_parts and entry["part_count"] > max_parts:
+                continue
+            if object_id and not any(
+                    object_id in part_id for part_id in entry["object_ids"]):
+                continue
+            filtered.append(preset_id)
+
+        if sort_by == "name":
+            return sorted(filtered, key=str.lower, reverse=reverse)
+
+        indexed = [preset_id for preset_id in filtered if preset_id in entries]
+        missing = [preset_id for preset_id in filtered if preset_id not in entries]
+        indexed.sort(key=lambda preset_id: entries[preset_id][sort_by], reverse=reverse)
+        return indexed + missing
+
+    def start_background_update(self, interval=5.0):
+        """Start a thread that keeps the index in sync with the folder.
+
+        Args:
+            interval (float): The number of seconds between checks.
+        """
+        if self.__thread and self.__thread.is_alive():
+            return
+        self.__stop_event, self.__thread = start_interval_thread(
+            self.update,
+            interval,
+            "PresetIndexUpdate"
+        )
+
+    def stop_background_update(self):
+        """Stop the background thread if it is running."""
+        if self.__stop_event:
+            self.__stop_event.set()
+        self.__stop_event = None
+        self.__thread = None
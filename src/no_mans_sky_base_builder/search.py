@@ -0,0 +1,204 @@
+"""Ranked, typo tolerant search over parts and presets.
+
+Every word of every item is indexed by its trigrams, padded with spaces so
+the start and end of a word count too. A query word matches an item word
+when it is part of it, or when enough of their trigrams are shared (the
+Jaccard similarity of the two trigram sets is over FUZZY_THRESHOLD), so
+"genrator" still finds "GENERATOR". One and two letter query words are too
+short for trigrams and match any word containing them. A search only ever
+looks at items that share trigrams with the query. Nothing in here depends
+on Blender.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+WORD_SPLIT = re.compile(r"[^a-z0-9]+")
+# The share of trigrams two words need in common to count as a typo match.
+FUZZY_THRESHOLD = 0.3
+
+
+def get_words(text):
+    """Split text into lower case search words.
+
+    Args:
+        text (str): The text to split, underscores separate words.
+
+    Returns:
+        list: The words.
+    """
+    return [word for word in WORD_SPLIT.split(text.lower()) if word]
+
+
+def get_trigrams(word):
+    """Get the set of three letter sequences in a word."""
+    return {word[index:index + 3] for index in range(len(word) - 2)}
+
+
+def get_padded_trigrams(word):
+    """Get the trigrams of a word padded with spaces, marking its ends."""
+    return get_trigrams("  {0} ".format(word))
+
+
+def get_similarity(trigrams, other_trigrams):
+    """Get the Jaccard similarity of two sets of trigrams, 0.0 to 1.0."""
+    union = len(trigrams | other_trigrams)
+    return len(trigrams & other_trigrams) / union if union else 0.0
+
+
+class SearchIndex(object):
+    """An n-gram index of items, grouped by item type.
+
+    Each item has a list of fields, the first of which (the ID or name)
+    ranks higher than the rest (category, pack...).
+    """
+
+    # Query words this long or shorter are matched without trigrams.
+    SHORT_TERM_LENGTH = 2
+
+    def __init__(self):
+        """SearchIndex __init__."""
+        self.__items_by_type = {}
+        self.clear()
+
+    def clear(self):
+        """Remove every item."""
+        self.__items_by_type.clear()
+        self.__build()
+
+    def has_type(self, item_type):
+        return item_type in self.__items_by_type
+
+    def set_items(self, item_type, items):
+        """Replace all items of a type.
+
+        Args:
+            item_type (str): The type of the items, e.g. "parts".
+            items (iterable): tuple (str, list): Item ID and search fields.
+        """
+        self.__items_by_type[item_type] = list(items)
+        self.__build()
+
+    def __build(self):
+        """Index every item."""
+        # Item ID, item type, primary words and all words of each entry.
+        self.__entries = []
+        self.__trigrams = defaultdict(set)
+        self.__short_terms = defaultdict(set)
+        # The padded trigrams of every indexed word.
+        self.__word_trigrams = {}
+
+        for item_type, items in self.__items_by_type.items():
+            for item_id, fields in items:
+                primary_words = set(get_words(fields[0])) if fields else set()
+                words = set()
+                for field in fields:
+                    words.update(get_words(field))
+                entry_index = len(self.__entries)
+                self.__entries.append((item_id, item_type, primary_words, words))
+
+                for word in words:
+                    trigrams = self.__word_trigrams.get(word)
+                    if trigrams is None:
+                        trigrams = self.__word_trigrams[word] = get_padded_trigrams(word)
+                    for trigram in trigrams:
+                        self.__trigrams[trigram].add(entry_index)
+                    # Every one and two letter run, not just the prefixes.
+                    for length in range(1, self.SHORT_TERM_LENGTH + 1):
+                        for index in range(len(word) - length + 1):
+                            self.__short_terms[word[index:index + length]].add(entry_index)
+
+    def get_candidates(self, term):
+        """Get the entries that may contain a search term, or a typo of it.
+
+        Args:
+            term (str): A single lower case search word.
+
+        Returns:
+            set: Entry indices.
+        """
+        if len(term) <= self.SHORT_TERM_LENGTH:
+            return self.__short_terms.get(term, set())
+
+        # Entries containing the term have all of its own trigrams.
+        candidates = None
+        for trigram in get_trigrams(term):
+            entries = self.__trigrams.get(trigram, set())
+            candidates = entries if candidates is None else candidates & entries
+
+        # Count the padded trigrams of the term each entry shares. A word can
+        # only be similar enough if its entry shares this many.
+        trigrams = get_padded_trigrams(term)
+        required = math.ceil(FUZZY_THRESHOLD * len(trigrams))
+        counts = Counter()
+        for trigram in trigrams:
+            counts.update(self.__trigrams.get(trigram, ()))
+        return candidates | {
+            entry_index for entry_index, count in counts.items() if count >= required
+        }
+
+    def score_term(self, term, words):
+        """Score how well a search term matches a set of words.
+
+        Returns:
+            float: 3 for a whole word, 2 for a word prefix, 1 for part of a
+                word, the trigram similarity (below 1) for a close spelling
+                and 0 for no match.
+        """
+        if term in words:
+            return 3
+        best = 0
+        for word in words:
+            if word.startswith(term):
+                return 2
+            if term in word:
+                best = 1
+        if best or len(term) <= self.SHORT_TERM_LENGTH:
+            return best
+
+        trigrams = get_padded_trigrams(term)
+        for word in words:
+            similarity = get_similarity(trigrams, self.__word_trigrams[word])
+            if similarity >= FUZZY_THRESHOLD and similarity > best:
+                best = similarity
+        return best
+
+    def search(self, query, limit=50):
+        """Find the items matching every word of a query.
+
+        Exact and substring matches rank above close spellings.
+
+        Args:
+            query (str): The search text.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list: tuple (str, str): Item ID and item type, best match first.
+        """
+        terms = get_words(query)
+        if not terms:
+            return []
+
+        # Only consider entries that can match every term.
+        candidates = None
+        for term in sorted(terms, key=len, reverse=True):
+            entries = self.get_candidates(term)
+            candidates = entries if candidates is None else candidates & entries
+            if not candidates:
+                return []
+
+        results = []
+        for entry_index in candidates:
+            item_id, item_type, primary_words, words = self.__entries[entry_index]
+            score = 0
+            for term in terms:
+                term_score = self.score_term(term, words)
+                if not term_score:
+                    break
+                # Matches on the name count double.
+                score += term_score + self.score_term(term, primary_words)
+            else:
+                results.append((-score, len(item_id), item_id, item_type))
+
+        results.sort()
+        return [(item_id, item_type) for _, _, item_id, item_type in results[:limit]]
@@ -2,7 +2,7 @@
 import math
 
 import addon_utils
-import bpy
+import no_mans_sky_base_builder.backends as backends
 
 
 def load_plugin(plugin_name):
@@ -11,27 +11,62 @@ def load_plugin(plugin_name):
     if not is_enabled:
         addon_utils.enable(plugin_name)
 
-def add_to_scene(item, collection_name="Collection"):
+def get_scene_collection_name(scene=None):
+    """Get the name of the collection new items of a scene are placed in.
+
+    Scenes can override the default "Collection" with an "nms_collection"
+    property, which keeps the contents of separate scenes apart.
+
+    Args:
+        scene (bpy.types.Scene): The scene, defaults to the current one.
+
+    Returns:
+        str: The collection name.
+    """
+    if scene is None:
+        return backends.get_backend().get_scene_collection_name()
+    return scene.get("nms_collection", "Collection")
+
+
+def add_to_scene(item, collection_name=None):
     """Add an item to the main blender collection.
 
     A Collection is a concept introduced in Blender 2.8. Which can be seen
     as a group/scene of items.
 
-    By default we should add all new items to the default "Collection".
+    By default we should add all new items to the collection of the current
+    scene, which is "Collection" unless the scene specifies otherwise.
 
     Args:
         item (bpy_types.Object): The blender object.
         collection_name(str): The name of the collection to place the item in.
     """
-    # Validate collection existence.
-    if collection_name not in bpy.data.collections:
-        collection = bpy.data.collections.new(collection_name)
-        bpy.context.scene.collection.children.link(collection)
+    backends.get_backend().link(item, collection_name)
+
+
+def get_collection(collection_name, parent_name=None):
+    """Get a collection, creating it if it doesn't exist yet.
+
+    Args:
+        collection_name (str): The name of the collection.
+        parent_name (str): The collection to create it under, defaults to
+            the scene's master collection.
+
+    Returns:
+        bpy.types.Collection: The collection.
+    """
+    return backends.get_backend().get_collection(collection_name, parent_name)
 
-    # Add the item to the collection.
-    object_set = bpy.data.collections[collection_name].objects
-    if item.name not in object_set:
-        object_set.link(item)
+
+def move_to_collection(item, collection_name, parent_name=None):
+    """Move an item out of its current collections into another one.
+
+    Args:
+        item (bpy_types.Object): The blender object.
+        collection_name (str): The name of the collection to move it to.
+        parent_name (str): The collection to create it under if need be.
+    """
+    backends.get_backend().move_to_collection(item, collection_name, parent_name)
 
 
 def get_item_by_name(item_name):
@@ -43,7 +78,11 @@ def get_item_by_name(item_name):
     Returns:
         bpy_types.Object: The Blender object.    
     """
-    return bpy.data.objects[item_name]
+    item = backends.get_backend().get_object(item_name)
+    if item is None:
+        raise KeyError(item_name)
+    return item
+
 
 def item_exists_by_name(item_name):
     """Check for a Blender object by specifying the name of the object.
@@ -54,7 +93,8 @@ def item_exists_by_name(item_name):
     Returns:
         bool: True iff object exists.    
     """
-    return item_name in bpy.data.objects
+    return backends.get_backend().get_object(item_name) is not None
+
 
 def remove_object(name):
     """Remove an item from the scene by specifying it's name.
@@ -62,9 +102,10 @@ def remove_object(name):
     Args:
         name (str): The name of the object to remove.
     """
-    objs = bpy.data.objects
-    if name in objs:
-        objs.remove(objs[name], do_unlink=True)
+    backend = backends.get_backend()
+    item = backend.get_object(name)
+    if item is not None:
+        backend.remove_object(item)
 
 
 # Force refresh of scene so the matrix values are correct.
@@ -74,8 +115,7 @@ def scene_refresh():
     This is sometimes required when adding and removing constraints on 
     certain objects.
     """
-    layer = bpy.context.view_layer
-    layer.update()
+    backends.get_backend().refresh()
 
 
 def set_active_item(item):
@@ -86,7 +126,7 @@ def set_active_item(item):
     Args:
         item (bpy_types.Object): The item to set as active.
     """
-    bpy.context.view_layer.objects.active = item
+    backends.get_backend().set_active(item)
 
 
 def select(selection, add=False):
@@ -100,21 +140,10 @@ def select(selection, add=False):
             This can be a singular object or a list of objects.
         add (bool): Appends the selection if `True` else select by itself.
     """
-    # Deselect all.
-    if not add:
-        bpy.ops.object.select_all(action='DESELECT')
-        set_active_item(None)
-
     # Ensure List.
     if not isinstance(selection, list):
         selection = [selection]
-
-    for item in selection:
-        item.select_set(True)
-
-    # Make the last item the active one.
-    selection[-1].select_set(True)
-    set_active_item(selection[-1])
+    backends.get_backend().select(selection, add=add)
 
 
 def get_current_selection():
@@ -123,8 +152,9 @@ def get_current_selection():
     Returns:
         bpy_types.Object: The selected item.
     """
-    if bpy.context.selected_objects:
-        return bpy.context.selected_objects[-1]
+    selection = backends.get_backend().get_selection()
+    if selection:
+        return selection[-1]
 
 
 def get_distance_between(matrix1, matrix2):
@@ -146,13 +176,5 @@ def get_distance_between(matrix1, matrix2):
 
 def delete(bpy_object):
     """Remove the item and everything below it."""
-    # Deselect all
-    bpy.ops.object.select_all(action='DESELECT')
-    
-    # Parent items to control.
-    for part in bpy_object.children:
-        part.hide_select = False
-        part.select_set(True)
-    
-    bpy_object.select_set(True)
-    bpy.ops.object.delete() 
+    backends.get_backend().delete(bpy_object)
+
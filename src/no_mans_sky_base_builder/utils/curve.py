@@ -1,5 +1,9 @@
 """Convenient curve related methods."""
+import math
+
 import bpy
+import mathutils
+import numpy as np
 
 
 def duplicate_along_curve(builder, bpy_object, curve, gap_distance=0.1):
@@ -12,7 +16,11 @@ def duplicate_along_curve(builder, bpy_object, curve, gap_distance=0.1):
         gap_distance (float): The percentage of the curve distance to
             distribute the item , This will likely be tweaked around by the
             user to get desired result.
+
+    Returns:
+        list: The new builder items.
     """
+    new_items = []
     percentage_count = 0.0
     while percentage_count <= 1.0:
         # Build Item.
@@ -37,3 +45,179 @@ def duplicate_along_curve(builder, bpy_object, curve, gap_distance=0.1):
         constraint.use_fixed_location = True
         constraint.offset_factor = percentage_count
         percentage_count += gap_distance
+        new_items.append(new_item)
+    return new_items
+
+
+def get_curve_points(curve):
+    """Get the evaluated points of a curve in world space.
+
+    Args:
+        curve (bpy_types.Object): The Blender curve object.
+
+    Returns:
+        numpy.ndarray: (n, 3) points in order along the first spline.
+    """
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    evaluated_curve = curve.evaluated_get(depsgraph)
+    mesh = evaluated_curve.to_mesh()
+    try:
+        coords = np.zeros(len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get("co", coords)
+    finally:
+        evaluated_curve.to_mesh_clear()
+    coords = coords.reshape(-1, 3)
+
+    # Only follow the first spline.
+    splines = curve.data.splines
+    spline = splines[0] if splines else None
+    if spline and len(splines) > 1:
+        if spline.type == "BEZIER":
+            segment_count = len(spline.bezier_points) - (0 if spline.use_cyclic_u else 1)
+            point_count = segment_count * spline.resolution_u
+            if not spline.use_cyclic_u:
+                point_count += 1
+        else:
+            point_count = len(spline.points)
+        coords = coords[:point_count]
+    # Close the loop of cyclic splines.
+    if spline and spline.use_cyclic_u and len(coords):
+        coords = np.vstack([coords, coords[:1]])
+
+    matrix = np.array(curve.matrix_world)
+    return coords @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def sample_curve_matrices(points, distances):
+    """Get world matrices at arc length distances along a polyline.
+
+    Each matrix aims its Y axis along the curve with Z towards world Z,
+    the same as a FOLLOW_PATH constraint with curve follow.
+
+    Args:
+        points (numpy.ndarray): (n, 3) points along the curve.
+        distances (numpy.ndarray): (m,) distances along the curve.
+
+    Returns:
+        numpy.ndarray: (m, 4, 4) world matrices.
+    """
+    segments = np.diff(points, axis=0)
+    segment_lengths = np.linalg.norm(segments, axis=1)
+    # Drop repeated points, which have no direction.
+    keep = segment_lengths > 1e-9
+    segments = segments[keep]
+    segment_lengths = segment_lengths[keep]
+    starts = points[:-1][keep]
+    cumulative = np.concatenate([[0.0], np.cumsum(segment_lengths)])
+
+    # Find the segment under each distance and interpolate along it.
+    indices = np.searchsorted(cumulative, distances, side="right") - 1
+    indices = np.clip(indices, 0, len(segments) - 1)
+    factors = (distances - cumulative[indices]) / segment_lengths[indices]
+    positions = starts[indices] + segments[indices] * factors[:, None]
+
+    # Build the frames.
+    y_axis = segments[indices] / segment_lengths[indices][:, None]
+    up = np.zeros_like(y_axis)
+    vertical = np.abs(y_axis[:, 2]) > 0.9999
+    up[~vertical] = (0.0, 0.0, 1.0)
+    up[vertical] = (1.0, 0.0, 0.0)
+    x_axis = np.cross(y_axis, up)
+    x_axis /= np.linalg.norm(x_axis, axis=1)[:, None]
+    z_axis = np.cross(x_axis, y_axis)
+
+    matrices = np.zeros((len(distances), 4, 4))
+    matrices[:, :3, 0] = x_axis
+    matrices[:, :3, 1] = y_axis
+    matrices[:, :3, 2] = z_axis
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def bake_along_curve(builder, bpy_object, curve, gap_distance=0.1):
+    """Duplicate uniformly along a curve with final matrices, no constraints.
+
+    The curve is sampled by arc length once and every copy is placed in a
+    single pass, so spacing is exact and nothing is left to evaluate. Like
+    FOLLOW_PATH, the curve frame is applied on top of each copy's rest
+    matrix.
+
+    Args:
+        builder (object): The NMS Builder object.
+        bpy_object (bpy_types.Object): The Blender object to duplicate.
+        curve (bpy_types.Curve): The Blender curve object.
+        gap_distance (float): The percentage of the curve distance between
+            each copy.
+
+    Returns:
+        list: The new builder items.
+    """
+    points = get_curve_points(curve)
+    if len(points) < 2:
+        return []
+    length = np.linalg.norm(np.diff(points, axis=0), axis=1).sum()
+    if length <= 0.0:
+        return []
+
+    # Count the copies up front rather than accumulating the gap.
+    count = int(math.floor(1.0 / gap_distance + 1e-9)) + 1
+    distances = np.minimum(np.arange(count) * gap_distance * length, length)
+    matrices = sample_curve_matrices(points, distances)
+
+    new_items = []
+    for matrix in matrices.tolist():
+        if "ObjectID" in bpy_object:
+            new_item = builder.add_part(
+                bpy_object["ObjectID"],
+                user_data=bpy_object.get("UserData")
+            )
+        elif "PresetID" in bpy_object:
+            new_item = builder.add_preset(bpy_object["PresetID"])
+        else:
+            break
+        new_item.matrix_world = mathutils.Matrix(matrix) @ new_item.matrix_world
+        new_items.append(new_item)
+    return new_items
+
+
+def compare_bake_with_constraints(builder, bpy_object, curve, gap_distance=0.1):
+    """Measure how far baked copies are from constrained ones.
+
+    Copies are placed both ways along the curve and their world matrices
+    compared, then all of them are removed again.
+
+    Args:
+        builder (object): The NMS Builder object.
+        bpy_object (bpy_types.Object): The Blender object to duplicate.
+        curve (bpy_types.Curve): The Blender curve object.
+        gap_distance (float): The percentage of the curve distance between
+            each copy.
+
+    Returns:
+        tuple: The largest difference in position and in any axis vector.
+    """
+    constrained = duplicate_along_curve(builder, bpy_object, curve, gap_distance)
+    bpy.context.view_layer.update()
+    expected = [item.matrix_world.copy() for item in constrained]
+    baked = bake_along_curve(builder, bpy_object, curve, gap_distance)
+
+    position_error = 0.0
+    axis_error = 0.0
+    for matrix, item in zip(expected, baked):
+        actual = item.matrix_world
+        position_error = max(
+            position_error,
+            (matrix.to_translation() - actual.to_translation()).length
+        )
+        for axis in range(3):
+            axis_error = max(
+                axis_error,
+                (matrix.col[axis].xyz - actual.col[axis].xyz).length
+            )
+
+    # Clean up both sets of copies.
+    for item in constrained + baked:
+        bpy_item = item.control if hasattr(item, "control") else item.object
+        builder.backend.delete(bpy_item)
+    return position_error, axis_error
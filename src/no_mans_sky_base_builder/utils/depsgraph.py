@@ -0,0 +1,59 @@
+"""A single depsgraph handler shared by everything that follows scene edits.
+
+The line solver and the line batch both react to objects moving. Rather
+than each adding and removing its own handler, they subclass
+DepsgraphListener and are called from one persistent handler that is only
+registered while at least one listener is enabled.
+"""
+import bpy
+
+# The enabled listeners, in the order they were enabled.
+_listeners = []
+
+
+@bpy.app.handlers.persistent
+def notify_listeners(scene, depsgraph):
+    """Depsgraph handler that passes updates on to every listener."""
+    for listener in list(_listeners):
+        listener.on_depsgraph_update(depsgraph)
+
+
+def update_handler():
+    """Register the handler while there are listeners, remove it otherwise."""
+    handlers = bpy.app.handlers.depsgraph_update_post
+    if _listeners and notify_listeners not in handlers:
+        handlers.append(notify_listeners)
+    elif not _listeners and notify_listeners in handlers:
+        handlers.remove(notify_listeners)
+
+
+def disable_all():
+    """Disable every listener, removing the handler."""
+    for listener in list(_listeners):
+        listener.enabled = False
+    update_handler()
+
+
+class DepsgraphListener(object):
+    """Receives on_depsgraph_update calls while enabled."""
+
+    def __init__(self):
+        """DepsgraphListener __init__."""
+        self.__enabled = False
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        """Start or stop listening."""
+        self.__enabled = bool(value)
+        if self.__enabled and self not in _listeners:
+            _listeners.append(self)
+        elif not self.__enabled and self in _listeners:
+            _listeners.remove(self)
+        update_handler()
+
+    def on_depsgraph_update(self, depsgraph):
+        raise NotImplementedError
@@ -0,0 +1,249 @@
+"""Draw every line of a type as one generated mesh.
+
+Each power, pipe, portal and bytebeat line is normally its own object with
+its own copy of the mesh. In batch mode the individual lines are hidden and
+their geometry is baked into a single mesh per line type, so the viewport
+draws one object per line type.
+
+The line objects stay in the scene, hidden, so export, rigs and the line
+solver are unaffected. The number of objects in the file does not go down,
+batching only saves drawing them.
+
+Each face of a batch mesh keeps the index of the line it came from in the
+"line_index" face layer, which maps back to the "line_names" property on
+the batch object.
+"""
+import bpy
+import numpy as np
+import no_mans_sky_base_builder.utils.blend_utils as blend_utils
+import no_mans_sky_base_builder.utils.depsgraph as depsgraph_utils
+
+LINE_TYPES = ("U_POWERLINE", "U_PIPELINE", "U_PORTALLINE", "U_BYTEBEATLINE")
+INDEX_LAYER = "line_index"
+
+
+class LineBatch(depsgraph_utils.DepsgraphListener):
+    def __init__(self):
+        """LineBatch __init__."""
+        super(LineBatch, self).__init__()
+        self.__updating = False
+        self.clear()
+
+    def clear(self):
+        """Forget all batches, the batch objects are left untouched."""
+        # Per line type batch information.
+        self.__batches = {}
+        # Line name to (line type, line index).
+        self.__line_lookup = {}
+
+    @staticmethod
+    def get_batch_name(object_id):
+        return "{0}_BATCH".format(object_id)
+
+    @staticmethod
+    def get_lines():
+        """Get all line objects in the scene grouped by their ObjectID."""
+        lines = {object_id: [] for object_id in LINE_TYPES}
+        for bpy_object in bpy.context.scene.objects:
+            object_id = bpy_object.get("ObjectID")
+            if object_id in lines:
+                lines[object_id].append(bpy_object)
+        return lines
+
+    @staticmethod
+    def get_matrices(line_objects):
+        """Get the world matrices of the lines as an (n, 4, 4) array."""
+        return np.array([line.matrix_world for line in line_objects])
+
+    def build(self):
+        """Build a batch mesh for every line type and hide the lines."""
+        self.remove()
+        for object_id, line_objects in self.get_lines().items():
+            if line_objects:
+                self.build_type(object_id, line_objects)
+
+    def build_type(self, object_id, line_objects):
+        """Bake all lines of a type into a single mesh object.
+
+        All lines of a type share the same geometry, so the first line's
+        mesh is used as a template and transformed by every line matrix.
+
+        Args:
+            object_id (str): The line type.
+            line_objects (list): The line objects of that type.
+        """
+        # Read the template geometry.
+        template = line_objects[0].data
+        vertex_count = len(template.vertices)
+        loop_count = len(template.loops)
+        face_count = len(template.polygons)
+        coords = np.zeros(vertex_count * 3)
+        template.vertices.foreach_get("co", coords)
+        coords = np.c_[coords.reshape(-1, 3), np.ones(vertex_count)]
+        loop_vertices = np.zeros(loop_count, dtype=np.int32)
+        template.loops.foreach_get("vertex_index", loop_vertices)
+        loop_starts = np.zeros(face_count, dtype=np.int32)
+        template.polygons.foreach_get("loop_start", loop_starts)
+        loop_totals = np.zeros(face_count, dtype=np.int32)
+        template.polygons.foreach_get("loop_total", loop_totals)
+
+        # Offset the topology for every line.
+        line_total = len(line_objects)
+        offsets = np.arange(line_total, dtype=np.int32)[:, None]
+        all_loop_vertices = (loop_vertices + offsets * vertex_count).ravel()
+        all_loop_starts = (loop_starts + offsets * loop_count).ravel()
+        all_loop_totals = np.tile(loop_totals, line_total)
+        line_indices = np.repeat(np.arange(line_total, dtype=np.int32), face_count)
+
+        # Create the mesh.
+        batch_name = self.get_batch_name(object_id)
+        mesh = bpy.data.meshes.new(batch_name)
+        mesh.vertices.add(vertex_count * line_total)
+        mesh.loops.add(loop_count * line_total)
+        mesh.polygons.add(face_count * line_total)
+        mesh.loops.foreach_set("vertex_index", all_loop_vertices)
+        mesh.polygons.foreach_set("loop_start", all_loop_starts)
+        mesh.polygons.foreach_set("loop_total", all_loop_totals)
+        mesh.update(calc_edges=True)
+        index_layer = mesh.polygon_layers_int.new(name=INDEX_LAYER)
+        index_layer.data.foreach_set("value", line_indices)
+        for material in template.materials:
+            mesh.materials.append(material)
+
+        batch_object = bpy.data.objects.new(batch_name, mesh)
+        batch_object["line_batch"] = object_id
+        batch_object["line_names"] = [line.name for line in line_objects]
+        blend_utils.add_to_scene(batch_object)
+
+        self.__batches[object_id] = {
+            "object": batch_object.name,
+            "lines": [line.name for line in line_objects],
+            "template": coords,
+            "coords": np.zeros((line_total, vertex_count, 3)),
+        }
+        for index, line in enumerate(line_objects):
+            self.__line_lookup[line.name] = (object_id, index)
+            line.hide_set(True)
+
+        self.update_type(object_id, np.arange(line_total))
+
+    def update_type(self, object_id, indices):
+        """Move the geometry of some lines of a batch to their matrices.
+
+        Args:
+            object_id (str): The line type.
+            indices (numpy.ndarray): The indices of the lines in the batch.
+        """
+        batch = self.__batches[object_id]
+        batch_object = bpy.data.objects.get(batch["object"])
+        if not batch_object:
+            return
+
+        # Deleted lines change the topology, so build the type again.
+        objects = bpy.data.objects
+        line_objects = [objects.get(batch["lines"][index]) for index in indices]
+        if not all(line_objects):
+            self.rebuild_type(object_id)
+            return
+
+        matrices = self.get_matrices(line_objects)
+        # (lines, 4, 4) @ (4, verts) -> (lines, verts, 3).
+        moved = np.einsum("lij,vj->lvi", matrices, batch["template"])
+        batch["coords"][indices] = moved[:, :, :3]
+
+        mesh = batch_object.data
+        self.__updating = True
+        try:
+            mesh.vertices.foreach_set("co", batch["coords"].ravel())
+            mesh.update()
+        finally:
+            self.__updating = False
+
+    def remove(self):
+        """Remove the batch objects and show the individual lines again."""
+        for bpy_object in list(bpy.data.objects):
+            if "line_batch" not in bpy_object:
+                continue
+            for line_name in bpy_object.get("line_names", []):
+                line = bpy.data.objects.get(line_name)
+                if line:
+                    line.hide_set(False)
+            mesh = bpy_object.data
+            bpy.data.objects.remove(bpy_object, do_unlink=True)
+            if mesh and not mesh.users:
+                bpy.data.meshes.remove(mesh)
+        self.clear()
+
+    def get_selected_lines(self, batch_object):
+        """Get the line objects of the selected faces of a batch object.
+
+        Args:
+            batch_object (bpy.ob): The batch object.
+
+        Returns:
+            list: The line objects.
+        """
+        mesh = batch_object.data
+        index_layer = mesh.polygon_layers_int.get(INDEX_LAYER)
+        if not index_layer:
+            return []
+        face_count = len(mesh.polygons)
+        selected = np.zeros(face_count, dtype=bool)
+        mesh.polygons.foreach_get("select", selected)
+        indices = np.zeros(face_count, dtype=np.int32)
+        index_layer.data.foreach_get("value", indices)
+
+        line_names = batch_object.get("line_names", [])
+        lines = []
+        for index in np.unique(indices[selected]):
+            line = bpy.data.objects.get(line_names[index])
+            if line:
+                lines.append(line)
+        return lines
+
+    def on_depsgraph_update(self, depsgraph):
+        """Follow any batched lines that moved and pick up new lines."""
+        if self.__updating:
+            return
+
+        moved = {}
+        rebuild = set()
+        for update in depsgraph.updates:
+            if not isinstance(update.id, bpy.types.Object):
+                continue
+            name = update.id.name
+            if name in self.__line_lookup:
+                if update.is_updated_transform:
+                    object_id, index = self.__line_lookup[name]
+                    moved.setdefault(object_id, []).append(index)
+            elif update.id.get("ObjectID") in LINE_TYPES:
+                rebuild.add(update.id["ObjectID"])
+
+        # New lines change the topology, so that type is built again.
+        for object_id in rebuild:
+            self.rebuild_type(object_id)
+
+        for object_id, indices in moved.items():
+            if object_id not in rebuild:
+                self.update_type(object_id, np.array(indices))
+
+    def rebuild_type(self, object_id):
+        """Build the batch of a single line type from scratch."""
+        self.remove_type(object_id)
+        line_objects = self.get_lines()[object_id]
+        if line_objects:
+            self.build_type(object_id, line_objects)
+
+    def remove_type(self, object_id):
+        """Remove the batch of a single line type."""
+        batch = self.__batches.pop(object_id, None)
+        if not batch:
+            return
+        for line_name in batch["lines"]:
+            self.__line_lookup.pop(line_name, None)
+        batch_object = bpy.data.objects.get(batch["object"])
+        if batch_object:
+            mesh = batch_object.data
+            bpy.data.objects.remove(batch_object, do_unlink=True)
+            if not mesh.users:
+                bpy.data.meshes.remove(mesh)
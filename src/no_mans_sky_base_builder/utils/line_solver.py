@@ -0,0 +1,217 @@
+"""A driver-free alternative to rigging lines with constraints.
+
+Every rigged line normally carries three location drivers, a LOC_DIFF scale
+driver and a TRACK_TO constraint. With thousands of lines that is tens of
+thousands of Python drivers evaluated whenever anything moves.
+
+The solver instead keeps a compact table of (line, start control,
+end control) rows. While enabled it looks for controls that moved on every
+depsgraph update and recomputes the matrices of the affected lines in one
+vectorised pass.
+"""
+import bpy
+import mathutils
+import numpy as np
+import no_mans_sky_base_builder.utils.depsgraph as depsgraph_utils
+
+
+class LineSolver(depsgraph_utils.DepsgraphListener):
+
+    # Below this length a line has no direction to aim along.
+    MIN_LENGTH = 1e-8
+
+    def __init__(self):
+        """LineSolver __init__."""
+        super(LineSolver, self).__init__()
+        self.__solving = False
+        self.clear()
+
+    def clear(self):
+        """Empty the line table."""
+        # Line rows.
+        self.__lines = []
+        self.__line_rows = {}
+        self.__starts = []
+        self.__ends = []
+        # Control look up.
+        self.__controls = []
+        self.__control_index = {}
+        # Rows waiting to be solved and the cached numpy table.
+        self.__pending = set()
+        self.__table = None
+
+    def __len__(self):
+        return len(self.__line_rows)
+
+    def get_control_index(self, control_name):
+        """Get the index of a control in the table, adding it if need be."""
+        index = self.__control_index.get(control_name)
+        if index is None:
+            index = len(self.__controls)
+            self.__controls.append(control_name)
+            self.__control_index[control_name] = index
+        return index
+
+    def add(self, line_object, start, end):
+        """Add a line to the table or update its controls.
+
+        The line is solved on the next call to flush, or on the next
+        depsgraph update.
+
+        Args:
+            line_object (bpy.ob): The line object.
+            start (bpy.ob): The start control.
+            end (bpy.ob): The end control.
+        """
+        start_index = self.get_control_index(start.name)
+        end_index = self.get_control_index(end.name)
+
+        row = self.__line_rows.get(line_object.name)
+        if row is None:
+            row = len(self.__lines)
+            self.__lines.append(line_object.name)
+            self.__starts.append(start_index)
+            self.__ends.append(end_index)
+            self.__line_rows[line_object.name] = row
+        else:
+            self.__starts[row] = start_index
+            self.__ends[row] = end_index
+
+        self.__pending.add(row)
+        self.__table = None
+
+    def remove(self, line_name):
+        """Stop solving a line.
+
+        Args:
+            line_name (str): The name of the line object.
+        """
+        row = self.__line_rows.pop(line_name, None)
+        if row is not None:
+            self.__lines[row] = None
+            self.__pending.discard(row)
+
+    def get_table(self):
+        """Get the start and end control indices as numpy arrays."""
+        if self.__table is None:
+            self.__table = (
+                np.array(self.__starts, dtype=np.int64),
+                np.array(self.__ends, dtype=np.int64)
+            )
+        return self.__table
+
+    def get_rows_for_controls(self, control_names):
+        """Get the rows of all lines driven by any of the given controls.
+
+        Args:
+            control_names (iterable): Names of the controls.
+
+        Returns:
+            numpy.ndarray: The line rows.
+        """
+        indices = [
+            self.__control_index[name] for name in control_names
+            if name in self.__control_index
+        ]
+        if not indices:
+            return np.zeros(0, dtype=np.int64)
+        starts, ends = self.get_table()
+        moved = np.isin(starts, indices) | np.isin(ends, indices)
+        return np.nonzero(moved)[0]
+
+    def flush(self):
+        """Solve every line added since the last solve."""
+        if self.__pending:
+            rows = np.fromiter(self.__pending, dtype=np.int64)
+            self.__pending.clear()
+            self.solve(rows)
+
+    def solve(self, rows=None):
+        """Recompute the world matrices of lines in one vectorised pass.
+
+        This reproduces the driver rig. The line sits on the start control,
+        aims its Z axis at the end control with Y towards world Z, and its Z
+        scale is the distance between the two.
+
+        Args:
+            rows (numpy.ndarray): The rows to solve, defaults to all of them.
+        """
+        starts, ends = self.get_table()
+        if rows is None:
+            rows = np.arange(len(self.__lines))
+
+        # Skip lines that have since been deleted.
+        objects = bpy.data.objects
+        line_objects = []
+        valid_rows = []
+        for row in rows:
+            line_name = self.__lines[row]
+            line_object = objects.get(line_name) if line_name else None
+            if line_object:
+                line_objects.append(line_object)
+                valid_rows.append(row)
+        if not valid_rows:
+            return
+        rows = np.array(valid_rows, dtype=np.int64)
+        starts = starts[rows]
+        ends = ends[rows]
+
+        # Read every control position once.
+        positions = np.zeros((len(self.__controls), 3))
+        for index in np.unique(np.concatenate([starts, ends])):
+            control = objects.get(self.__controls[index])
+            if control:
+                positions[index] = control.location
+        scales = np.array([line.scale[:2] for line in line_objects])
+
+        # Aim the Z axis down the line.
+        direction = positions[ends] - positions[starts]
+        length = np.linalg.norm(direction, axis=1)
+        degenerate = length < self.MIN_LENGTH
+        z_axis = direction / np.where(degenerate, 1.0, length)[:, None]
+        z_axis[degenerate] = (0.0, 0.0, 1.0)
+
+        # Point Y towards world Z, falling back to world Y when vertical.
+        up = np.zeros_like(z_axis)
+        vertical = np.abs(z_axis[:, 2]) > 0.9999
+        up[~vertical] = (0.0, 0.0, 1.0)
+        up[vertical] = (0.0, 1.0, 0.0)
+        y_axis = up - z_axis * np.einsum("ij,ij->i", up, z_axis)[:, None]
+        y_axis /= np.linalg.norm(y_axis, axis=1)[:, None]
+        x_axis = np.cross(y_axis, z_axis)
+
+        # Compose the world matrices.
+        matrices = np.zeros((len(rows), 4, 4))
+        matrices[:, :3, 0] = x_axis * scales[:, 0:1]
+        matrices[:, :3, 1] = y_axis * scales[:, 1:2]
+        matrices[:, :3, 2] = z_axis * length[:, None]
+        matrices[:, :3, 3] = positions[starts]
+        matrices[:, 3, 3] = 1.0
+
+        self.__solving = True
+        try:
+            for line_object, matrix in zip(line_objects, matrices.tolist()):
+                line_object.matrix_world = mathutils.Matrix(matrix)
+        finally:
+            self.__solving = False
+
+    def on_depsgraph_update(self, depsgraph):
+        """Solve pending lines and any lines whose controls have moved."""
+        # Ignore the updates caused by writing the line matrices.
+        if self.__solving or not self.__line_rows:
+            return
+
+        moved = set()
+        for update in depsgraph.updates:
+            if not update.is_updated_transform:
+                continue
+            if isinstance(update.id, bpy.types.Object):
+                moved.add(update.id.name)
+
+        rows = self.get_rows_for_controls(moved)
+        if self.__pending:
+            pending = np.fromiter(self.__pending, dtype=np.int64)
+            self.__pending.clear()
+            rows = np.union1d(rows, pending)
+        if len(rows):
+            self.solve(rows)
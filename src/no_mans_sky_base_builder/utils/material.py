@@ -2,6 +2,7 @@
 import os
 
 import bpy
+import no_mans_sky_base_builder.utils.profiler as profiler
 import no_mans_sky_base_builder.utils.python as python_utils
 
 # Get Colour Information.
@@ -11,7 +12,63 @@ material_reference = python_utils.load_dictionary(COLOURS_JSON)
 
 GHOSTED_JSON = os.path.join(FILE_PATH, "..", "resources", "ghosted.json")
 ghosted_reference = python_utils.load_dictionary(GHOSTED_JSON)
-GHOSTED_ITEMS = ghosted_reference["GHOSTED"]
+GHOSTED_ITEMS = frozenset(ghosted_reference["GHOSTED"])
+
+# UserData index to RGBA, for the palette material.
+PALETTE = {
+    int(index): tuple((list(colour_data.get("colour", [0.8, 0.8, 0.8])) + [1.0])[:4])
+    for index, colour_data in material_reference.items()
+}
+DEFAULT_PALETTE_COLOUR = (0.8, 0.8, 0.8, 1.0)
+PALETTE_MATERIAL = "nms_palette_material"
+
+# Whether parts share the palette material instead of a material per colour.
+_use_palette = False
+
+# The alpha of ghosted parts while rooms are ghosted.
+GHOSTED_ALPHA = 0.07
+# The alpha ghosted parts currently have.
+_ghosted_alpha = 1.0
+
+
+def set_palette_mode(enabled):
+    """Switch between a material per colour and the shared palette material.
+
+    Args:
+        enabled (bool): Colour parts through the palette material.
+    """
+    global _use_palette
+    _use_palette = enabled
+
+
+def is_palette_mode():
+    return _use_palette
+
+
+def set_ghosted_alpha(alpha):
+    """Set the alpha of ghosted parts.
+
+    The transparent materials are shared, so only they are updated. Parts
+    coloured through the palette take the alpha into their object colour
+    whenever they are created or recoloured.
+
+    Args:
+        alpha (float): 1.0 for solid, GHOSTED_ALPHA for see through.
+    """
+    global _ghosted_alpha
+    _ghosted_alpha = alpha
+    for material in bpy.data.materials:
+        if "transparent" in material.name:
+            material.diffuse_color[3] = alpha
+
+
+def get_ghosted_alpha():
+    return _ghosted_alpha
+
+
+def is_palette_material(material):
+    """Check if a material is one of the shared palette materials."""
+    return bool(material) and material.name.startswith(PALETTE_MATERIAL)
 
 def validate_material(colour_name, colour_value):
     """Creates or returns a material based on its name.
@@ -102,51 +159,178 @@ def assign_preset_material(item):
     set_material(item, material)
 
 
-def assign_material(item, colour_index=0, material=None):
-    """Given a blender object. assign a material and UserData index.
-    
+# UserData offsets of each material type.
+MATERIAL_MAP = {
+    "CONCRETE": 0,
+    "RUST": 16777216,
+    "STONE": 33554432,
+    "WOOD": 50331648,
+}
+
+
+def get_colour_index(colour_index=0, material=None):
+    """Combine a colour index and a material type into a UserData index.
+
     Args:
-        item (bpy_types.Object): A Blender object.
         colour_index (int): The colour index determined by No Man's Sky.
         material (str): The material type.
 
     Returns:
-        bpy_types.Material: The material that is applied.
+        int: The UserData index.
     """
-    # Some Defaults
-    alpha_value = 1.0
-
-    material_map = {
-        "CONCRETE": 0,
-        "RUST": 16777216,
-        "STONE": 33554432,
-        "WOOD": 50331648,
-    }
-
-    material_key = "CONCRETE"
     if material:
         material_key = list(material)[0]
-        material_index = material_map[material_key]
-        colour_index = material_index + colour_index
+        colour_index = MATERIAL_MAP[material_key] + colour_index
+    return colour_index
 
-    # Apply Custom Variable.
-    item["UserData"] = str(colour_index)
+
+def get_colour_material(colour_index, ghosted=False):
+    """Get or create the material of a UserData index.
+
+    Args:
+        colour_index (int): The UserData index.
+        ghosted (bool): Get the transparent variant.
+
+    Returns:
+        bpy_types.Material: The material.
+    """
+    # Some Defaults
+    alpha_value = 1.0
 
     # Create Material
     colour_name = "{0}_material".format(colour_index)
     # Add transparent tag to material name.
-    item_name = item.get("ObjectID", "")
-    if item_name in GHOSTED_ITEMS:
+    if ghosted:
         colour_name += "_transparent"
 
     # Get colour values.
     colour_data = material_reference.get(str(colour_index), {})
-    colour_values = colour_data.get("colour", [0.8, 0.8, 0.8, alpha_value])
+    colour_values = list(colour_data.get("colour", [0.8, 0.8, 0.8, alpha_value]))
     if len(colour_values) < 4:
         colour_values.append(alpha_value)
 
     # Get or create the material.
-    material = validate_material(colour_name, colour_values)
+    return validate_material(colour_name, colour_values)
+
+
+def get_palette_material(ghosted=False):
+    """Get or create the material shared by all palette coloured parts.
 
+    The material takes its colour from the object colour, which shows up in
+    solid view when the shading colour is set to Object.
+
+    Args:
+        ghosted (bool): Get the transparent variant.
+
+    Returns:
+        bpy_types.Material: The material.
+    """
+    material_name = PALETTE_MATERIAL
+    if ghosted:
+        material_name += "_transparent"
+    palette_material = bpy.data.materials.get(material_name)
+    if palette_material:
+        return palette_material
+
+    palette_material = bpy.data.materials.new(name=material_name)
+    palette_material.use_nodes = True
+    node_tree = palette_material.node_tree
+    shader = node_tree.nodes.get("Principled BSDF")
+    if shader:
+        object_info = node_tree.nodes.new("ShaderNodeObjectInfo")
+        node_tree.links.new(
+            object_info.outputs["Color"],
+            shader.inputs["Base Color"]
+        )
+    return palette_material
+
+
+def assign_palette_colour(item, colour_index, palette_material):
+    """Colour an object through the palette material.
+
+    Args:
+        item (bpy_types.Object): A Blender object.
+        colour_index (int): The UserData index.
+        palette_material (bpy_types.Material): The shared material.
+    """
+    colour = PALETTE.get(colour_index, DEFAULT_PALETTE_COLOUR)
+    # Ghosted rooms are made see through with the alpha.
+    alpha = _ghosted_alpha if item.get("ObjectID", "") in GHOSTED_ITEMS else 1.0
+    item.color = colour[:3] + (alpha,)
+    # Only touch the material slots if they aren't shared already.
+    if item.active_material != palette_material:
+        set_material(item, palette_material)
+
+
+@profiler.instrument()
+def assign_material(item, colour_index=0, material=None):
+    """Given a blender object. assign a material and UserData index.
+    
+    Args:
+        item (bpy_types.Object): A Blender object.
+        colour_index (int): The colour index determined by No Man's Sky.
+        material (str): The material type.
+
+    Returns:
+        bpy_types.Material: The material that is applied.
+    """
+    colour_index = get_colour_index(colour_index, material)
+
+    # Apply Custom Variable.
+    item["UserData"] = str(colour_index)
+
+    ghosted = item.get("ObjectID", "") in GHOSTED_ITEMS
+    if _use_palette:
+        material = get_palette_material(ghosted=ghosted)
+        assign_palette_colour(item, colour_index, material)
+        return material
+
+    material = get_colour_material(colour_index, ghosted=ghosted)
     set_material(item, material)
     return material
+
+
+def assign_materials(items, colour_index=0, material=None):
+    """Give many blender objects the same colour at once.
+
+    The items are grouped by the material they end up with, so each
+    material is only looked up once and each mesh only assigned once.
+
+    Args:
+        items (list): The Blender objects.
+        colour_index (int): The colour index determined by No Man's Sky.
+        material (str): The material type.
+
+    Returns:
+        int: The number of items recoloured.
+    """
+    colour_index = get_colour_index(colour_index, material)
+    user_data = str(colour_index)
+
+    # Group by the resulting material.
+    groups = {False: [], True: []}
+    for item in items:
+        groups[item.get("ObjectID", "") in GHOSTED_ITEMS].append(item)
+
+    assigned_meshes = set()
+    for ghosted, group_items in groups.items():
+        if not group_items:
+            continue
+
+        # Recolouring is only an object colour change.
+        if _use_palette:
+            palette_material = get_palette_material(ghosted=ghosted)
+            for item in group_items:
+                item["UserData"] = user_data
+                assign_palette_colour(item, colour_index, palette_material)
+            continue
+
+        colour_material = get_colour_material(colour_index, ghosted=ghosted)
+        for item in group_items:
+            item["UserData"] = user_data
+            mesh = item.data
+            if mesh is None or mesh.name in assigned_meshes:
+                continue
+            assigned_meshes.add(mesh.name)
+            set_material(item, colour_material)
+    return len(items)
@@ -0,0 +1,181 @@
+"""Opt-in timing of the builder's hot paths.
+
+Methods wrapped with instrument() only look at a flag until profiling is
+turned on. From then on every call is counted and timed, and cache lookups
+reported through record_cache() are counted as hits or misses. The calls can
+be exported as a Chrome trace and opened in chrome://tracing or Perfetto.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+# Stop recording trace events past this many, the counters keep going.
+MAX_EVENTS = 200000
+
+
+class Profiler(object):
+    """Collects call statistics while enabled."""
+
+    def __init__(self):
+        """Profiler __init__."""
+        self.enabled = False
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.__calls = {}
+        self.__caches = {}
+        self.__events = []
+        self.__dropped_events = 0
+        self.__start = time.perf_counter()
+
+    def record_call(self, name, start, end):
+        """Record a call that ran from start to end, in perf_counter seconds."""
+        duration = end - start
+        with self.__lock:
+            stats = self.__calls.get(name)
+            if stats is None:
+                self.__calls[name] = [1, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                if duration > stats[2]:
+                    stats[2] = duration
+
+            if len(self.__events) < MAX_EVENTS:
+                self.__events.append(
+                    (name, start - self.__start, duration, threading.get_ident())
+                )
+            else:
+                self.__dropped_events += 1
+
+    def record_cache(self, name, hit):
+        """Record a cache lookup.
+
+        Args:
+            name (str): The name of the cache.
+            hit (bool): Whether the lookup found something.
+        """
+        if not self.enabled:
+            return
+        with self.__lock:
+            stats = self.__caches.setdefault(name, [0, 0])
+            stats[0 if hit else 1] += 1
+
+    def get_call_stats(self):
+        """Get the statistics of every instrumented call, slowest first.
+
+        Returns:
+            list: Dictionaries of name, count, total, mean and max, in seconds.
+        """
+        with self.__lock:
+            calls = [(name, list(stats)) for name, stats in self.__calls.items()]
+        rows = [
+            {
+                "name": name,
+                "count": count,
+                "total": total,
+                "mean": total / count,
+                "max": maximum,
+            }
+            for name, (count, total, maximum) in calls
+        ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def get_cache_stats(self):
+        """Get the hit ratio of every cache.
+
+        Returns:
+            list: Dictionaries of name, hits, misses and ratio.
+        """
+        with self.__lock:
+            caches = [(name, list(stats)) for name, stats in self.__caches.items()]
+        rows = []
+        for name, (hits, misses) in sorted(caches):
+            lookups = hits + misses
+            rows.append({
+                "name": name,
+                "hits": hits,
+                "misses": misses,
+                "ratio": hits / lookups if lookups else 0.0,
+            })
+        return rows
+
+    def get_chrome_trace(self):
+        """Get the recorded calls in the Chrome trace event format.
+
+        Returns:
+            dict: The trace, ready to be written as json.
+        """
+        pid = os.getpid()
+        with self.__lock:
+            events = list(self.__events)
+            dropped_events = self.__dropped_events
+        trace_events = [
+            {
+                "name": name,
+                "cat": "nms",
+                "ph": "X",
+                # Trace times are in microseconds.
+                "ts": round(start * 1e6, 3),
+                "dur": round(duration * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in events
+        ]
+        # Show the cache ratios as counters at the end of the trace.
+        end = max([event["ts"] + event["dur"] for event in trace_events] or [0.0])
+        for cache in self.get_cache_stats():
+            trace_events.append({
+                "name": cache["name"],
+                "cat": "nms_cache",
+                "ph": "C",
+                "ts": end,
+                "pid": pid,
+                "args": {"hits": cache["hits"], "misses": cache["misses"]},
+            })
+        return {
+            "traceEvents": trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_events": dropped_events},
+        }
+
+    def export_chrome_trace(self, path):
+        """Write the Chrome trace to a json file."""
+        with open(path, "w") as stream:
+            json.dump(self.get_chrome_trace(), stream)
+
+
+PROFILER = Profiler()
+
+
+def instrument(name=None):
+    """Decorate a function so its calls are recorded while profiling.
+
+    Args:
+        name (str): The name to record calls as, the qualified name of the
+            function by default.
+    """
+    def decorator(func):
+        call_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record_call(call_name, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def record_cache(name, hit):
+    """Record a cache lookup on the shared profiler."""
+    PROFILER.record_cache(name, hit)